@@ -1,6 +1,24 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, date
+from functools import lru_cache, partial
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+from itertools import compress
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import asyncio
+import codecs
+import csv
+import hashlib
+import json
+import os
+import random
 import re
+import sqlite3
+from statistics import NormalDist
+import tempfile
+import time
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename
 from spellchecker import SpellChecker
@@ -9,24 +27,46 @@ from difflib import get_close_matches
 from rapidfuzz import fuzz, process
 import unicodedata
 
-import win32com.client as win32
+try:
+    import win32com.client as win32  # solo disponible en Windows (validación ortográfica con Word)
+except ImportError:
+    win32 = None
 
-# Configurar diccionario en español
-spell = SpellChecker(language="es")
+try:
+    import pyarrow as pa  # motor de carga alternativo (--motor-carga pyarrow)
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
 
-# ==========================
-# Selección archivo CSV
-# ==========================
+try:
+    import pyogrio  # lectura directa de GeoPackage / Shapefile (opcional)
+except ImportError:
+    pyogrio = None
 
-Tk().withdraw()
-ruta = askopenfilename(
-    filetypes=[("Archivos CSV", "*.csv")],
-    title="Seleccione el archivo CSV"
-)
+try:
+    import polars as pl  # motor de validación alternativo (--motor-validacion polars)
+except ImportError:
+    pl = None
+
+try:
+    import duckdb  # motor de validación fuera de memoria (--motor-validacion duckdb)
+except ImportError:
+    duckdb = None
+
+try:
+    import shapely  # área de los polígonos al leer capas (opcional)
+except ImportError:
+    shapely = None
+
+try:
+    import psutil  # medición de memoria (opcional)
+except ImportError:
+    psutil = None
 
-if not ruta:
-    print("❌ No se seleccionó ningún archivo. Saliendo...")
-    raise SystemExit
+# Configurar diccionario en español
+spell = SpellChecker(language="es")
+
+OUTPUT_DIR = r"C:\2025\01_Validaores_Totales\EditPLot"  # <- puedes cambiar esta ruta
 
 # ==========================
 # Columnas a analizar
@@ -87,20 +127,401 @@ def parse_date_strict(s):
     # ❌ Ningún formato válido
     return "FORMATO_INVALIDO"
 
+# ==========================
+# Progreso y telemetría
+# ==========================
+MODOS_PROGRESO = ["normal", "silencioso", "json"]
+
+class Progreso:
+    """Avance por etapa (carga, normalización, cada bloque de columnas, escritura)
+       con filas/s, ETA y memoria. modo="json" emite una línea JSON por evento.
+       avanzar() solo consulta el reloj cada `cada` filas para no frenar el ciclo.
+    """
+
+    def __init__(self, modo="normal", intervalo=2.0, cada=1000):
+        self.modo = modo
+        self.unidad = "filas"
+        self.intervalo = intervalo
+        self.cada = cada
+        self.nombre = None
+        self.total = None
+        self.hechas = 0
+        self._proximo = cada
+        self._inicio = self._ultimo = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nombre, total=None, unidad="filas"):
+        self.nombre, self.total, self.hechas, self.unidad = nombre, total, 0, unidad
+        self._proximo = self.cada
+        self._inicio = self._ultimo = time.perf_counter()
+        self._emitir("inicio")
+        yield self
+        self._emitir("fin")
+
+    def avanzar(self, n=1):
+        self.hechas += n
+        if self.hechas >= self._proximo:
+            self._proximo = self.hechas + self.cada
+            ahora = time.perf_counter()
+            if ahora - self._ultimo >= self.intervalo:
+                self._ultimo = ahora
+                self._emitir("avance")
+
+    def mensaje(self, texto, **datos):
+        if self.modo == "normal":
+            print(texto, flush=True)
+        elif self.modo == "json":
+            print(json.dumps({"evento": "mensaje", "texto": texto, **datos}, ensure_ascii=False, default=str), flush=True)
+
+    def tabla(self, df, **datos):
+        """Tabla de resultados: texto en modo normal, un evento con las filas en modo json."""
+        if self.modo == "normal":
+            print(df.to_string(index=False), flush=True)
+        elif self.modo == "json":
+            filas = json.loads(df.to_json(orient="records", force_ascii=False, date_format="iso"))
+            print(json.dumps({"evento": "tabla", "filas": filas, **datos}, ensure_ascii=False, default=str), flush=True)
+
+    def _emitir(self, evento):
+        if self.modo == "silencioso":
+            return
+        transcurrido = time.perf_counter() - self._inicio
+        velocidad = self.hechas / transcurrido if transcurrido > 0 else None
+        eta = (self.total - self.hechas) / velocidad if self.total and velocidad else None
+        memoria = memoria_mb()
+
+        if self.modo == "json":
+            print(json.dumps({
+                "evento": evento, "etapa": self.nombre, "unidad": self.unidad, "hechas": self.hechas, "total": self.total,
+                "segundos": round(transcurrido, 3),
+                "por_segundo": round(velocidad, 1) if velocidad else None,
+                "eta_segundos": round(eta, 1) if eta is not None else None,
+                "memoria_mb": round(memoria, 1) if memoria is not None else None
+            }, ensure_ascii=False), flush=True)
+            return
+
+        if evento == "inicio":
+            return
+        texto = f"{'✔️' if evento == 'fin' else '⏳'} {self.nombre}: {self.hechas:,}"
+        if self.total:
+            texto += f"/{self.total:,}"
+        texto += f" {self.unidad} · {transcurrido:.1f} s"
+        if velocidad:
+            texto += f" · {velocidad:,.0f} {self.unidad}/s" if velocidad >= 10 else f" · {velocidad:.2f} {self.unidad}/s"
+        if evento == "avance" and eta is not None:
+            texto += f" · ETA {eta:.0f} s"
+        if memoria is not None:
+            texto += f" · {memoria:,.0f} MB"
+        print(texto, flush=True)
+
+SIN_PROGRESO = Progreso("silencioso")
+
 # ==========================
 # Cargar CSV: todo como texto
 # ==========================
 
-df_raw = pd.read_csv(
-    ruta,
-    usecols=columnas_objetivo,
-    encoding="utf-8",
-    sep=";",
-    dtype=str
-)
+# Mismos textos que pandas convierte en NaN por defecto (para que ambos motores coincidan)
+VALORES_NULOS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+
+MOTORES_CARGA = ["pandas", "pyarrow"]
+
+# Pocos valores distintos repetidos en cientos de miles de filas: se cargan como category
+# (las categorías son el texto original, sin modificar) y sus reglas se evalúan una vez por categoría
+COLUMNAS_CATEGORICAS = [
+    "Nombre Proyecto", "Símbolo", "Escala", "Fuente Información", "Creado Por", "Modificado Por",
+    "Cód DANE Depto", "Cód DANE Mpio", "RULEID", "Tipo de Propiedad",
+]
+
+# Capas GIS: se leen directamente sin exportar a CSV
+EXTENSIONES_CAPA = (".gpkg", ".shp")
+EXTENSIONES_ENTRADA = (".csv",) + EXTENSIONES_CAPA
 
-# Copia para análisis
-df = df_raw.copy()
+def es_capa(ruta):
+    return str(ruta).lower().endswith(EXTENSIONES_CAPA)
+
+# ==========================
+# Detección de codificación y separador
+# ==========================
+SEPARADORES_CANDIDATOS = [";", ",", "\t", "|"]
+
+def detectar_formato(ruta, muestra_bytes=64 * 1024):
+    """Lee solo los primeros KB del archivo y detecta codificación (incluido BOM) y separador.
+       Falla de inmediato si el encabezado no contiene todas las columnas objetivo.
+    """
+    with open(ruta, "rb") as f:
+        muestra = f.read(muestra_bytes)
+        # Asegurar que la muestra contenga el encabezado completo
+        while b"\n" not in muestra:
+            bloque = f.read(muestra_bytes)
+            if not bloque:
+                break
+            muestra += bloque
+
+    if muestra.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    elif muestra.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = "utf-16"
+    else:
+        encoding = "utf-8"
+
+    try:
+        # final=False tolera un carácter multibyte cortado al final de la muestra
+        texto = codecs.getincrementaldecoder(encoding)().decode(muestra, final=False)
+    except UnicodeDecodeError:
+        # Exportes de oficinas regionales (Latin-1 / cp1252)
+        try:
+            texto = muestra.decode("cp1252")
+            encoding = "cp1252"
+        except UnicodeDecodeError:
+            texto = muestra.decode("latin-1")
+            encoding = "latin-1"
+
+    linea = texto.splitlines()[0] if texto else ""
+
+    # Separador: el que reconozca más columnas objetivo en el encabezado
+    sep, encabezado = ";", []
+    for candidato in SEPARADORES_CANDIDATOS:
+        campos = next(csv.reader([linea], delimiter=candidato), [])
+        if len(set(campos) & set(columnas_objetivo)) > len(set(encabezado) & set(columnas_objetivo)):
+            sep, encabezado = candidato, campos
+
+    faltantes = [c for c in columnas_objetivo if c not in encabezado]
+    if faltantes:
+        raise ValueError(
+            f"El archivo no contiene las columnas requeridas: {', '.join(faltantes)} "
+            f"(codificación detectada: {encoding}, separador: {sep!r})"
+        )
+
+    return {"encoding": encoding, "sep": sep}
+
+def cargar_csv(ruta, motor="pandas", progreso=SIN_PROGRESO, columnas=columnas_objetivo, exacto=False, categorias=True):
+    """Lee las columnas objetivo como texto sin modificar (espacios y saltos de línea incluidos).
+       motor="pyarrow" usa el lector CSV de Arrow sobre el archivo mapeado en memoria
+       y deja las columnas como string[pyarrow]. columnas permite leer solo un subconjunto
+       (None = todas). exacto=True no convierte "NA", "n/a", "" … en nulos (modo corrección).
+       categorias=True carga COLUMNAS_CATEGORICAS como category (nunca en modo exacto).
+       Las capas .gpkg / .shp se leen con cargar_capa.
+    """
+    if es_capa(ruta):
+        return cargar_capa(ruta, motor, progreso, columnas=columnas, exacto=exacto, categorias=categorias)
+
+    formato = detectar_formato(ruta)
+    if formato != {"encoding": "utf-8", "sep": ";"}:
+        progreso.mensaje(f"ℹ️ Archivo leído con codificación {formato['encoding']} y separador {formato['sep']!r}", **formato)
+
+    try:
+        with progreso.etapa("Carga"):
+            df_raw = _leer_csv(ruta, motor, columnas=columnas, exacto=exacto, categorias=categorias, **formato)
+            progreso.avanzar(len(df_raw))
+        return df_raw
+    except UnicodeDecodeError as e:
+        # La muestra era válida pero más adelante el archivo mezcla codificaciones
+        raise ValueError(
+            f"El archivo mezcla codificaciones: se detectó {formato['encoding']} en el encabezado "
+            f"pero hay bytes inválidos más adelante ({e.reason}, byte {e.start})"
+        ) from e
+
+def _leer_csv(ruta, motor, encoding, sep, columnas=columnas_objetivo, exacto=False, categorias=True):
+    categoricas = columnas_categoricas(columnas, exacto, categorias)
+    if motor == "pyarrow" and not exacto:
+        return cargar_csv_pyarrow(ruta, encoding, sep, columnas, categoricas)
+    return pd.read_csv(
+        ruta,
+        usecols=columnas,
+        encoding=encoding,
+        sep=sep,
+        dtype=defaultdict(lambda: str, {c: "category" for c in categoricas}),
+        keep_default_na=not exacto
+    )
+
+def columnas_categoricas(columnas, exacto=False, categorias=True):
+    if exacto or not categorias:
+        return []
+    return [c for c in COLUMNAS_CATEGORICAS if columnas is None or c in columnas]
+
+def cargar_csv_pyarrow(ruta, encoding="utf-8", sep=";", columnas=columnas_objetivo, categoricas=()):
+    if pa is None:
+        raise ImportError("El motor de carga 'pyarrow' requiere instalar pyarrow")
+
+    with pa.memory_map(ruta, "r") as origen:
+        tabla = pa_csv.read_csv(
+            origen,
+            read_options=pa_csv.ReadOptions(encoding="utf8" if encoding in ("utf-8", "utf-8-sig") else encoding),
+            parse_options=pa_csv.ParseOptions(delimiter=sep, newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=columnas,
+                column_types={c: pa.dictionary(pa.int32(), pa.string()) if c in categoricas else pa.string()
+                              for c in columnas},
+                null_values=VALORES_NULOS,
+                strings_can_be_null=True
+            )
+        )
+    return tabla.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+def resolver_campos(campos, columnas=columnas_objetivo):
+    """Relaciona los campos de la capa con las columnas objetivo.
+       El Shapefile (DBF) recorta los nombres a 10 bytes y numera los repetidos
+       ("Cód DANE", "Cód DAN_1"), así que además del nombre exacto se acepta un campo
+       que sea prefijo de la columna; los recortados se asignan en el orden de la capa.
+    """
+    asignados, libres = {}, list(columnas)
+    for campo in campos:
+        if campo in libres:
+            asignados[campo] = campo
+            libres.remove(campo)
+    for campo in campos:
+        if campo in asignados:
+            continue
+        base = re.sub(r"_\d+$", "", campo)
+        columna = next((c for c in libres if c.startswith(base)), None)
+        if columna is not None:
+            asignados[columna] = campo
+            libres.remove(columna)
+    return asignados
+
+def resolver_capa(ruta, capa=None):
+    """Nombre de la capa a leer: la indicada, EDITPLOT_CAPA o la primera que tenga las columnas."""
+    capa = capa or os.environ.get("EDITPLOT_CAPA") or None
+    if capa is None:
+        capas = [c for c, _ in pyogrio.list_layers(ruta)]
+        capa = capas[0] if capas else None
+        for candidata in capas:
+            campos = pyogrio.read_info(ruta, layer=candidata)["fields"].tolist()
+            if len(resolver_campos(campos)) == len(columnas_objetivo):
+                return candidata
+    return capa
+
+def modo_carga(ruta, motor_carga="pandas"):
+    """Lector con el que se carga el archivo. Las capas se leen con pyogrio y solo así
+       existe la columna derivada del área del polígono (si shapely está instalado).
+    """
+    if es_capa(ruta):
+        return "pyogrio+geometria" if shapely is not None else "pyogrio"
+    return motor_carga
+
+def cargar_capa(ruta, motor="pandas", progreso=SIN_PROGRESO, capa=None, columnas=columnas_objetivo, exacto=False,
+                categorias=True):
+    """Lee la tabla de atributos de un GeoPackage o Shapefile solo con las columnas objetivo.
+       Devuelve lo mismo que cargar_csv: todo como texto y los mismos nulos. La geometría solo
+       se lee si se valida el Área, y se reduce a la columna derivada COLUMNA_AREA_GEOMETRIA.
+       capa = nombre de la capa (por defecto EDITPLOT_CAPA o la primera que tenga las columnas).
+    """
+    if pyogrio is None or pa is None:
+        raise ImportError("La lectura de GeoPackage / Shapefile requiere instalar pyogrio y pyarrow")
+
+    capa = resolver_capa(ruta, capa)
+    campos = pyogrio.read_info(ruta, layer=capa)["fields"].tolist()
+    asignados = resolver_campos(campos, columnas_objetivo if columnas is None else columnas)
+    if columnas is None:
+        asignados.update({c: c for c in campos if c not in asignados.values()})
+    faltantes = [c for c in (columnas or columnas_objetivo) if c not in asignados]
+    if faltantes:
+        raise ValueError(f"La capa {capa!r} no contiene las columnas requeridas: {', '.join(faltantes)}")
+
+    # La geometría solo se lee para validar el área declarada (nunca en modo corrección)
+    geometria = shapely is not None and not exacto and "Área Terreno Calculada Mts2" in asignados
+
+    with progreso.etapa("Carga"):
+        meta, tabla = pyogrio.read_arrow(
+            ruta, layer=capa, columns=list(asignados.values()), read_geometry=geometria, datetime_as_string=True
+        )
+        # Enteros, reales y fechas del DBF/GPKG pasan a texto como los traería el CSV
+        orden = sorted(asignados.items(), key=lambda par: campos.index(par[1]))
+        categoricas = columnas_categoricas(columnas, exacto, categorias)
+        atributos = pa.table({
+            c: tabla.column(campo).cast(pa.string()).dictionary_encode() if c in categoricas
+            else tabla.column(campo).cast(pa.string())
+            for c, campo in orden
+        })
+        if motor == "pyarrow":
+            df_raw = atributos.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+        else:
+            df_raw = atributos.to_pandas()
+        if not exacto:
+            df_raw = df_raw.mask(df_raw.isin(VALORES_NULOS))
+        progreso.avanzar(len(df_raw))
+
+    if geometria:
+        with progreso.etapa("Área de los polígonos", len(df_raw), "polígonos"):
+            wkb = tabla.column(meta["geometry_name"] or "wkb_geometry").to_numpy(zero_copy_only=False)
+            df_raw[COLUMNA_AREA_GEOMETRIA] = areas_geometria(wkb, meta["crs"])
+            progreso.avanzar(len(df_raw))
+    return df_raw
+
+# Área calculada de cada polígono: columna derivada que solo existe al leer capas
+COLUMNA_AREA_GEOMETRIA = "Área Geometría Mts2"
+COLUMNAS_DERIVADAS = [COLUMNA_AREA_GEOMETRIA]
+
+# Elipsoide GRS80 (MAGNA-SIRGAS) para capas en coordenadas geográficas
+SEMIEJE_MAYOR = 6378137.0
+EXCENTRICIDAD2 = 0.00669438002290
+
+CRS_GEOGRAFICOS = {"EPSG:4326", "EPSG:4686", "EPSG:4170", "EPSG:4258", "EPSG:4269", "OGC:CRS84"}
+
+def es_crs_geografico(crs, geometrias):
+    """Sin pyproj: EPSG geográficos conocidos o WKT GEOGCS; sin CRS, coordenadas en rango lon/lat."""
+    if crs:
+        return crs.upper() in CRS_GEOGRAFICOS or crs.lstrip().upper().startswith(("GEOGCS", "GEOGCRS"))
+    xmin, ymin, xmax, ymax = shapely.total_bounds(geometrias)
+    return -180 <= xmin <= xmax <= 180 and -90 <= ymin <= ymax <= 90
+
+def areas_geometria(wkb, crs):
+    """Área en m² de todas las geometrías en una sola pasada vectorizada (NaN sin geometría).
+       CRS proyectado (MAGNA Colombia Bogotá, CTM12 …): área plana en unidades del CRS.
+       CRS geográfico: proyección sinusoidal (de áreas iguales) sobre la esfera unitaria y
+       escala del elipsoide M·N en la latitud del centroide, exacta para predios pequeños.
+    """
+    geometrias = shapely.from_wkb(wkb)
+    if not es_crs_geografico(crs, geometrias):
+        return shapely.area(geometrias)
+
+    centroides = shapely.centroid(geometrias)
+    lon0 = np.nanmedian(shapely.get_x(centroides))
+
+    def sinusoidal(coords):
+        lon, lat = np.radians(coords[:, 0] - lon0), np.radians(coords[:, 1])
+        return np.column_stack([lon * np.cos(lat), lat])
+
+    unitaria = shapely.area(shapely.transform(geometrias, sinusoidal))
+    seno2 = np.sin(np.radians(shapely.get_y(centroides))) ** 2
+    m = SEMIEJE_MAYOR * (1 - EXCENTRICIDAD2) / (1 - EXCENTRICIDAD2 * seno2) ** 1.5
+    n = SEMIEJE_MAYOR / (1 - EXCENTRICIDAD2 * seno2) ** 0.5
+    return unitaria * m * n
+
+def memoria_mb():
+    """RSS actual del proceso en MB (None si psutil no está instalado)."""
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+def benchmark_carga(ruta, repeticiones=3):
+    """Compara tiempo de carga y memoria de cada motor, con y sin columnas category,
+       sobre el mismo archivo.
+    """
+    resultados = []
+    for motor in MOTORES_CARGA:
+        if motor == "pyarrow" and pa is None:
+            continue
+        for categorias in (False, True):
+            tiempos = []
+            for _ in range(repeticiones):
+                rss_antes = memoria_mb()
+                inicio = time.perf_counter()
+                df_raw = cargar_csv(ruta, motor, categorias=categorias)
+                tiempos.append(time.perf_counter() - inicio)
+                rss_despues = memoria_mb()
+                memoria_df = df_raw.memory_usage(deep=True).sum() / (1024 * 1024)
+                del df_raw
+            resultados.append({
+                "Motor": motor,
+                "Categóricas": "sí" if categorias else "no",
+                "Tiempo mínimo (s)": round(min(tiempos), 3),
+                "Memoria DataFrame (MB)": round(memoria_df, 1),
+                "Δ RSS última carga (MB)": round(rss_despues - rss_antes, 1) if rss_antes is not None else None
+            })
+    return pd.DataFrame(resultados)
 
 # Normalizar: convertir espacios vacíos en <ESPACIO>
 def limpiar_valor(x):
@@ -110,9 +531,6 @@ def limpiar_valor(x):
         return x.strip()
     return x
 
-df = df.applymap(limpiar_valor)
-df = df.replace("", pd.NA)  # opcional: reemplazar strings vacíos por NaN
-
 # Preprocesamientio de Columnas Fecha Captura y Año Vigencia.
 def extraer_anio(texto):
     if pd.isna(texto):
@@ -120,11 +538,71 @@ def extraer_anio(texto):
     match = re.search(r"\d{4}", str(texto))
     return int(match.group()) if match else None
 
-# Crear columnas adicionales en todo el DataFrame
-df_raw["Anio_Captura"] = df_raw["Fecha Captura"].apply(extraer_anio)
-df_raw["Anio_Vigencia_Num"] = df_raw["Año Vigencia Insumo Geográfico"].apply(extraer_anio)
+def preparar_datos(df_raw):
+    """Devuelve la copia normalizada para análisis."""
+    # Copia para análisis
+    df = df_raw.copy()
+    df = df.applymap(limpiar_valor)
+    df = df.replace("", pd.NA)  # opcional: reemplazar strings vacíos por NaN
+    return df
+
+# ==========================
+# Tokens de Nombre Predio Jurídico (por columna)
+# ==========================
+PREDIO_PERMITIDAS_MINUSCULA = {
+    "de","del","la","las","los","el","y","o","por","en","sin","predio","urbano",
+    "vía","via","al","san","santa","corregimiento","vereda","sector","urbanización",
+    "urbanizacion","barrio"
+}
+PREDIO_ROMANO = re.compile(r'^(?:I|II|III|IV|V|VI|VII|VIII|IX|X)$', re.IGNORECASE)
+PREDIO_TITULO = re.compile(r'^[A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+(?:-[A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+)*$')
+PREDIO_NUMERO = re.compile(r'^\d+[A-Z]?$')   # 13, 13A, 04
+PREDIO_LETRA = re.compile(r'^[A-Z]$')        # B, H, etc.
+
+@lru_cache(maxsize=None)
+def token_predio_valido(tok):
+    """True si el token es una excepción permitida o está en formato tipo título.
+       Se cachea: los nombres de predio reutilizan un vocabulario pequeño.
+    """
+    return bool(
+        tok.lower() in PREDIO_PERMITIDAS_MINUSCULA
+        or PREDIO_ROMANO.match(tok)
+        or PREDIO_NUMERO.match(tok)
+        or PREDIO_LETRA.match(tok)
+        or PREDIO_TITULO.match(tok)
+    )
+
+PREDIO_PUNTUACION_INICIAL = re.compile(r'^[\s\-\.,;:]+')
+PREDIO_PUNTUACION_FINAL = re.compile(r'[;,:\.\-]+$')
+PREDIO_ESPACIOS = re.compile(r'\s+')
+
+@lru_cache(maxsize=100_000)
+def tokens_invalidos_valor(valor):
+    """Tokens inválidos de un solo Nombre Predio Jurídico (validación registro a registro)."""
+    val_norm = PREDIO_PUNTUACION_INICIAL.sub('', valor.strip())
+    val_norm = PREDIO_PUNTUACION_FINAL.sub('', val_norm)
+    val_norm = PREDIO_ESPACIOS.sub(' ', val_norm).strip()
+
+    tokens = [t.strip(" ,.") for t in val_norm.split(" ") if t.strip() != ""]
+    return [tok for tok in tokens if not token_predio_valido(tok)]
+
+def calcular_tokens_invalidos_predio(serie):
+    """Tokeniza toda la columna de una vez y devuelve {índice fila: [tokens inválidos]}.
+       Solo aparecen las filas con al menos un token inválido.
+    """
+    texto = serie[serie.map(lambda x: isinstance(x, str))].str.strip()
+    texto = texto.str.replace(PREDIO_PUNTUACION_INICIAL, '', regex=True)  # quitar puntuación inicial
+    texto = texto.str.replace(PREDIO_PUNTUACION_FINAL, '', regex=True)    # quitar puntuación final
+    texto = texto.str.replace(PREDIO_ESPACIOS, ' ', regex=True).str.strip()
+
+    tokens = texto.str.split(" ").explode()
+    tokens = tokens[tokens.str.strip() != ""].str.strip(" ,.")
 
-registros = []
+    # Cada token distinto se clasifica una sola vez
+    clasificacion = {tok: token_predio_valido(tok) for tok in tokens.unique()}
+    invalidos = tokens[~tokens.map(clasificacion).astype(bool)]
+
+    return invalidos.groupby(level=0, sort=False).agg(list).to_dict()
 
 codigos_dane_deptos = {
     "05": "Antioquia",
@@ -161,20 +639,686 @@ codigos_dane_deptos = {
     "97": "Vaupés",
     "99": "Vichada"
 }
+# ==========================
+# Índices globales (dependen de todo el archivo)
+# ==========================
+# ==========================
+# Motor de similitud (valores parecidos dentro de una columna)
+# ==========================
+class MotorSimilitud:
+    """Vecinos parecidos (score ≥ umbral) de cada consulta entre las opciones de una columna.
+       Se calcula por lotes con process.cdist (multihilo y score_cutoff) y bloqueo por largo:
+       con ratio / token_sort_ratio dos textos de largos a ≤ b no superan 200·a/(a+b), así que
+       solo se comparan largos compatibles con el umbral (y, si se indica, el mismo bloque).
+       Las consultas nuevas se calculan al vuelo y quedan memorizadas.
+    """
+
+    def __init__(self, opciones, scorer=fuzz.token_sort_ratio, umbral=85, procesador=None, bloque=None):
+        self.opciones = list(opciones)
+        self.scorer, self.umbral, self.procesador, self.bloque = scorer, umbral, procesador, bloque
+        self._textos = [self._texto(o) for o in self.opciones]
+        self._grupos = defaultdict(list)   # (bloque, largo) → índices de opciones
+        for i, (opcion, texto) in enumerate(zip(self.opciones, self._textos)):
+            self._grupos[self._llave(opcion, texto)].append(i)
+        self._vecinos = {}
+
+    def _texto(self, valor):
+        return self.procesador(valor) if self.procesador else valor
+
+    def _llave(self, valor, texto):
+        return (self.bloque(valor) if self.bloque else None, len(" ".join(texto.split())))
+
+    def _rango_largos(self, largo):
+        # ±1 de holgura por diferencias de separación de tokens
+        minimo = (largo * self.umbral) // (200 - self.umbral) - 1
+        maximo = (largo * (200 - self.umbral)) // self.umbral + 1
+        return range(max(minimo, 0), maximo + 1)
+
+    def precalcular(self, consultas):
+        pendientes = defaultdict(list)
+        for consulta in dict.fromkeys(consultas):
+            if consulta not in self._vecinos:
+                texto = self._texto(consulta)
+                pendientes[self._llave(consulta, texto)].append((consulta, texto))
+
+        for (bloque, largo), grupo in pendientes.items():
+            indices = sorted(i for l in self._rango_largos(largo) for i in self._grupos.get((bloque, l), ()))
+            if not indices:
+                self._vecinos.update((c, []) for c, _ in grupo)
+                continue
+            matriz = process.cdist(
+                [t for _, t in grupo], [self._textos[i] for i in indices],
+                scorer=self.scorer, score_cutoff=self.umbral - 1, workers=-1
+            )
+            for (consulta, texto), fila in zip(grupo, matriz):
+                # cdist trabaja en float32: se recalcula el puntaje exacto de los candidatos
+                vecinos = []
+                for j in fila.nonzero()[0]:
+                    i = indices[j]
+                    score = self.scorer(texto, self._textos[i])
+                    if score >= self.umbral:
+                        vecinos.append((self.opciones[i], score))
+                vecinos.sort(key=lambda par: -par[1])   # estable: empates en orden de las opciones
+                self._vecinos[consulta] = vecinos
+
+    def vecinos(self, consulta):
+        """[(opción, score)] de mayor a menor score (empates en el orden de las opciones)."""
+        if consulta not in self._vecinos:
+            self.precalcular([consulta])
+        return self._vecinos[consulta]
+
+    def tiene_variante(self, consulta):
+        """True si hay otra opción que supera el umbral y no es la misma consulta una vez procesada.
+           Las diferencias que el procesador borra (tildes, mayúsculas) no cuentan como variante.
+        """
+        texto = self._texto(consulta)
+        return any(self._texto(opcion) != texto for opcion, _ in self.vecinos(consulta))
+
+def clave_similitud(valor):
+    return " ".join(valor.split())
+
+def normalizar_similitud(valor):
+    return unidecode(valor).lower()
+
+def digitos(valor):
+    return "".join(ch for ch in valor if ch.isdigit())
+
+# Columnas con regla "valor parecido a otro": regla nombrada, scorer, umbral, procesador y bloque
+SIMILITUD_COLUMNAS = {
+    "Nombre Proyecto": ("nombre_proyecto_similar", fuzz.ratio, 90, normalizar_similitud, None),
+    "Nombre Predio Jurídico": ("nombre_predio_similar", fuzz.ratio, 90, normalizar_similitud, digitos),  # "Lote 13" ≠ "Lote 14"
+    "Creado Por": ("creado_por_similar", fuzz.token_sort_ratio, 90, normalizar_similitud, None),
+}
+
+# ==========================
+# Áreas atípicas por municipio y vereda
+# ==========================
+# Un área es atípica si queda fuera de las vallas de Tukey (en escala logarítmica) de su grupo
+# y además a más de AREA_ATIPICA_RAZON veces de la mediana. Grupo = vereda del municipio, o el
+# municipio completo si la vereda tiene menos de AREA_ATIPICA_MIN_GRUPO áreas.
+AREA_ATIPICA_K = float(os.environ.get("EDITPLOT_AREA_ATIPICA_K", "3"))
+AREA_ATIPICA_RAZON = float(os.environ.get("EDITPLOT_AREA_ATIPICA_RAZON", "10"))
+AREA_ATIPICA_MIN_GRUPO = int(os.environ.get("EDITPLOT_AREA_ATIPICA_MIN_GRUPO", "10"))
+AREA_ATIPICA_ALFA = 0.01   # error relativo de los cuantiles del sketch
+
+class SketchArea:
+    """Cuantiles aproximados de valores positivos con error relativo AREA_ATIPICA_ALFA
+       (cubetas logarítmicas, como DDSketch). Dos sketches se fusionan sumando conteos,
+       así que se pueden construir por lotes sin tener el archivo completo en memoria,
+       y admiten quitar valores (índice incremental).
+    """
+    GAMMA = (1 + AREA_ATIPICA_ALFA) / (1 - AREA_ATIPICA_ALFA)
+
+    def __init__(self):
+        self.conteos = Counter()   # cubeta → cantidad
+        self.total = 0
+
+    @classmethod
+    def cubetas(cls, valores):
+        return np.ceil(np.log(np.asarray(valores, dtype=float)) / np.log(cls.GAMMA)).astype(np.int64)
+
+    def agregar(self, cubeta, cantidad=1):
+        self.conteos[cubeta] += cantidad
+        self.total += cantidad
+        if self.conteos[cubeta] <= 0:
+            del self.conteos[cubeta]
+
+    def fusionar(self, otro):
+        for cubeta, cantidad in otro.conteos.items():
+            self.agregar(cubeta, cantidad)
+
+    def cuantil(self, q):
+        rango, acumulado = q * (self.total - 1), 0
+        for cubeta in sorted(self.conteos):
+            acumulado += self.conteos[cubeta]
+            if acumulado > rango:
+                return 2 * self.GAMMA ** cubeta / (self.GAMMA + 1)
+        return None
+
+    def limites(self):
+        """(mínimo, máximo, mediana) aceptados para el grupo."""
+        q1, mediana, q3 = self.cuantil(0.25), self.cuantil(0.5), self.cuantil(0.75)
+        rango = np.log(q3) - np.log(q1)
+        minimo = min(q1 * np.exp(-AREA_ATIPICA_K * rango), mediana / AREA_ATIPICA_RAZON)
+        maximo = max(q3 * np.exp(AREA_ATIPICA_K * rango), mediana * AREA_ATIPICA_RAZON)
+        return minimo, maximo, mediana
+
+def claves_grupo_area(depto, mpio, vereda):
+    """(municipio, vereda) para agrupar áreas: códigos DANE recortados y vereda sin tildes,
+       mayúsculas ni espacios repetidos. (None, None) si falta el municipio.
+    """
+    depto = depto.strip() if isinstance(depto, str) else ""
+    mpio = mpio.strip() if isinstance(mpio, str) else ""
+    if not depto or not mpio:
+        return None, None
+    vereda = normalizar_similitud(clave_similitud(vereda)) if isinstance(vereda, str) else ""
+    return (depto, mpio), ((depto, mpio, vereda) if vereda else None)
+
+def grupos_area(df_raw):
+    """Código de grupo por fila y claves_grupo_area de cada grupo (se calcula una vez por combinación)."""
+    columnas = ["Cód DANE Depto", "Cód DANE Mpio", "Nombre Vereda"]
+    agrupado = df_raw[columnas].astype(object).groupby(columnas, dropna=False, sort=False)
+    primeras = agrupado.head(1)
+    claves = [claves_grupo_area(*c) for c in primeras.itertuples(index=False)]
+    return agrupado.ngroup().to_numpy(), claves
+
+def valor_area(texto):
+    """Área declarada positiva (con punto o coma decimal) o None."""
+    if not isinstance(texto, str):
+        return None
+    valor, _ = interpretar_area(texto.strip())
+    return valor if valor is not None and valor > 0 else None
+
+def estadisticas_area_por_lotes(lotes):
+    """IndiceGlobal solo con los sketches de áreas, fusionando lote por lote (DataFrames con
+       Área, Cód DANE Depto/Mpio y Nombre Vereda): memoria proporcional a grupos × cubetas.
+    """
+    indice = IndiceGlobal({"area_atipica"})
+    for lote in lotes:
+        indice.agregar_areas(lote)
+    return indice
+
+COLUMNAS_NOMBRE_PERSONA = ("Creado Por", "Modificado Por")
+
+# Reglas costosas con nombre propio: cada una depende de un índice sobre todo el archivo
+REGLAS_NOMBRADAS = {
+    "codigo_interno_duplicado": "Código Interno",
+    "nombre_predio_tokens": "Nombre Predio Jurídico",
+    "creado_por_variantes": "Creado Por",
+    "modificado_por_variantes": "Modificado Por",
+    "vereda_similar": "Nombre Vereda",
+    "codigo_sig_duplicado": "Código SIG Predio Jurídico",
+    "nombre_proyecto_similar": "Nombre Proyecto",
+    "nombre_predio_similar": "Nombre Predio Jurídico",
+    "creado_por_similar": "Creado Por",
+    "area_atipica": "Área Terreno Calculada Mts2",
+}
+REGLA_VARIANTES = {"Creado Por": "creado_por_variantes", "Modificado Por": "modificado_por_variantes"}
+
+class IndiceGlobal:
+    """Conteos de duplicados, variantes de nombres y veredas distintas.
+       Se construye una vez por archivo y se puede actualizar registro a registro
+       (agregar / quitar / actualizar) para validar ediciones sin recargar el dataset.
+       Solo se indexa lo que piden las reglas activas; las consultas de una regla
+       apagada responden como si no hubiera hallazgo.
+    """
+
+    def __init__(self, reglas=None):
+        self.reglas = set(REGLAS_NOMBRADAS if reglas is None else reglas)
+        self.codigo_interno = Counter()   # valor crudo → cantidad
+        self.codigo_sig = Counter()       # valor crudo → cantidad
+        self.nombres = {c: Counter() for c in COLUMNAS_NOMBRE_PERSONA}         # valor crudo → cantidad
+        self.grupos_nombre = {c: Counter() for c in COLUMNAS_NOMBRE_PERSONA}   # unidecode(valor).title() → valores distintos
+        self.veredas = {}                 # valor crudo → cantidad (en orden de aparición)
+        self.similitud = {c: Counter() for c in SIMILITUD_COLUMNAS}   # clave_similitud(valor) → cantidad
+        self._motores = {}                # columna → MotorSimilitud (se reconstruye si cambian los valores)
+        self._tokens_predio = {}
+        self.areas = defaultdict(SketchArea)   # (depto, mpio) y (depto, mpio, vereda) → SketchArea
+        self._limites_area = {}
+
+    @classmethod
+    def desde_dataframe(cls, df_raw, reglas=None):
+        indice = cls(reglas)
+        indice.agregar_lote(df_raw)
+        indice.precalcular()
+        return indice
+
+    def agregar_lote(self, df_raw):
+        """Suma un DataFrame (o un lote de filas, en el orden del archivo) a los índices.
+           Los lotes se pueden ir agregando sin tener el archivo completo en memoria;
+           al terminar se llama a precalcular().
+        """
+        if "codigo_interno_duplicado" in self.reglas:
+            self.codigo_interno.update(contar_valores(df_raw["Código Interno"]))
+        if "codigo_sig_duplicado" in self.reglas:
+            self.codigo_sig.update(contar_valores(df_raw["Código SIG Predio Jurídico"]))
+
+        for columna in COLUMNAS_NOMBRE_PERSONA:
+            if REGLA_VARIANTES[columna] not in self.reglas:
+                continue
+            conteos = contar_valores(df_raw[columna])
+            self.grupos_nombre[columna].update(clave_nombre(n) for n in conteos if n not in self.nombres[columna])
+            self.nombres[columna].update(conteos)
+
+        if "vereda_similar" in self.reglas:
+            conteos = contar_valores(df_raw["Nombre Vereda"])
+            for v in df_raw["Nombre Vereda"].dropna().unique():
+                self.veredas[v] = self.veredas.get(v, 0) + conteos[v]
+            self._motores.pop("Nombre Vereda", None)
+
+        for columna, (regla, *_) in SIMILITUD_COLUMNAS.items():
+            if regla in self.reglas:
+                claves = df_raw[columna].dropna().map(clave_similitud)
+                self.similitud[columna].update(contar_valores(claves[claves != ""]))
+                self._motores.pop(columna, None)
+
+        if "area_atipica" in self.reglas:
+            self.agregar_areas(df_raw)
+
+        # Tokens de Nombre Predio Jurídico: se tokeniza cada valor distinto una sola vez
+        if "nombre_predio_tokens" in self.reglas:
+            predios = pd.Series([v for v in df_raw["Nombre Predio Jurídico"].dropna().unique()
+                                 if v not in self._tokens_predio], dtype=object)
+            invalidos = calcular_tokens_invalidos_predio(predios)
+            self._tokens_predio.update({v: invalidos.get(i, []) for i, v in enumerate(predios)})
+
+    def precalcular(self):
+        """Resuelve en un solo lote las consultas de similitud de todos los valores indexados."""
+        if "vereda_similar" in self.reglas:
+            consultas = pd.Series(list(self.veredas), dtype=object).str.strip()
+            self.motor("Nombre Vereda").precalcular(consultas[consultas != ""].unique())
+        for columna, (regla, *_) in SIMILITUD_COLUMNAS.items():
+            if regla in self.reglas:
+                self.motor(columna).precalcular(self.similitud[columna])
+
+    # --- Actualización incremental ---
+    def agregar(self, raw):
+        self._ajustar(raw, 1)
+
+    def quitar(self, raw):
+        self._ajustar(raw, -1)
+
+    def actualizar(self, anterior, nuevo):
+        self.quitar(anterior)
+        self.agregar(nuevo)
+
+    def _ajustar(self, raw, delta):
+        for contador, columna, regla in ((self.codigo_interno, "Código Interno", "codigo_interno_duplicado"),
+                                         (self.codigo_sig, "Código SIG Predio Jurídico", "codigo_sig_duplicado")):
+            valor = raw.get(columna)
+            if regla in self.reglas and isinstance(valor, str):
+                contador[valor] += delta
+                if contador[valor] <= 0:
+                    del contador[valor]
+
+        for columna in COLUMNAS_NOMBRE_PERSONA:
+            valor = raw.get(columna)
+            if REGLA_VARIANTES[columna] in self.reglas and isinstance(valor, str):
+                conteo = self.nombres[columna]
+                conteo[valor] += delta
+                if delta > 0 and conteo[valor] == delta:  # valor distinto nuevo
+                    self.grupos_nombre[columna][clave_nombre(valor)] += 1
+                elif conteo[valor] <= 0:                  # dejó de existir
+                    del conteo[valor]
+                    self.grupos_nombre[columna][clave_nombre(valor)] -= 1
+
+        valor = raw.get("Nombre Vereda")
+        if "vereda_similar" in self.reglas and isinstance(valor, str):
+            cantidad = self.veredas.get(valor, 0) + delta
+            if cantidad > 0:
+                if valor not in self.veredas:
+                    self._motores.pop("Nombre Vereda", None)
+                self.veredas[valor] = cantidad
+            elif valor in self.veredas:
+                del self.veredas[valor]
+                self._motores.pop("Nombre Vereda", None)
+
+        for columna, (regla, *_) in SIMILITUD_COLUMNAS.items():
+            valor = raw.get(columna)
+            if regla not in self.reglas or not isinstance(valor, str) or not valor.strip():
+                continue
+            conteo = self.similitud[columna]
+            clave = clave_similitud(valor)
+            conteo[clave] += delta
+            if conteo[clave] <= 0:
+                del conteo[clave]
+                self._motores.pop(columna, None)
+            elif conteo[clave] == delta and delta > 0:
+                self._motores.pop(columna, None)
+
+        if "area_atipica" in self.reglas:
+            valor = valor_area(raw.get("Área Terreno Calculada Mts2"))
+            municipio, vereda = claves_grupo_area(raw.get("Cód DANE Depto"), raw.get("Cód DANE Mpio"),
+                                                  raw.get("Nombre Vereda"))
+            if valor is not None and municipio is not None:
+                cubeta = int(SketchArea.cubetas([valor])[0])
+                for clave in (municipio, vereda):
+                    if clave is not None:
+                        self.areas[clave].agregar(cubeta, delta)
+                        if self.areas[clave].total <= 0:
+                            del self.areas[clave]
+                self._limites_area = {}
+
+    def agregar_areas(self, df_raw):
+        """Suma las áreas de un DataFrame (o lote) a los sketches con un solo groupby por
+           grupo y cubeta; cada conteo se suma al sketch de su vereda y al de su municipio.
+        """
+        areas = df_raw["Área Terreno Calculada Mts2"].astype(object)
+        unicos = areas.dropna().unique()
+        valores = areas.map(dict(zip(unicos, map(valor_area, unicos))))
+        presentes = valores.notna()
+        if not presentes.any():
+            return
+        codigos, claves = grupos_area(df_raw[presentes])
+        tabla = pd.DataFrame({"grupo": codigos, "cubeta": SketchArea.cubetas(valores[presentes].to_numpy())})
+        for (grupo, cubeta), cantidad in tabla.groupby(["grupo", "cubeta"], sort=False).size().items():
+            municipio, vereda = claves[grupo]
+            if municipio is None:
+                continue
+            self.areas[municipio].agregar(int(cubeta), int(cantidad))
+            if vereda is not None:
+                self.areas[vereda].agregar(int(cubeta), int(cantidad))
+        self._limites_area = {}
+
+    def motor(self, columna):
+        """MotorSimilitud de la columna sobre sus valores distintos actuales."""
+        if columna not in self._motores:
+            if columna == "Nombre Vereda":
+                self._motores[columna] = MotorSimilitud(self.veredas, fuzz.token_sort_ratio, 85)
+            else:
+                _, scorer, umbral, procesador, bloque = SIMILITUD_COLUMNAS[columna]
+                self._motores[columna] = MotorSimilitud(self.similitud[columna], scorer, umbral, procesador, bloque)
+        return self._motores[columna]
+
+    # --- Consultas usadas por las reglas ---
+    def variantes_nombre(self, columna, val_limpio):
+        """Cantidad de valores distintos que se escriben igual sin tildes ni mayúsculas."""
+        if REGLA_VARIANTES[columna] not in self.reglas:
+            return 0
+        return self.grupos_nombre[columna][unidecode(val_limpio).title()]
+
+    def vereda_con_variantes(self, val_str):
+        """True si entre las 5 veredas más parecidas hay una ≥85 que no es el mismo texto."""
+        if "vereda_similar" not in self.reglas:
+            return False
+        # Mismo criterio que process.extract(limit=5): los 5 mejores, empates en orden de aparición
+        similares = self.motor("Nombre Vereda").vecinos(val_str)[:5]
+        return any(match.lower() != val_str.lower() for match, _ in similares)
+
+    def valor_con_variantes(self, columna, valor):
+        """True si otro valor distinto de la columna es casi igual (regla <columna>_similar)."""
+        if SIMILITUD_COLUMNAS[columna][0] not in self.reglas:
+            return False
+        return self.motor(columna).tiene_variante(clave_similitud(valor))
+
+    def limite_area(self, municipio, vereda):
+        """(nivel, mínimo, máximo, mediana) del grupo del registro, o None si no hay grupo suficiente."""
+        if (municipio, vereda) not in self._limites_area:
+            limite = None
+            for nivel, clave in (("vereda", vereda), ("municipio", municipio)):
+                sketch = self.areas.get(clave) if clave is not None else None
+                if sketch is not None and sketch.total >= AREA_ATIPICA_MIN_GRUPO:
+                    limite = (nivel, *sketch.limites())
+                    break
+            self._limites_area[(municipio, vereda)] = limite
+        return self._limites_area[(municipio, vereda)]
+
+    def area_atipica(self, depto, mpio, vereda, texto):
+        """(nivel, mediana) si el área declarada es atípica en su vereda o municipio, si no None."""
+        if "area_atipica" not in self.reglas:
+            return None
+        valor = valor_area(texto)
+        municipio, clave_vereda = claves_grupo_area(depto, mpio, vereda)
+        if valor is None or municipio is None:
+            return None
+        limite = self.limite_area(municipio, clave_vereda)
+        if limite is None:
+            return None
+        nivel, minimo, maximo, mediana = limite
+        return (nivel, mediana) if valor < minimo or valor > maximo else None
+
+    def areas_atipicas(self, df_raw, valores):
+        """Máscara vectorizada de area_atipica para valores ya interpretados (NaN = no evaluar)."""
+        if "area_atipica" not in self.reglas:
+            return pd.Series(False, index=df_raw.index)
+        codigos, claves = grupos_area(df_raw)
+        limites = [self.limite_area(*c) if c[0] is not None else None for c in claves]
+        minimo = np.array([l[1] if l else np.nan for l in limites])[codigos]
+        maximo = np.array([l[2] if l else np.nan for l in limites])[codigos]
+        return (valores < minimo) | (valores > maximo)
+
+    def tokens_predio(self, valor):
+        if "nombre_predio_tokens" not in self.reglas:
+            return []
+        tokens = self._tokens_predio.get(valor)
+        return tokens if tokens is not None else tokens_invalidos_valor(valor)
+
+def contar_valores(serie):
+    """value_counts como dict, sin las categorías que no aparecen (columnas category)."""
+    conteos = serie.value_counts()
+    return conteos[conteos > 0].to_dict()
+
+def clave_nombre(nombre):
+    return unidecode(str(nombre)).title()
+
+# ==========================
+# Registro de reglas vectorizadas
+# ==========================
+# Cada regla declara la columna que analiza, las columnas que lee, su observación, tipología y
+# prioridad, y dos formas de evaluarse: `prueba` sobre un registro (la referencia del motor
+# "filas", la API, Polars y DuckDB) y `lote` sobre las columnas como Series, una fila por valor
+# distinto (motor "columnas"). Son implementaciones independientes para que --equivalencia
+# compare una contra la otra. Las reglas se evalúan en orden de prioridad: una regla excluyente
+# que se cumple apaga las siguientes de su columna (un dato vacío no se revisa en formato), y
+# las que comparten `registro` se unen con "; " en un solo hallazgo. Agregar una regla es
+# registrarla; los motores no cambian.
+GENERAL_TOTALIDAD = "Inconsistencia Totalidad del Dato"
+GENERAL_ESTANDAR = "El Dato no guarda el estándar del Diccionario de Datos"
+
+class Regla:
+    """Regla de una columna para el motor de reglas (ver registrar_regla).
+       prueba(valor, crudo, raw, indice) → True o el texto de la observación si hay hallazgo.
+       lote(datos) → máscara, o (máscara, observación por valor).
+    """
+
+    def __init__(self, nombre, columna, observacion, general, tipologia, prioridad, prueba, lote,
+                 lee=None, excluye=False, registro=None, dato="crudo"):
+        self.nombre = nombre
+        self.columna = columna
+        self.observacion = observacion          # Observación Específica por defecto
+        self.general = general                  # Observación General
+        self.tipologia = tipologia
+        self.prioridad = prioridad              # menor = se evalúa y se reporta antes
+        self.prueba = prueba                    # un registro → hallazgo
+        self.lote = lote                        # Series por valor distinto → máscara
+        self.lee = list(lee or [columna])       # columnas crudas que recibe el lote
+        self.excluye = excluye                  # si se cumple, apaga las de menor prioridad
+        self.registro = registro or nombre      # reglas con el mismo registro → un solo hallazgo
+        self.dato = dato                        # Dato Analizado: "vacio", "espacio", "crudo" o "limpio"
+
+    def evaluar(self, valor, raw, indice):
+        """Observación Específica si la regla se cumple en el registro, si no None."""
+        resultado = self.prueba(valor, raw.get(self.columna), raw, indice)
+        if not resultado:
+            return None
+        return resultado if isinstance(resultado, str) else self.observacion
+
+REGLAS_COLUMNA = defaultdict(list)   # columna → reglas ordenadas por prioridad
+
+def registrar_regla(regla):
+    reglas = REGLAS_COLUMNA[regla.columna]
+    if any(r.nombre == regla.nombre for r in reglas):
+        raise ValueError(f"Regla duplicada: {regla.nombre}")
+    reglas.append(regla)
+    reglas.sort(key=lambda r: r.prioridad)
+    return regla
+
+def registrar_reglas(reglas):
+    for regla in reglas:
+        registrar_regla(regla)
+
+def columnas_reglas(columna):
+    """Columnas crudas que leen las reglas de la columna (la propia primero)."""
+    lee = {c for r in REGLAS_COLUMNA[columna] for c in r.lee}
+    return [columna] + [c for c in columnas_objetivo if c in lee and c != columna]
+
+def clave_regla(columna):
+    return re.sub(r"[^a-z0-9]+", "_", unidecode(columna).lower()).strip("_")
+
+# ---- Funciones de apoyo para reglas ----
+
+def _texto(valor):
+    return str(valor).strip()
+
+def _son_digitos(texto, n):
+    return texto.isdigit() and len(texto) == n
+
+def _mascara(serie):
+    """Serie booleana con nulos → arreglo bool (nulo = sin hallazgo)."""
+    return serie.to_numpy(dtype=object, na_value=False).astype(bool)
+
+def _recortado(d):
+    return d["crudo"].str.strip()
+
+def _digitos(serie, n):
+    return _mascara(serie.str.isdigit()) & _mascara(serie.str.len().eq(n))
+
+def prueba_vacio(valor, crudo, raw, indice):
+    return pd.isna(valor)
+
+def prueba_espacio(valor, crudo, raw, indice):
+    return valor == "<ESPACIO>"
+
+def lote_vacio(d):
+    return d["limpio"].isna().to_numpy()
+
+def lote_espacio(d):
+    return _mascara(d["limpio"].eq("<ESPACIO>"))
+
+def reglas_totalidad(columna, prueba=prueba_vacio, lote=lote_vacio):
+    """Dato sin diligenciar / solo espacio: excluyentes, antes que cualquier otra regla."""
+    prefijo = clave_regla(columna)
+    return [
+        Regla(f"{prefijo}_vacio", columna, "Dato sin diligenciar", GENERAL_TOTALIDAD, "Forma", 0,
+              prueba, lote, excluye=True, dato="vacio"),
+        Regla(f"{prefijo}_solo_espacio", columna,
+              f"Dato diligenciado únicamente con espacio, Dato no es coherente con el {columna}",
+              GENERAL_TOTALIDAD, "Forma", 1, prueba_espacio, lote_espacio, excluye=True, dato="espacio"),
+    ]
+
+# Espacios problemáticos: (clave, texto, prueba sobre el texto, prueba sobre la Series)
+ERRORES_ESPACIOS = [
+    ("inicio", "Espacio al inicio", lambda t: t.startswith(" "), lambda c: c.str.startswith(" ", na=False)),
+    ("final", "Espacio al final", lambda t: t.endswith(" "), lambda c: c.str.endswith(" ", na=False)),
+    ("multiples", "Múltiples espacios", lambda t: "  " in t, lambda c: c.str.contains("  ", regex=False, na=False)),
+    ("saltos", "Saltos de línea", lambda t: "\n" in t or "\r" in t, lambda c: c.str.contains(r"[\n\r]", na=False)),
+]
+
+def reglas_espacios(columna, prioridad, registro="estandar"):
+    """Espacios problemáticos del texto original, unidos en un solo hallazgo de forma."""
+    prefijo = clave_regla(columna)
+    return [
+        Regla(f"{prefijo}_espacio_{clave}", columna, texto, GENERAL_ESTANDAR, "Forma", prioridad + i,
+              lambda v, c, *_, prueba=prueba: isinstance(c, str) and prueba(c),
+              lambda d, serie=serie: _mascara(serie(d["crudo"])), registro=registro)
+        for i, (clave, texto, prueba, serie) in enumerate(ERRORES_ESPACIOS)
+    ]
+
+# ---- Motor ----
+
+def hallazgos_reglas(columna, disparos, datos, id_val=None):
+    """Hallazgos a partir de las reglas cumplidas [(regla, texto)] en orden de prioridad;
+       datos = tipo de Dato Analizado → valor.
+    """
+    hallazgos = {}
+    for regla, texto in disparos:
+        hallazgo = hallazgos.get(regla.registro)
+        if hallazgo is not None:
+            hallazgo["Observación Específica"] += f"; {texto}"
+            continue
+        hallazgos[regla.registro] = {
+            "ID": id_val,
+            "Columna Analizada": columna,
+            "Dato Analizado": datos[regla.dato],
+            "Observación General": regla.general,
+            "Observación Específica": texto,
+            "Tipología": regla.tipologia,
+        }
+    return list(hallazgos.values())
+
+def validador_de_reglas(columna):
+    """Versión por registro del bloque de reglas de la columna (motor de referencia,
+       Polars, DuckDB y API): evalúa `prueba` regla por regla, sin pandas.
+    """
+    reglas = REGLAS_COLUMNA[columna]
+
+    def validar_columna(id_val, raw, fila, indice):
+        valor = fila[columna]
+        disparos = []
+        for regla in reglas:
+            texto = regla.evaluar(valor, raw, indice)
+            if texto is None:
+                continue
+            disparos.append((regla, texto))
+            if regla.excluye:
+                break
+        if not disparos:
+            return []
+        datos = {"vacio": "", "espacio": " ", "crudo": raw.get(columna), "limpio": str(valor)}
+        return hallazgos_reglas(columna, disparos, datos, id_val)
+    return validar_columna
+
+def plantillas_reglas(columna, unicos, indice):
+    """Hallazgos (sin ID) de cada fila de `unicos`: valores distintos de las columnas que leen
+       las reglas, evaluados con `lote` y con la prioridad y la exclusión ya resueltas.
+    """
+    crudo = unicos[columna].astype(object)
+    limpio = pd.Series([limpiar_registro({columna: v})[columna] for v in crudo], index=unicos.index, dtype=object)
+    d = {**{c: unicos[c].astype(object) for c in unicos.columns}, "crudo": crudo, "limpio": limpio, "indice": indice}
+
+    activas = np.ones(len(unicos), dtype=bool)
+    disparos = [[] for _ in range(len(unicos))]
+    for regla in REGLAS_COLUMNA[columna]:
+        if not activas.any():
+            break
+        resultado = regla.lote(d)
+        mascara, textos = resultado if isinstance(resultado, tuple) else (resultado, None)
+        mascara = np.asarray(mascara, dtype=bool) & activas
+        if textos is not None:
+            textos = np.asarray(textos, dtype=object)
+        if regla.excluye:
+            activas &= ~mascara
+        for i in np.flatnonzero(mascara):
+            disparos[i].append((regla, regla.observacion if textos is None else textos[i]))
+
+    return [
+        hallazgos_reglas(columna, cumplidas, {
+            "vacio": "", "espacio": " ", "crudo": crudo.iat[i], "limpio": str(limpio.iat[i])
+        }) if cumplidas else []
+        for i, cumplidas in enumerate(disparos)
+    ]
+
+def lote_de_reglas(columna):
+    """Versión por lote: las reglas se evalúan una vez por combinación distinta de las columnas
+       que leen (las categorías si la columna es category) y cada hallazgo se copia a sus filas.
+    """
+    def validar_lote(df_raw, df, indice):
+        lee = columnas_reglas(columna)
+        if len(lee) == 1:
+            crudos = df_raw[columna]
+            if isinstance(crudos.dtype, pd.CategoricalDtype):
+                codigos, valores = crudos.cat.codes.to_numpy(), crudos.cat.categories
+            else:
+                codigos, valores = pd.factorize(crudos)
+            # Código -1 = nulo: va en la primera fila de unicos
+            unicos = pd.DataFrame({columna: [np.nan, *valores]}, dtype=object)
+            codigos = codigos + 1
+        else:
+            grupos = df_raw[lee].astype(object).groupby(lee, dropna=False, sort=False)
+            codigos = grupos.ngroup().to_numpy()
+            unicos = grupos.head(1)[lee].reset_index(drop=True)
+
+        plantillas = plantillas_reglas(columna, unicos, indice)
+        con_obs = np.array([bool(p) for p in plantillas])[codigos]
+        registros = []
+        for id_val, codigo in zip(df["ID"].to_numpy()[con_obs], codigos[con_obs]):
+            registros.extend({**obs, "ID": id_val} for obs in plantillas[codigo])
+        return registros
+    return validar_lote
+
 # ==========================
 # Construir reporte por columna
 # ==========================
 
-# 🔹 Validaciones columna por columna:
-for idx, fila in df.iterrows():
-    id_val = fila["ID"]
+# ---- Nombre Proyecto ----
 
-    # ---- Nombre Proyecto ----
+SIGLAS_NEGOCIO = ["SIS", "VEX", "VAS", "VRC", "VRS", "VRO", "OXY", "VFS", "VPI"]
 
-    val_raw = df_raw.loc[idx, "Nombre Proyecto"]
-    val = fila["Nombre Proyecto"]
+def validar_nombre_proyecto(id_val, raw, fila, indice):
+    registros = []
 
-    obs_nom_proyect = []  # 👉 aquí guardamos observaciones específicas de Nombre Proyecto
+    val_raw = raw["Nombre Proyecto"]
+    val = fila["Nombre Proyecto"]
 
     if pd.isna(val_raw) or str(val_raw).strip() == "":  # 🚨 Vacío real
         obs = {
@@ -186,7 +1330,6 @@ for idx, fila in df.iterrows():
             "Tipología": "Fondo"
         }
         registros.append(obs)
-        obs_nom_proyect.append(obs)
 
     elif val_raw == "<ESPACIO>":  # solo espacios
         obs = {
@@ -198,7 +1341,6 @@ for idx, fila in df.iterrows():
             "Tipología": "Forma"
         }
         registros.append(obs)
-        obs_nom_proyect.append(obs)
 
     elif isinstance(val_raw, str):
         observaciones = []
@@ -223,10 +1365,13 @@ for idx, fila in df.iterrows():
                 observaciones.append("Estructura no cumple con el Diccionario de Datos")
             else:
                 negocio, proyecto = partes
-                siglas_negocio = ["SIS", "VEX", "VAS", "VRC", "VRS", "VRO", "OXY", "VFS", "VPI"]
-                if negocio not in siglas_negocio:
+                if negocio not in SIGLAS_NEGOCIO:
                     observaciones.append("La sigla del Negocio no se encuentra de acuerdo con el Diccionario de Datos")
 
+        # 🚨 Variantes casi iguales de otro Nombre Proyecto
+        if indice.valor_con_variantes("Nombre Proyecto", val_raw):
+            observaciones.append("Estandarizar Nombre Proyecto a un único registro")
+
         # 🚨 Si hubo observaciones, se registran todas juntas
         if observaciones:
             obs = {
@@ -238,15 +1383,17 @@ for idx, fila in df.iterrows():
                 "Tipología": "Forma"
             }
             registros.append(obs)
-            obs_nom_proyect.append(obs)
-    # Guardar las observaciones de Nombre Proyecto en el registro
-    fila["Obs_Nom_Proyect"] = "; ".join(o["Observación Específica"] for o in obs_nom_proyect) if obs_nom_proyect else ""
 
-    # ---- Fecha Captura ----
-    
+    return registros
+
+# ---- Fecha Captura ----
+
+def validar_fecha_captura(id_val, raw, fila, indice):
+    registros = []
+
     fecha_revision = datetime.today()  # 👈 se usa la fecha actual
 
-    val_raw = df_raw.loc[idx, "Fecha Captura"]   # texto original
+    val_raw = raw["Fecha Captura"]   # texto original
     parsed = parse_date_strict(val_raw)
 
     if pd.isna(parsed):  # vacío real
@@ -320,7 +1467,7 @@ for idx, fila in df.iterrows():
             errores_espacios.append("Múltiples espacios")
         if "\n" in val_raw or "\r" in val_raw:
             errores_espacios.append("Saltos de línea")
-    
+
         if errores_espacios:
             registros.append({
                 "ID": id_val,
@@ -331,12 +1478,18 @@ for idx, fila in df.iterrows():
                 "Tipología": "Forma"
         }) 
 
-    # ---- Código Interno ----
-    val_raw = df_raw.loc[idx, "Código Interno"]   # dato original sin modificar
+    return registros
+
+# ---- Código Interno ----
+
+def validar_codigo_interno(id_val, raw, fila, indice):
+    registros = []
+
+    val_raw = raw["Código Interno"]   # dato original sin modificar
     val = fila["Código Interno"]
 
     # Traer el Nombre Proyecto asociado
-    nombre_proyecto_ref = df_raw.loc[idx, "Nombre Proyecto"]
+    nombre_proyecto_ref = raw["Nombre Proyecto"]
 
     # 🚨 Caso 1: Vacíos / Totalidad → prioridad absoluta
     if pd.isna(val):
@@ -372,7 +1525,7 @@ for idx, fila in df.iterrows():
             if "\n" in val_raw or "\r" in val_raw: errores_forma.add("Saltos de línea")
 
         # --- Validación de duplicidad
-        if (df_raw["Código Interno"] == val_raw).sum() > 1:
+        if indice.codigo_interno[val_raw] > 1:
             es_duplicado = True
             errores_forma.add("Código Interno duplicado")
 
@@ -384,8 +1537,7 @@ for idx, fila in df.iterrows():
             sigla, proyecto, pj_consec = partes
 
             # Validación sigla
-            siglas_validas = ["SIS", "VEX", "VAS", "VRC", "VRS", "VRO", "OXY", "VFS", "VPI"]
-            if sigla not in siglas_validas:
+            if sigla not in SIGLAS_NEGOCIO:
                 errores_forma.add("Código Interno no conserva la estructura definida en el Diccionario de Datos")
 
             # Validación segunda parte (Proyecto)
@@ -425,69 +1577,32 @@ for idx, fila in df.iterrows():
                 "Tipología": "Fondo" if es_duplicado else "Forma"
             })
 
+    return registros
 
-    # ---- Símbolo ----
-
-    val_raw = df_raw.loc[idx, "Símbolo"]
-    val = fila["Símbolo"]
-    
-    if pd.isna(val) or str(val_raw).strip() == "": # Vacio
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Símbolo",
-            "Dato Analizado": "",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato sin diligenciar",
-            "Tipología": "Forma"
-        })
-
-    elif val == "<ESPACIO>":  # solo espacios
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Símbolo",
-            "Dato Analizado": " ",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Símbolo",
-            "Tipología": "Forma"
-        })
-
-    elif isinstance(val_raw, str):  # 🚨 Validación de espacios problemáticos
-        errores = []
-        val_clean = val_raw.strip()
-
-        if val_raw.startswith(" "):
-            errores.append("Espacio al inicio")
-        if val_raw.endswith(" "):
-            errores.append("Espacio al final")
-        if "  " in val_raw:
-            errores.append("Múltiples espacios")
-        if "\n" in val_raw or "\r" in val_raw:
-            errores.append("Saltos de línea")
+# ---- Símbolo ----
 
-     # 🚨 Validación "No Aplica"
+registrar_reglas([
+    *reglas_totalidad("Símbolo",
+                      prueba=lambda v, c, *_: pd.isna(v) or _texto(c) == "",
+                      lote=lambda d: lote_vacio(d) | _mascara(_recortado(d).eq(""))),
+    *reglas_espacios("Símbolo", 10),
+    Regla("simbolo_formato_titulo", "Símbolo", "Estandarizar con formato tipo título", GENERAL_ESTANDAR, "Forma", 20,
+          lambda v, c, *_: isinstance(c, str) and c.strip().lower() == "no aplica" and c.strip() != "No Aplica",
+          lambda d: _mascara(_recortado(d).str.lower().eq("no aplica") & _recortado(d).ne("No Aplica")),
+          registro="estandar"),
+    Regla("simbolo_no_aplica", "Símbolo", "Diligenciar No Aplica", GENERAL_ESTANDAR, "Forma", 21,
+          lambda v, c, *_: isinstance(c, str) and c.strip().lower() != "no aplica",
+          lambda d: _mascara(_recortado(d).str.lower().ne("no aplica")), registro="estandar"),
+])
 
-        if val_clean == "No Aplica":
-            pass  # ✅ válido, no genera inconsistencia
+validar_simbolo = validador_de_reglas("Símbolo")
 
-        elif val_clean.lower() == "no aplica":
-            errores.append("Estandarizar con formato tipo título")
+# ---- Nombre Predio Jurídico ----
 
-        else:
-            errores.append("Diligenciar No Aplica")    
-    
-        if errores:
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Símbolo",
-                "Dato Analizado": val_raw,
-                "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                "Observación Específica": "; ".join(errores),
-                "Tipología": "Forma"
-        }) 
-                  
-    # ---- Nombre Predio Jurídico ----
+def validar_nombre_predio(id_val, raw, fila, indice):
+    registros = []
 
-    val_raw = df_raw.loc[idx, "Nombre Predio Jurídico"]
+    val_raw = raw["Nombre Predio Jurídico"]
     val = fila["Nombre Predio Jurídico"]
 
     if pd.isna(val):  # 🚨 Vacío
@@ -512,7 +1627,6 @@ for idx, fila in df.iterrows():
 
     elif isinstance(val_raw, str):
         errores = []
-        val_clean = val_raw.strip()
 
         # 🚨 Saltos de línea / tabulaciones
         if "\n" in val_raw or "\r" in val_raw or "\t" in val_raw:
@@ -526,38 +1640,12 @@ for idx, fila in df.iterrows():
         if "  " in val_raw:
             errores.append("Múltiples espacios")
 
-        # --- Normalización para tokens ---
-        val_norm = re.sub(r'^[\s\-\.,;:]+', '', val_clean)  # quitar puntuación inicial
-        val_norm = re.sub(r'[;,:\.\-]+$', '', val_norm)     # quitar puntuación final
-        val_norm = re.sub(r'\s+', ' ', val_norm).strip()
-
-        tokens = [t.strip(" ,.") for t in val_norm.split(" ") if t.strip() != ""]
+        # 🚨 Variantes casi iguales de otro predio (mismos números)
+        if indice.valor_con_variantes("Nombre Predio Jurídico", val_raw):
+            errores.append("Estandarizar Nombre Predio Jurídico a un único registro")
 
-        # --- Patrones y listas permitidas ---
-        allowed_lower = {
-            "de","del","la","las","los","el","y","o","por","en","sin","predio","urbano",
-            "vía","via","al","san","santa","corregimiento","vereda","sector","urbanización",
-            "urbanizacion","barrio"
-        }
-        roman_pattern = re.compile(r'^(?:I|II|III|IV|V|VI|VII|VIII|IX|X)$', re.IGNORECASE)
-        title_pattern = re.compile(r'^[A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+(?:-[A-ZÁÉÍÓÚÑÜ][a-záéíóúñü]+)*$')
-        num_pattern = re.compile(r'^\d+[A-Z]?$')   # 13, 13A, 04
-        single_upper = re.compile(r'^[A-Z]$')     # B, H, etc.
-
-        invalid_tokens = []
-        for tok in tokens:
-            low = tok.lower()
-            if low in allowed_lower:
-                continue
-            if roman_pattern.match(tok):
-                continue
-            if num_pattern.match(tok):
-                continue
-            if single_upper.match(tok):
-                continue
-            if title_pattern.match(tok):
-                continue
-            invalid_tokens.append(tok)
+        # --- Tokens inválidos (precalculados para toda la columna) ---
+        invalid_tokens = indice.tokens_predio(val_raw)
 
         # --- Resultado ---
         if errores or invalid_tokens:
@@ -575,254 +1663,162 @@ for idx, fila in df.iterrows():
                 "Tipología": "Forma"
             })
 
-    # ---- Escala ----
+    return registros
+
+# ---- Escala ----
+
+registrar_reglas([
+    *reglas_totalidad("Escala"),
+    Regla("escala_con_prefijo", "Escala", "Solo debe diligenciarse el Número de la Escala",
+          GENERAL_ESTANDAR, "Forma", 10,
+          lambda v, c, *_: _texto(c) in {"1:10000", "1:25000"},
+          lambda d: _mascara(_recortado(d).isin(["1:10000", "1:25000"])), excluye=True),
+    Regla("escala_otro_prefijo", "Escala",
+          "Solo debe diligenciarse el Número de la Escala, Escala IGAC para predios rurales produce cartografía de 10000 y 25000",
+          GENERAL_ESTANDAR, "Forma", 11,
+          lambda v, c, *_: _texto(c).startswith("1:"),
+          lambda d: _mascara(_recortado(d).str.startswith("1:", na=False)), excluye=True),
+    Regla("escala_no_numerica", "Escala", "Dato no corresponde al valor de una escala",
+          "Inconsistencia Lógica del Dato", "Fondo", 12,
+          lambda v, c, *_: not _texto(c).isdigit(),
+          lambda d: ~_mascara(_recortado(d).str.isdigit()), excluye=True),
+    Regla("escala_dominio", "Escala", "Escala IGAC para predios rurales produce cartografía de 10000 y 25000",
+          "Inconsistencia Lógica del Dato", "Fondo", 13,
+          lambda v, c, *_: _texto(c) not in {"10000", "25000"},
+          lambda d: ~_mascara(_recortado(d).isin(["10000", "25000"]))),
+])
+
+validar_escala = validador_de_reglas("Escala")
+
+# ---- Fuente Información ----
+
+FUENTES_PERMITIDAS = [
+    "VIT - Transporte",
+    "ECP - Seguridad Fisica",
+    "IGAC",
+    "IDEAM",
+    "Ministerio de Ambiente",
+    "Otra Fuente",
+    "ECP - Suministro y Mercadeo",
+    "DANE",
+    "ECP - Inmobiliario",
+    "ECP - Social",
+    "ECP - Ambiental",
+    "Ministerio de Interior y Justicia",
+    "VAS - Asociados",
+    "Diseños Obra Civil",
+    "ECP - Refinacion y Petroquimica",
+    "Informacion de Campo",
+    "VEX - Exploracion",
+    "VPR - Produccion",
+    "P8 - Gestion Documental",
+    "Depuracion Poligonos SIGDI",
+    "Levantamiento Topografico",
+    "Trabajo Campo (GPS)",
+    "Poligono Google Earth",
+    "Poligono IGAC",
+    "ECP - Dato Fundamental"
+]
 
-    val_raw = df_raw.loc[idx, "Escala"]
-    val = fila["Escala"]
+FUENTES_RESTRINGIDAS_PREDIOS = [
+    "Diseños Obra Civil",
+    "ECP - Dato Fundamental",
+    "Poligono Google Earth",
+    "VEX - Exploracion",
+    "VPR - Produccion"
+]
 
-    if pd.isna(val):  # 🚨 Vacío
+registrar_reglas([
+    Regla("fuente_informacion_vacio", "Fuente Información", "Dato sin diligenciar", GENERAL_TOTALIDAD, "Forma", 0,
+          prueba_vacio, lote_vacio, excluye=True, dato="vacio"),
+    Regla("fuente_informacion_solo_espacios", "Fuente Información", "Dato diligenciado únicamente con espacios",
+          GENERAL_TOTALIDAD, "Forma", 1,
+          lambda v, c, *_: isinstance(c, str) and c.strip() == "",
+          lambda d: _mascara(_recortado(d).eq("")), excluye=True),
+    *reglas_espacios("Fuente Información", 10),
+    Regla("fuente_informacion_dominio", "Fuente Información",
+          "Valores no se encuentran en los dominios del diccionario de datos",
+          "El Dato no guarda el estandar del Diccionario de Datos", "Forma", 20,
+          lambda v, c, *_: isinstance(c, str) and c.strip() not in FUENTES_PERMITIDAS,
+          lambda d: ~_mascara(_recortado(d).isin(FUENTES_PERMITIDAS))),
+    Regla("fuente_informacion_restringida", "Fuente Información", "Dominio no es válido para captura de predios",
+          "Inconsistencia Logica del Dato", "Fondo", 21,
+          lambda v, c, *_: isinstance(c, str) and c.strip() in FUENTES_RESTRINGIDAS_PREDIOS,
+          lambda d: _mascara(_recortado(d).isin(FUENTES_RESTRINGIDAS_PREDIOS))),
+])
+
+validar_fuente_informacion = validador_de_reglas("Fuente Información")
+
+# ---- Creado Por ----
+
+def validar_creado_por(id_val, raw, fila, indice):
+    registros = []
+
+    val_raw = raw["Creado Por"]
+    val = fila["Creado Por"]
+
+    if pd.isna(val):  # Vacío
         registros.append({
             "ID": id_val,
-            "Columna Analizada": "Escala",
+            "Columna Analizada": "Creado Por",
             "Dato Analizado": "",
             "Observación General": "Inconsistencia Totalidad del Dato",
             "Observación Específica": "Dato sin diligenciar",
             "Tipología": "Forma"
         })
 
-    elif val == "<ESPACIO>":  # 🚨 Solo espacios
+    elif val == "<ESPACIO>":  # solo espacios
         registros.append({
             "ID": id_val,
-            "Columna Analizada": "Escala",
+            "Columna Analizada": "Creado Por",
             "Dato Analizado": " ",
             "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Escala",
+            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Creado Por",
             "Tipología": "Forma"
         })
 
-    else:
-        val_clean = str(val_raw).strip()
-
-        # 🚨 Caso exacto válido
-        if val_clean in {"10000", "25000"}:
-            pass  # ✅ válido
+    elif isinstance(val_raw, str):
 
-        # 🚨 Caso 1:10000 o 1:25000 → error de forma
-        elif val_clean in {"1:10000", "1:25000"}:
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Escala",
-                "Dato Analizado": val_raw,
-                "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                "Observación Específica": "Solo debe diligenciarse el Número de la Escala",
-                "Tipología": "Forma"
-            })
+        # Normalización
+        val_limpio = " ".join(val_raw.strip().split())
+        val_lower = val_limpio.lower()
 
-        # 🚨 Otros casos que empiezan con 1: → error de forma + aclaración IGAC
-        elif val_clean.startswith("1:"):
+        # ------------------------------
+        # 🚨 Casos especiales (registro aparte)
+        # ------------------------------
+        if (
+            val_lower == "saneamiento p8 fase i"
+            or val_lower == "levadata - saneamiento p8 fase i"
+            or val_lower == "no aplica"
+            or val_lower == "migracion lci"
+            or val_lower in ["sin informacion", "sin información", "sin info"]
+            or re.match(r"^c\d{6,}[a-zA-Z]?$", val_limpio.strip(), re.IGNORECASE)   # Códigos tipo C102627Q
+            or re.match(r"^usuario con registro c\d{6,}[a-zA-Z]?$", val_limpio.strip(), re.IGNORECASE) # Usuario con registro C101848W
+            or len(val_limpio.split()) == 1  # 👈 solo una palabra
+        ):
             registros.append({
                 "ID": id_val,
-                "Columna Analizada": "Escala",
-                "Dato Analizado": val_raw,
-                "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                "Observación Específica": "Solo debe diligenciarse el Número de la Escala, Escala IGAC para predios rurales produce cartografía de 10000 y 25000",
-                "Tipología": "Forma"
-            })
-
-        # 🚨 Si es texto no numérico → inconsistencia lógica especial
-        elif not val_clean.isdigit():
-               registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Escala",
+                "Columna Analizada": "Creado Por",
                 "Dato Analizado": val_raw,
-                "Observación General": "Inconsistencia Lógica del Dato",
-                "Observación Específica": "Dato no corresponde al valor de una escala",
+                "Observación General": "Inconsistencia Logica del Dato",
+                "Observación Específica": "Capturar nombre completo, tener en cuenta que el dato entre el Property y EditPlot debe ser en creación el mismo y debe estar en formato tipo título",
                 "Tipología": "Fondo"
             })
 
-        # 🚨 Otros valores numéricos distintos a 10000/25000 → inconsistencia lógica
+        # ------------------------------
+        # 🚨 Otras validaciones (Formato, espacios, estandarización)
+        # ------------------------------
         else:
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Escala",
-                "Dato Analizado": val_raw,
-                "Observación General": "Inconsistencia Lógica del Dato",
-                "Observación Específica": "Escala IGAC para predios rurales produce cartografía de 10000 y 25000",
-                "Tipología": "Fondo"
-            })
-                                    
-    # ---- Fuente Información ----
-    val_raw = df_raw.loc[idx, "Fuente Información"]
-    val = fila["Fuente Información"]
-
-    dominios_permitidos = [
-        "VIT - Transporte",
-        "ECP - Seguridad Fisica",
-        "IGAC",
-        "IDEAM",
-        "Ministerio de Ambiente",
-        "Otra Fuente",
-        "ECP - Suministro y Mercadeo",
-        "DANE",
-        "ECP - Inmobiliario",
-        "ECP - Social",
-        "ECP - Ambiental",
-        "Ministerio de Interior y Justicia",
-        "VAS - Asociados",
-        "Diseños Obra Civil",
-        "ECP - Refinacion y Petroquimica",
-        "Informacion de Campo",
-        "VEX - Exploracion",
-        "VPR - Produccion",
-        "P8 - Gestion Documental",
-        "Depuracion Poligonos SIGDI",
-        "Levantamiento Topografico",
-        "Trabajo Campo (GPS)",
-        "Poligono Google Earth",
-        "Poligono IGAC",
-        "ECP - Dato Fundamental"
-    ]
-
-    dominios_restringidos_predios = [
-        "Diseños Obra Civil",
-        "ECP - Dato Fundamental",
-        "Poligono Google Earth",
-        "VEX - Exploracion",
-        "VPR - Produccion"
-    ]
+            observaciones = []
 
-    if pd.isna(val):  # 🚨 Vacío
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Fuente Información",
-            "Dato Analizado": "",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato sin diligenciar",
-            "Tipología": "Forma"
-        })
+            # Validación Formato Título (respetando tildes)
+            if val_limpio != val_limpio.title():
+                observaciones.append("Errores en Formato")
 
-    elif isinstance(val_raw, str) and val_raw.strip() == "":  # 🚨 Solo espacios
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Fuente Información",
-            "Dato Analizado": val_raw,
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacios",
-            "Tipología": "Forma"
-        })
-
-    elif isinstance(val_raw, str):  # 🚨 Validación de espacios problemáticos
-        errores_espacios = []
-        if val_raw.startswith(" "):
-            errores_espacios.append("Espacio al inicio")
-        if val_raw.endswith(" "):
-            errores_espacios.append("Espacio al final")
-        if "  " in val_raw:
-            errores_espacios.append("Múltiples espacios")
-        if "\n" in val_raw or "\r" in val_raw:
-            errores_espacios.append("Saltos de línea")
-
-        if errores_espacios:
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Fuente Información",
-                "Dato Analizado": val_raw,
-                "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                "Observación Específica": "; ".join(errores_espacios),
-                "Tipología": "Forma"
-            })
-
-        # 🚨 Validación de dominios permitidos
-        if val_raw.strip() not in dominios_permitidos:
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Fuente Información",
-                "Dato Analizado": val_raw,
-                "Observación General": "El Dato no guarda el estandar del Diccionario de Datos",
-                "Observación Específica": "Valores no se encuentran en los dominios del diccionario de datos",
-                "Tipología": "Forma"
-            })
-
-        # 🚨 Validación de dominios restringidos para predios
-        if val_raw.strip() in dominios_restringidos_predios:
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Fuente Información",
-                "Dato Analizado": val_raw,
-                "Observación General": "Inconsistencia Logica del Dato",
-                "Observación Específica": "Dominio no es válido para captura de predios",
-                "Tipología": "Fondo"
-            })
-                                                 
-    # ---- Creado Por ----
-    val_raw = df_raw.loc[idx, "Creado Por"]
-    val = fila["Creado Por"]
-
-    if pd.isna(val):  # Vacío
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Creado Por",
-            "Dato Analizado": "",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato sin diligenciar",
-            "Tipología": "Forma"
-        })
-
-    elif val == "<ESPACIO>":  # solo espacios
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Creado Por",
-            "Dato Analizado": " ",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Creado Por",
-            "Tipología": "Forma"
-        })
-
-    elif isinstance(val_raw, str):
-
-        # Normalización
-        val_limpio = " ".join(val_raw.strip().split())
-        val_lower = val_limpio.lower()
-
-        # ------------------------------
-        # 🚨 Casos especiales (registro aparte)
-        # ------------------------------
-        if (
-            val_lower == "saneamiento p8 fase i"
-            or val_lower == "levadata - saneamiento p8 fase i"
-            or val_lower == "no aplica"
-            or val_lower == "migracion lci"
-            or val_lower in ["sin informacion", "sin información", "sin info"]
-            or re.match(r"^c\d{6,}[a-zA-Z]?$", val_limpio.strip(), re.IGNORECASE)   # Códigos tipo C102627Q
-            or re.match(r"^usuario con registro c\d{6,}[a-zA-Z]?$", val_limpio.strip(), re.IGNORECASE) # Usuario con registro C101848W
-            or len(val_limpio.split()) == 1  # 👈 solo una palabra
-        ):
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "Creado Por",
-                "Dato Analizado": val_raw,
-                "Observación General": "Inconsistencia Logica del Dato",
-                "Observación Específica": "Capturar nombre completo, tener en cuenta que el dato entre el Property y EditPlot debe ser en creación el mismo y debe estar en formato tipo título",
-                "Tipología": "Fondo"
-            })
-
-        # ------------------------------
-        # 🚨 Otras validaciones (Formato, espacios, estandarización)
-        # ------------------------------
-        else:
-            observaciones = []
-
-            # Validación Formato Título (respetando tildes)
-            if val_limpio != val_limpio.title():
-                observaciones.append("Errores en Formato")
-
-            # Detección de variantes similares para estandarización
-            val_normalizada = unidecode(val_limpio).title()
-            nombres_existentes = df_raw["Creado Por"].dropna().unique()
-            coincidencias = [n for n in nombres_existentes if unidecode(str(n)).title() == val_normalizada]
-
-            if len(coincidencias) > 1:
-                observaciones.append("Estandarizar Nombre a un solo registro")
+            # Detección de variantes similares para estandarización
+            if (indice.variantes_nombre("Creado Por", val_limpio) > 1
+                    or indice.valor_con_variantes("Creado Por", val_limpio)):
+                observaciones.append("Estandarizar Nombre a un solo registro")
 
             # Validación de espacios
             if val_raw.startswith(" "):
@@ -845,12 +1841,16 @@ for idx, fila in df.iterrows():
                     "Tipología": "Forma"
                 })
 
-    # ---- Fecha Última Actualización ----
-     
-    from datetime import datetime
+    return registros
+
+# ---- Fecha Última Actualización ----
+
+def validar_fecha_ultima_actualizacion(id_val, raw, fila, indice):
+    registros = []
+
     fecha_revision = datetime.today()  # 👈 se usa la fecha actual
 
-    val_raw = df_raw.loc[idx, "Fecha Última Actualización"]   # texto original
+    val_raw = raw["Fecha Última Actualización"]   # texto original
     parsed = parse_date_strict(val_raw)
 
     if pd.isna(parsed):  # vacío real
@@ -895,9 +1895,9 @@ for idx, fila in df.iterrows():
 
     elif isinstance(parsed, datetime):
     # 🚨 Reglas de negocio específicas
-       
+   
         fecha_str = parsed.strftime("%Y-%m-%d") 
-        
+    
         # Caso especial: 1900-01-01 → válido
         if fecha_str == "1900-01-01":
             pass  # No hacer nada, se considera válido
@@ -921,7 +1921,7 @@ for idx, fila in df.iterrows():
             "Observación Específica": "Fechas no son consistentes de acuerdo a los Periodos de captura",
             "Tipología": "Forma"
         })
-      
+  
     elif isinstance(val_raw, str):  # 🚨 Validación de espacios problemáticos
         errores_espacios = []
         if val_raw.startswith(" "):
@@ -932,7 +1932,7 @@ for idx, fila in df.iterrows():
             errores_espacios.append("Múltiples espacios")
         if "\n" in val_raw or "\r" in val_raw:
             errores_espacios.append("Saltos de línea")
-    
+
         if errores_espacios:
             registros.append({
                 "ID": id_val,
@@ -942,9 +1942,15 @@ for idx, fila in df.iterrows():
                 "Observación Específica": "; ".join(errores_espacios),
                 "Tipología": "Forma"
         }) 
-            
-    # ---- Modificado Por ----
-    val_raw = df_raw.loc[idx, "Modificado Por"]
+
+    return registros
+
+# ---- Modificado Por ----
+
+def validar_modificado_por(id_val, raw, fila, indice):
+    registros = []
+
+    val_raw = raw["Modificado Por"]
     val = fila["Modificado Por"]
 
     if pd.isna(val):  # Vacío
@@ -1021,11 +2027,7 @@ for idx, fila in df.iterrows():
             if val_limpio != val_limpio.title():
                 observaciones.append("Errores en Formato")
 
-            val_normalizada = unidecode(val_limpio).title()
-            nombres_existentes = df_raw["Modificado Por"].dropna().unique()
-            coincidencias = [n for n in nombres_existentes if unidecode(str(n)).title() == val_normalizada]
-
-            if len(coincidencias) > 1:
+            if indice.variantes_nombre("Modificado Por", val_limpio) > 1:
                 observaciones.append("Estandarizar Nombre a un solo registro")
 
             if val_raw.startswith(" "):
@@ -1047,9 +2049,14 @@ for idx, fila in df.iterrows():
                     "Tipología": "Forma"
                 })
 
-        # ---- Comentarios ----
+    return registros
+
+# ---- Comentarios ----
 
-    val_raw = df_raw.loc[idx, "Comentarios"]
+def validar_comentarios(id_val, raw, fila, indice):
+    registros = []
+
+    val_raw = raw["Comentarios"]
     val = fila["Comentarios"]
 
     if pd.isna(val):  # Vacío
@@ -1180,188 +2187,143 @@ for idx, fila in df.iterrows():
         if mal_escritas:
             errores.append(f"Errores ortográficos detectados: {', '.join(mal_escritas)}")'''
 
-    # ---- Cód DANE Depto ----
-
-    val_raw = df_raw.loc[idx, "Cód DANE Depto"]
-    val = fila["Cód DANE Depto"]
-
-    observaciones = []  # <- acumulador de observaciones
-
-    if pd.isna(val):  # 🚨 Vacío
-        observaciones.append({
-            "ID": id_val,
-            "Columna Analizada": "Cód DANE Depto",
-            "Dato Analizado": "",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato sin diligenciar",
-            "Tipología": "Forma"
-        })
-
-    elif val == "<ESPACIO>":  # 🚨 solo espacios
-        observaciones.append({
-            "ID": id_val,
-            "Columna Analizada": "Cód DANE Depto",
-            "Dato Analizado": " ",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Cód DANE Depto",
-            "Tipología": "Forma"
-        })
-
-    else:
-        if isinstance(val_raw, str):  # 🚨 Validación de espacios problemáticos
-            errores_espacios = []
-            if val_raw.startswith(" "):
-                errores_espacios.append("Espacio al inicio")
-            if val_raw.endswith(" "):
-                errores_espacios.append("Espacio al final")
-            if "  " in val_raw:
-                errores_espacios.append("Múltiples espacios")
-            if "\n" in val_raw or "\r" in val_raw:
-                errores_espacios.append("Saltos de línea")
-
-            if errores_espacios:
-                observaciones.append({
-                    "ID": id_val,
-                    "Columna Analizada": "Cód DANE Depto",
-                    "Dato Analizado": val_raw,
-                    "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                    "Observación Específica": "; ".join(errores_espacios),
-                    "Tipología": "Forma"
-                })
-
-        # 🚨 Validación de longitud (solo 2 dígitos numéricos)
-        try:
-            val_str = str(val).strip()
-            if not (val_str.isdigit() and len(val_str) == 2):
-                observaciones.append({
-                    "ID": id_val,
-                    "Columna Analizada": "Cód DANE Depto",
-                    "Dato Analizado": val_str,
-                    "Observación General": "Inconsistencia Logica del Dato",
-                    "Observación Específica": "Digitar solo 2 dígitos numéricos. Verificar con la fuente",
-                    "Tipología": "Fondo"
-                })
-            else:
-                # 🚨 Validación contra listado oficial de DANE
-                if val_str not in codigos_dane_deptos:
-                    observaciones.append({
-                        "ID": id_val,
-                        "Columna Analizada": "Cód DANE Depto",
-                        "Dato Analizado": val_str,
-                        "Observación General": "Inconsistencia Logica del Dato",
-                        "Observación Específica": "Dato no corresponde al código DANE, Verificar con la fuente",
-                        "Tipología": "Fondo"
-                    })
-        except Exception:
-            pass
-
-    # 🚨 Agregar todas las observaciones encontradas
-    if observaciones:
-        registros.extend(observaciones)
-                 
-    # ---- Cód DANE Mpio ----
-
-    val_raw = df_raw.loc[idx, "Cód DANE Mpio"]
-    val = fila["Cód DANE Mpio"]
-
-    observaciones = []  # <- acumulador
+    return registros
 
-    if pd.isna(val):  # 🚨 Vacío
-        observaciones.append({
-            "ID": id_val,
-            "Columna Analizada": "Cód DANE Mpio",
-            "Dato Analizado": "",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato sin diligenciar",
-            "Tipología": "Forma"
-        })
+# Versión por columna: mismas observaciones que validar_comentarios, pero cada texto distinto
+# se evalúa una sola vez con métodos .str vectorizados y un único juego de patrones compilados.
+VARIANTES_SIN_COMENTARIOS = [
+    "no aplica", "n/a",
+    "sin observacion", "sin observación",
+    "sin informacion", "sin información",
+    "sin observaciones", "sin observaciónes"
+]
+PATRONES_COMENTARIOS = {
+    "no_claro": re.compile(r"[\W_]+"),
+    "comillas": re.compile(r'"([^"]*)"'),
+}
 
-    elif val == "<ESPACIO>":  # 🚨 solo espacios
-        observaciones.append({
+def _observaciones_comentarios(textos):
+    """Para cada texto distinto (no vacío) → [(Observación General, Observación Específica) o None]."""
+    limpio = textos.str.split().str.join(" ")
+    sin_comentarios = limpio.eq("Sin Comentarios")
+    estandarizar = ~sin_comentarios & limpio.str.lower().isin(VARIANTES_SIN_COMENTARIOS)
+    no_claro = ~sin_comentarios & ~estandarizar & (
+        limpio.str.fullmatch(PATRONES_COMENTARIOS["no_claro"]) | limpio.str.isdigit() | limpio.str.len().eq(1)
+    )
+    resto = ~(sin_comentarios | estandarizar | no_claro)
+
+    # Excepción de comillas: todos los bloques entre comillas no vacíos y en formato título
+    bloques = limpio.str.findall(PATRONES_COMENTARIOS["comillas"]).explode()
+    bloque_ok = bloques.notna() & bloques.ne("") & bloques.eq(bloques.str.title())
+    excepcion = bloque_ok.groupby(level=0).all()
+
+    formato_invalido = ~excepcion & (
+        ~limpio.str[0].str.isupper()
+        | (limpio.str.len().gt(1) & limpio.str[1:].str.isupper())
+        | ~limpio.str[-1].str.isalnum()
+    )
+
+    especifica = pd.Series("", index=textos.index)
+    for bandera, texto in (
+        (textos.str.startswith(" "), "Espacio al inicio"),
+        (textos.str.endswith(" "), "Espacio al final"),
+        (textos.str.contains("  ", regex=False), "Múltiples espacios"),
+        (textos.str.contains("\n", regex=False) | textos.str.contains("\r", regex=False), "Saltos de línea"),
+        (formato_invalido, "Errores en Formato"),
+    ):
+        especifica = especifica.mask(bandera & resto, especifica + "; " + texto)
+    especifica = especifica.str.removeprefix("; ")
+
+    general = pd.Series(None, index=textos.index, dtype=object)
+    general[estandarizar | (resto & especifica.ne(""))] = "El Dato no guarda el estándar del Diccionario de Datos"
+    general[no_claro] = "Inconsistencia Logica del Dato"
+    especifica = especifica.mask(estandarizar, "Estandarizar a Sin Comentarios").mask(no_claro, "Comentario no es claro")
+    return [None if pd.isna(g) else (g, e) for g, e in zip(general, especifica)]
+
+def validar_comentarios_lote(df_raw, df, indice):
+    """Bloque Comentarios para todas las filas a la vez (en el orden de las filas)."""
+    crudos = df_raw["Comentarios"].astype(object)
+    recortado = crudos.str.strip()
+    vacio = crudos.isna()
+    espacio = ~vacio & (recortado.eq("") | recortado.eq("<ESPACIO>"))   # igual que limpiar_valor
+
+    distintos = pd.Series(crudos[~vacio & ~espacio].unique(), dtype=object)
+    por_texto = dict(zip(distintos, _observaciones_comentarios(distintos)))
+
+    registros = []
+    for id_val, val_raw, es_vacio, es_espacio in zip(df["ID"], crudos, vacio, espacio):
+        if es_vacio:
+            general, especifica, dato = "Inconsistencia Totalidad del Dato", "Dato sin diligenciar", ""
+        elif es_espacio:
+            general, especifica, dato = ("Inconsistencia Totalidad del Dato",
+                                         "Dato diligenciado únicamente con espacio, Dato no es coherente con Comentarios", " ")
+        else:
+            observacion = por_texto[val_raw]
+            if observacion is None:
+                continue
+            (general, especifica), dato = observacion, val_raw
+        registros.append({
             "ID": id_val,
-            "Columna Analizada": "Cód DANE Mpio",
-            "Dato Analizado": " ",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Cód DANE Mpio",
+            "Columna Analizada": "Comentarios",
+            "Dato Analizado": dato,
+            "Observación General": general,
+            "Observación Específica": especifica,
             "Tipología": "Forma"
         })
-
-    else:
-        if isinstance(val_raw, str):  # 🚨 Validación de espacios problemáticos
-            errores_espacios = []
-            if val_raw.startswith(" "):
-                errores_espacios.append("Espacio al inicio")
-            if val_raw.endswith(" "):
-                errores_espacios.append("Espacio al final")
-            if "  " in val_raw:
-                errores_espacios.append("Múltiples espacios")
-            if "\n" in val_raw or "\r" in val_raw:
-                errores_espacios.append("Saltos de línea")
-
-            if errores_espacios:
-                observaciones.append({
-                    "ID": id_val,
-                    "Columna Analizada": "Cód DANE Mpio",
-                    "Dato Analizado": val_raw,
-                    "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                    "Observación Específica": "; ".join(errores_espacios),
-                    "Tipología": "Forma"
-                })
-
-        # 🚨 Validación de longitud y contenido
-        try:
-            val_str = str(val).strip()
-
-            # Caso: 3 dígitos
-            if val_str.isdigit() and len(val_str) == 3:
-                pass  # válido, no se reporta nada
-
-            # Caso: 5 dígitos
-            elif val_str.isdigit() and len(val_str) == 5:
-                depto = val_str[:2]  # primeros dos dígitos
-                if depto in codigos_dane_deptos:
-                    observaciones.append({
-                        "ID": id_val,
-                        "Columna Analizada": "Cód DANE Mpio",
-                        "Dato Analizado": val_str,
-                        "Observación General": "El Dato no guarda el estandar del Diccionario de Datos",
-                        "Observación Específica": "Extraer y reemplazar los caracteres desde la posición 3 al 5 del dato Cód DANE Mpio",
-                        "Tipología": "Forma"
-                    })
-                else:
-                    observaciones.append({
-                        "ID": id_val,
-                        "Columna Analizada": "Cód DANE Mpio",
-                        "Dato Analizado": val_str,
-                        "Observación General": "Inconsistencia Lógica del Dato",
-                        "Observación Específica": "Dato no guarda relación con Código DANE, este debe contar con 3 dígitos. Verificar Dato",
-                        "Tipología": "Fondo"
-                    })
-
-            # Caso: ni 3 ni 5 dígitos, o caracteres no numéricos
-            else:
-                observaciones.append({
-                    "ID": id_val,
-                    "Columna Analizada": "Cód DANE Mpio",
-                    "Dato Analizado": val_str,
-                    "Observación General": "Inconsistencia Lógica del Dato",
-                    "Observación Específica": "Dato no guarda relación con Código DANE, Verificar Dato",
-                    "Tipología": "Fondo"
-                })
-
-        except Exception:
-            pass
-
-    # 🚨 Agregar todas las observaciones
-    if observaciones:
-        registros.extend(observaciones)
-
-    # ---- Año Vigencia Insumo Geográfico ----
-    val_raw = df_raw.loc[idx, "Año Vigencia Insumo Geográfico"]
+    return registros
+
+# ---- Cód DANE Depto ----
+
+registrar_reglas([
+    *reglas_totalidad("Cód DANE Depto"),
+    *reglas_espacios("Cód DANE Depto", 10),
+    Regla("cod_dane_depto_dos_digitos", "Cód DANE Depto", "Digitar solo 2 dígitos numéricos. Verificar con la fuente",
+          "Inconsistencia Logica del Dato", "Fondo", 20,
+          lambda v, *_: not _son_digitos(_texto(v), 2),
+          lambda d: ~_digitos(d["limpio"], 2), excluye=True, dato="limpio"),
+    Regla("cod_dane_depto_codigo", "Cód DANE Depto", "Dato no corresponde al código DANE, Verificar con la fuente",
+          "Inconsistencia Logica del Dato", "Fondo", 21,
+          lambda v, *_: _texto(v) not in codigos_dane_deptos,
+          lambda d: ~_mascara(d["limpio"].isin(list(codigos_dane_deptos))), dato="limpio"),
+])
+
+validar_cod_dane_depto = validador_de_reglas("Cód DANE Depto")
+
+# ---- Cód DANE Mpio ----
+
+registrar_reglas([
+    *reglas_totalidad("Cód DANE Mpio"),
+    *reglas_espacios("Cód DANE Mpio", 10),
+    # 3 dígitos es válido; 5 dígitos trae el departamento por delante
+    Regla("cod_dane_mpio_con_depto", "Cód DANE Mpio",
+          "Extraer y reemplazar los caracteres desde la posición 3 al 5 del dato Cód DANE Mpio",
+          "El Dato no guarda el estandar del Diccionario de Datos", "Forma", 20,
+          lambda v, *_: _son_digitos(_texto(v), 5) and _texto(v)[:2] in codigos_dane_deptos,
+          lambda d: _digitos(d["limpio"], 5) & _mascara(d["limpio"].str[:2].isin(list(codigos_dane_deptos))),
+          excluye=True, dato="limpio"),
+    Regla("cod_dane_mpio_cinco_digitos", "Cód DANE Mpio",
+          "Dato no guarda relación con Código DANE, este debe contar con 3 dígitos. Verificar Dato",
+          "Inconsistencia Lógica del Dato", "Fondo", 21,
+          lambda v, *_: _son_digitos(_texto(v), 5),
+          lambda d: _digitos(d["limpio"], 5), excluye=True, dato="limpio"),
+    Regla("cod_dane_mpio_codigo", "Cód DANE Mpio", "Dato no guarda relación con Código DANE, Verificar Dato",
+          "Inconsistencia Lógica del Dato", "Fondo", 22,
+          lambda v, *_: not _son_digitos(_texto(v), 3),
+          lambda d: ~_digitos(d["limpio"], 3), dato="limpio"),
+])
+
+validar_cod_dane_mpio = validador_de_reglas("Cód DANE Mpio")
+
+# ---- Año Vigencia Insumo Geográfico ----
+
+def validar_anio_vigencia(id_val, raw, fila, indice):
+    registros = []
+
+    val_raw = raw["Año Vigencia Insumo Geográfico"]
     val = fila["Año Vigencia Insumo Geográfico"]
 
-    anio_captura = df_raw.loc[idx, "Anio_Captura"]
-    anio_vigencia = df_raw.loc[idx, "Anio_Vigencia_Num"]
+    anio_captura = extraer_anio(raw["Fecha Captura"])
+    anio_vigencia = extraer_anio(val_raw)
 
     observaciones = []
 
@@ -1428,9 +2390,17 @@ for idx, fila in df.iterrows():
             **obs
         })
 
+    return registros
+
+# ---- Nombre Vereda ----
+
+# Textos que indican que se copió la fuente en vez del nombre (prioridad sobre las demás reglas)
+PALABRAS_FMI_VEREDA = ["fmi", "según campo", "campo", "divipola", "documentos", "igac", "vur", "registro"]
+
+def validar_nombre_vereda(id_val, raw, fila, indice):
+    registros = []
 
-    # ---- Nombre Vereda ----
-    val_raw = df_raw.loc[idx, "Nombre Vereda"]
+    val_raw = raw["Nombre Vereda"]
     val = fila["Nombre Vereda"]
 
     if pd.isna(val) or str(val).strip() == "":
@@ -1460,7 +2430,7 @@ for idx, fila in df.iterrows():
         # -----------------------------
         # 1. FMI / Según Campo / Divipola / Documentos (prioridad)
         # -----------------------------
-        if any(word.lower() in val_str.lower() for word in ["fmi", "según campo", "campo","divipola", "documentos","igac","vur","registro"]):
+        if any(word.lower() in val_str.lower() for word in PALABRAS_FMI_VEREDA):
             observaciones_especificas.append("Diligenciar solo el dato correspondiente a FMI")
 
         else:
@@ -1487,7 +2457,7 @@ for idx, fila in df.iterrows():
             else:
                 if p != p.capitalize():
                     "Errores en Formato"
-                
+            
             # -----------------------------
             # 3. Reglas adicionales
             # -----------------------------
@@ -1502,24 +2472,15 @@ for idx, fila in df.iterrows():
 
             if re.search(r"[,;.:]$", val_str) or re.search(r"[^a-zA-ZÀ-ÿ0-9\s,\-/]", val_str):
                 observaciones_especificas.append("Eliminar caracteres especiales")
-            
+        
             if any(word in val_str.lower() for word in ["urbano", "zona urbana"]):
                 observaciones_especificas.append("El dato debe diligenciarse como No Aplica si se sitúa en zona urbana")
 
             # -----------------------------
             # 4. Similaridades entre veredas (fuzzy matching)
             # -----------------------------
-            valores_unicos = df_raw["Nombre Vereda"].dropna().unique()
-            similares = process.extract(
-                val_str,
-                valores_unicos,
-                scorer=fuzz.token_sort_ratio,
-                limit=5
-            )
-            for match, score, _ in similares:
-                if score >= 85 and match.lower() != val_str.lower():
-                    observaciones_especificas.append("Estandarizar Nombre Vereda a un único registro")
-                    break
+            if indice.vereda_con_variantes(val_str):
+                observaciones_especificas.append("Estandarizar Nombre Vereda a un único registro")
 
         # -----------------------------
         # 5. Validaciones de Fondo (Inconsistencias Lógicas)
@@ -1562,7 +2523,7 @@ for idx, fila in df.iterrows():
                     "Observación Específica": "El dato no corresponde a Nombre de Vereda",
                     "Tipología": "Fondo"
                 })
-        
+    
         # -----------------------------
         # Registrar si hubo observaciones
         # -----------------------------
@@ -1576,82 +2537,39 @@ for idx, fila in df.iterrows():
                 "Tipología": "Forma"
             })
 
-    # ---- RULEID ----
+    return registros
 
-    val_raw = df_raw.loc[idx, "RULEID"]
-    val = fila["RULEID"]
+# ---- RULEID ----
 
-    # 🚨 1. Validación de vacíos
-    if pd.isna(val):  
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "RULEID",
-            "Dato Analizado": "",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato sin diligenciar",
-            "Tipología": "Forma"
-        })
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
 
-    elif val == "<ESPACIO>":  
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "RULEID",
-            "Dato Analizado": " ",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el RULEID",
-            "Tipología": "Forma"
-        })
+def _ruleid_numeros(d):
+    return [_entero(v) for v in d["limpio"]]
 
-    else:
-        try:
-            val_num = int(val) if str(val).strip() != "" else None
+registrar_reglas([
+    *reglas_totalidad("RULEID"),
+    Regla("ruleid_no_numerico", "RULEID", "Valor no numérico, Diligenciar con valor 1", GENERAL_ESTANDAR, "Forma", 10,
+          lambda v, *_: _entero(v) is None,
+          lambda d: np.array([n is None for n in _ruleid_numeros(d)]), excluye=True, dato="limpio"),
+    Regla("ruleid_dominio", "RULEID", "Valor no hace parte del dominio, Diligenciar con valor 1", GENERAL_ESTANDAR, "Forma", 11,
+          lambda v, *_: _entero(v) != 1,
+          lambda d: np.array([n != 1 for n in _ruleid_numeros(d)]), excluye=True, dato="limpio"),
+    # Los espacios solo se revisan si el valor es 1
+    *reglas_espacios("RULEID", 20),
+])
 
-            # 🚨 2. Validación de dominio (solo se permite 1)
-            if val_num != 1:
-                registros.append({
-                    "ID": id_val,
-                    "Columna Analizada": "RULEID",
-                    "Dato Analizado": str(val),
-                    "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                    "Observación Específica": "Valor no hace parte del dominio, Diligenciar con valor 1",
-                    "Tipología": "Forma"
-                })
-            else:
-                # 🚨 3. Validación de espacios SOLO si el valor es 1
-                if isinstance(val_raw, str):
-                    errores_espacios = []
-                    if val_raw.startswith(" "):
-                        errores_espacios.append("Espacio al inicio")
-                    if val_raw.endswith(" "):
-                        errores_espacios.append("Espacio al final")
-                    if "  " in val_raw:
-                        errores_espacios.append("Múltiples espacios")
-                    if "\n" in val_raw or "\r" in val_raw:
-                        errores_espacios.append("Saltos de línea")
-
-                    if errores_espacios:
-                        registros.append({
-                            "ID": id_val,
-                            "Columna Analizada": "RULEID",
-                            "Dato Analizado": val_raw,
-                            "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                            "Observación Específica": "; ".join(errores_espacios),
-                            "Tipología": "Forma"
-                        })
+validar_ruleid = validador_de_reglas("RULEID")
 
-        except Exception:
-            registros.append({
-                "ID": id_val,
-                "Columna Analizada": "RULEID",
-                "Dato Analizado": str(val),
-                "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                "Observación Específica": "Valor no numérico, Diligenciar con valor 1",
-                "Tipología": "Forma"
-            })     
+# ---- Código SIG Predio Jurídico ----
 
-    # ---- Código SIG Predio Jurídico ----
+def validar_codigo_sig(id_val, raw, fila, indice):
+    registros = []
 
-    val_raw = df_raw.loc[idx, "Código SIG Predio Jurídico"]
+    val_raw = raw["Código SIG Predio Jurídico"]
     val = fila["Código SIG Predio Jurídico"]
 
     observaciones = []  # lista de observaciones para este campo
@@ -1679,7 +2597,7 @@ for idx, fila in df.iterrows():
             tiene_extras = any(c in val_str for c in ["_", "-"]) or not val_str.isalnum()
 
             # 🚨 2. Unicidad (siempre acumula)
-            if (df_raw["Código SIG Predio Jurídico"] == val_str).sum() > 1:
+            if indice.codigo_sig[val_str] > 1:
                 observaciones.append({
                     "Observación General": "Inconsistencia Lógica del Dato",
                     "Observación Específica": "Cód. SIG se encuentra más de una vez",
@@ -1813,11 +2731,56 @@ for idx, fila in df.iterrows():
             **obs
         })
 
-    # ---- Área Terreno Calculada Mts2 ----
+    return registros
 
-    val_raw = df_raw.loc[idx, "Área Terreno Calculada Mts2"]
+# ---- Área Terreno Calculada Mts2 ----
+
+# Área declarada vs. área del polígono: diferencia relativa admitida y mínimo absoluto (m²)
+TOLERANCIA_AREA = float(os.environ.get("EDITPLOT_TOLERANCIA_AREA", "0.01"))
+TOLERANCIA_AREA_MIN_M2 = 1.0
+
+PATRON_AREA_PUNTO = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+PATRON_AREA_COMA = re.compile(r"[+-]?(\d{1,3}(\.\d{3})+|\d+),\d+")   # 12,5 · 1.234,56
+
+def interpretar_area(texto):
+    """(valor, con_coma): número del Área con punto decimal o con coma decimal ("12,5", "1.234,5").
+       valor = None si el texto no es numérico.
+    """
+    if PATRON_AREA_PUNTO.fullmatch(texto):
+        return float(texto), False
+    if PATRON_AREA_COMA.fullmatch(texto):
+        return float(texto.replace(".", "").replace(",", ".")), True
+    return None, False
+
+def observaciones_area(texto, area_poligono):
+    """Observaciones (general, específica, dato, tipología) del valor numérico del Área."""
+    obs = []
+    valor, con_coma = interpretar_area(texto)
+    if valor is None:
+        return [("El Dato no guarda el estándar del Diccionario de Datos", "Dato no numérico", texto, "Forma")]
+    if con_coma:
+        obs.append(("El Dato no guarda el estándar del Diccionario de Datos",
+                    "Separador decimal con coma, usar punto", texto, "Forma"))
+    if valor == 0:
+        obs.append(("Inconsistencia Lógica del Dato", "Área igual a cero", texto, "Fondo"))
+    elif valor < 0:
+        obs.append(("Inconsistencia Lógica del Dato", "Área negativa", texto, "Fondo"))
+
+    if area_poligono is None or pd.isna(area_poligono):
+        return obs
+    if area_poligono == 0:
+        obs.append(("Inconsistencia Lógica del Dato", "Geometría vacía o sin área", texto, "Fondo"))
+    elif abs(valor - area_poligono) > max(TOLERANCIA_AREA * area_poligono, TOLERANCIA_AREA_MIN_M2):
+        obs.append(("Inconsistencia Lógica del Dato", "Área declarada no coincide con el área del polígono",
+                    f"{texto} (polígono: {area_poligono:.2f})", "Fondo"))
+    return obs
+
+def validar_area_terreno(id_val, raw, fila, indice):
+    registros = []
+
+    val_raw = raw["Área Terreno Calculada Mts2"]
     val = fila["Área Terreno Calculada Mts2"]
-    
+
     if pd.isna(val): # Vacio
         registros.append({
             "ID": id_val,
@@ -1837,7 +2800,7 @@ for idx, fila in df.iterrows():
             "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Área Terreno Calculada Mts2",
             "Tipología": "Forma"
         })
-    
+
     elif isinstance(val_raw, str):  # 🚨 Validación de espacios problemáticos
         errores_espacios = []
         if val_raw.startswith(" "):
@@ -1848,7 +2811,7 @@ for idx, fila in df.iterrows():
             errores_espacios.append("Múltiples espacios")
         if "\n" in val_raw or "\r" in val_raw:
             errores_espacios.append("Saltos de línea")
-    
+
         if errores_espacios:
             registros.append({
                 "ID": id_val,
@@ -1858,80 +2821,405 @@ for idx, fila in df.iterrows():
                 "Observación Específica": "; ".join(errores_espacios),
                 "Tipología": "Forma"
         })
-                             
-    # ---- Tipo de Propiedad ----
-
-    val_raw = df_raw.loc[idx, "Tipo de Propiedad"]
-    val = fila["Tipo de Propiedad"]
-
-    if pd.isna(val):  # 🚨 Vacío
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Tipo de Propiedad",
-            "Dato Analizado": "",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato sin diligenciar",
-            "Tipología": "Forma"
-        })
-
-    elif val == "<ESPACIO>":  # 🚨 Solo espacios
-        registros.append({
-            "ID": id_val,
-            "Columna Analizada": "Tipo de Propiedad",
-            "Dato Analizado": " ",
-            "Observación General": "Inconsistencia Totalidad del Dato",
-            "Observación Específica": "Dato diligenciado únicamente con espacio, Dato no es coherente con el Tipo de Propiedad",
-            "Tipología": "Forma"
-        })
-
-    elif isinstance(val_raw, str):  
-        val_str = val_raw.strip()
-
-        # 🚨 Validación de espacios problemáticos
-        errores_espacios = []
-        if val_raw.startswith(" "):
-            errores_espacios.append("Espacio al inicio")
-        if val_raw.endswith(" "):
-            errores_espacios.append("Espacio al final")
-        if "  " in val_raw:
-            errores_espacios.append("Múltiples espacios")
-        if "\n" in val_raw or "\r" in val_raw:
-            errores_espacios.append("Saltos de línea")
 
-        if errores_espacios:
+    if not pd.isna(val) and val != "<ESPACIO>":  # 🔢 Valor numérico y área del polígono (capas GIS)
+        for general, especifica, dato, tipologia in observaciones_area(val, raw.get(COLUMNA_AREA_GEOMETRIA)):
             registros.append({
                 "ID": id_val,
-                "Columna Analizada": "Tipo de Propiedad",
-                "Dato Analizado": val_raw,
-                "Observación General": "El Dato no guarda el estándar del Diccionario de Datos",
-                "Observación Específica": "; ".join(errores_espacios),
-                "Tipología": "Forma"
+                "Columna Analizada": "Área Terreno Calculada Mts2",
+                "Dato Analizado": dato,
+                "Observación General": general,
+                "Observación Específica": especifica,
+                "Tipología": tipologia
             })
 
-        # 🚨 Validación de dominios permitidos
-        dominios_permitidos = ["PRESUNTAMENTE BALDIO", "PRIVADA", "SIN INFORMACION"]
-        if val_str.upper() not in dominios_permitidos:
+        # 📈 Área atípica frente a las demás de su vereda / municipio
+        atipica = indice.area_atipica(raw.get("Cód DANE Depto"), raw.get("Cód DANE Mpio"), raw.get("Nombre Vereda"), val)
+        if atipica:
+            nivel, mediana = atipica
             registros.append({
                 "ID": id_val,
-                "Columna Analizada": "Tipo de Propiedad",
-                "Dato Analizado": val_str,
+                "Columna Analizada": "Área Terreno Calculada Mts2",
+                "Dato Analizado": f"{val} (mediana: {mediana:.2f})",
                 "Observación General": "Inconsistencia Lógica del Dato",
-                "Observación Específica": "Dominio no se encuentra de acuerdo con el Diccionario de Datos",
+                "Observación Específica": "Área atípica para la vereda" if nivel == "vereda" else "Área atípica para el municipio",
                 "Tipología": "Fondo"
             })
-             
+
+    return registros
+
+def validar_area_terreno_lote(df_raw, df, indice):
+    """Bloque Área para todas las filas a la vez: formato numérico y comparación con el área
+       del polígono vectorizados; solo las filas con observaciones pasan por Python.
+    """
+    crudos = df_raw["Área Terreno Calculada Mts2"].astype(object)
+    limpios = df["Área Terreno Calculada Mts2"].astype(object)
+    vacio = limpios.isna()
+    espacio = ~vacio & limpios.eq("<ESPACIO>")
+    texto = limpios.where(~vacio & ~espacio)
+    con_espacios = ~vacio & ~espacio & (
+        crudos.str.startswith(" ", na=False) | crudos.str.endswith(" ", na=False)
+        | crudos.str.contains("  ", regex=False, na=False)
+        | crudos.str.contains("\n", regex=False, na=False) | crudos.str.contains("\r", regex=False, na=False)
+    )
+
+    if COLUMNA_AREA_GEOMETRIA in df_raw:
+        poligono = pd.to_numeric(df_raw[COLUMNA_AREA_GEOMETRIA], errors="coerce")
+    else:
+        poligono = pd.Series(np.nan, index=df_raw.index)
+    punto = texto.str.fullmatch(PATRON_AREA_PUNTO, na=False).astype(bool)
+    valor = pd.to_numeric(texto.where(punto), errors="coerce")
+    diferencia = (valor - poligono).abs()
+    margen = np.maximum(TOLERANCIA_AREA * poligono, TOLERANCIA_AREA_MIN_M2)
+    correcto = punto & (valor > 0) & (poligono.isna() | ((poligono != 0) & (diferencia <= margen)))
+
+    revisar = vacio | espacio | con_espacios | (texto.notna() & ~correcto) | indice.areas_atipicas(df_raw, valor.where(correcto))
+    registros = []
+    for id_val, raw, fila in zip(df.loc[revisar, "ID"], df_raw[revisar].to_dict("records"), df[revisar].to_dict("records")):
+        registros.extend(validar_area_terreno(id_val, raw, fila, indice))
+    return registros
+
+# ---- Tipo de Propiedad ----
+
+TIPOS_PROPIEDAD = ["PRESUNTAMENTE BALDIO", "PRIVADA", "SIN INFORMACION"]
+
+registrar_reglas([
+    *reglas_totalidad("Tipo de Propiedad"),
+    *reglas_espacios("Tipo de Propiedad", 10),
+    Regla("tipo_de_propiedad_dominio", "Tipo de Propiedad", "Dominio no se encuentra de acuerdo con el Diccionario de Datos",
+          "Inconsistencia Lógica del Dato", "Fondo", 20,
+          lambda v, c, *_: isinstance(c, str) and c.strip().upper() not in TIPOS_PROPIEDAD,
+          lambda d: ~_mascara(_recortado(d).str.upper().isin(TIPOS_PROPIEDAD)), dato="limpio"),
+])
+
+validar_tipo_propiedad = validador_de_reglas("Tipo de Propiedad")
+
+def validar_por_categorias(columna, validador):
+    """Versión por lote de un bloque que solo depende del valor de su columna (y de los índices
+       globales): se evalúa una vez por valor distinto (las categorías de una columna category)
+       y el resultado se copia a cada fila con su ID.
+    """
+    def validar_lote(df_raw, df, indice):
+        crudos = df_raw[columna]
+        if isinstance(crudos.dtype, pd.CategoricalDtype):
+            codigos, valores = crudos.cat.codes.to_numpy(), crudos.cat.categories
+        else:
+            codigos, valores = pd.factorize(crudos)
+        # Código -1 = nulo: se evalúa como cualquier otro valor
+        plantillas = {}
+        for codigo, valor in [(-1, np.nan), *enumerate(valores)]:
+            fila = limpiar_registro({columna: valor})
+            obs = validador(None, {columna: valor}, fila, indice)
+            if obs:
+                plantillas[codigo] = obs
+        if not plantillas:
+            return []
+
+        registros = []
+        con_obs = np.isin(codigos, list(plantillas))
+        for id_val, codigo in zip(df["ID"].to_numpy()[con_obs], codigos[con_obs]):
+            registros.extend({**obs, "ID": id_val} for obs in plantillas[codigo])
+        return registros
+    return validar_lote
+
+# Orden en que se reportan las columnas
+VALIDADORES_COLUMNA = {
+    "Nombre Proyecto": validar_nombre_proyecto,
+    "Fecha Captura": validar_fecha_captura,
+    "Código Interno": validar_codigo_interno,
+    "Símbolo": validar_simbolo,
+    "Nombre Predio Jurídico": validar_nombre_predio,
+    "Escala": validar_escala,
+    "Fuente Información": validar_fuente_informacion,
+    "Creado Por": validar_creado_por,
+    "Fecha Última Actualización": validar_fecha_ultima_actualizacion,
+    "Modificado Por": validar_modificado_por,
+    "Comentarios": validar_comentarios,
+    "Cód DANE Depto": validar_cod_dane_depto,
+    "Cód DANE Mpio": validar_cod_dane_mpio,
+    "Año Vigencia Insumo Geográfico": validar_anio_vigencia,
+    "Nombre Vereda": validar_nombre_vereda,
+    "RULEID": validar_ruleid,
+    "Código SIG Predio Jurídico": validar_codigo_sig,
+    "Área Terreno Calculada Mts2": validar_area_terreno,
+    "Tipo de Propiedad": validar_tipo_propiedad,
+}
+
+# Bloques con versión por columna (df_raw, df, indice) → observaciones en el orden de las filas.
+# Los usa el motor "columnas"; la referencia "filas" sigue usando la versión por registro.
+VALIDADORES_LOTE = {
+    "Comentarios": validar_comentarios_lote,
+    "Área Terreno Calculada Mts2": validar_area_terreno_lote,
+    **{c: validar_por_categorias(c, VALIDADORES_COLUMNA[c]) for c in COLUMNAS_CATEGORICAS},
+    **{c: lote_de_reglas(c) for c in REGLAS_COLUMNA},
+}
+
 # ==========================
-# Convertir a DataFrame
+# Pre-escaneo de filas limpias
 # ==========================
-reporte = pd.DataFrame(registros)
-
-# Añadir la columna Obs_Nom_Proyect desde df (donde la fuimos guardando en cada fila)
-df_merge = df.merge(
-    reporte,
-    on="ID",
-    how="left",
-    suffixes=("", "_obs")
-)
+# En un export bien mantenido casi todas las filas no tienen hallazgos: antes de las reglas se
+# revisa cada línea del CSV con un patrón compilado por columna. Si todos los campos con patrón
+# coinciden, la fila no puede tener hallazgos de valor y sus bloques no se ejecutan; los índices
+# globales se siguen construyendo con todas las filas y las reglas que dependen de ellos se
+# consultan aparte (CONSULTAS_LIMPIAS). Los patrones son conservadores: un valor válido que no
+# coincide solo significa que la fila se valida completa.
+PREFILTRO_ACTIVO = os.environ.get("EDITPLOT_PREFILTRO", "1") != "0"
+
+_ANIOS_CAPTURA = "|".join(str(a) for a in range(2009, datetime.today().year))   # nunca posteriores a hoy
+_MES, _DIA = r"(?:0[1-9]|1[0-2])", r"(?:0[1-9]|1\d|2[0-8])"
+_FECHA_LIMPIA = rf"(?:{_ANIOS_CAPTURA})-{_MES}-{_DIA}|{_DIA}/{_MES}/(?:{_ANIOS_CAPTURA})"
+_PALABRA_TITULO = r"[A-ZÁÉÍÓÚÜÑ][a-záéíóúüñ]+"
+_NOMBRE_COMPLETO = rf"{_PALABRA_TITULO}(?: {_PALABRA_TITULO})+"
+_NOMBRES_ESPECIALES = ["Saneamiento P8 Fase I", "Migracion Lci", "Sin Informacion", "Sin Información", "Sin Info"]
+
+def _alternativas(valores):
+    return "|".join(re.escape(v) for v in valores)
+
+# Columna → (patrón de un valor sin hallazgos, textos excluidos sin distinguir mayúsculas).
+# Nombre Predio Jurídico y Nombre Vereda no tienen patrón: siempre se validan completas.
+PATRONES_LIMPIOS = {
+    "Nombre Proyecto": (rf"(?:{_alternativas(SIGLAS_NEGOCIO)})_[A-Za-z0-9ÁÉÍÓÚÜÑáéíóúüñ]+", []),
+    "Fecha Captura": (_FECHA_LIMPIA, []),
+    "Código Interno": (rf"(?:{_alternativas(SIGLAS_NEGOCIO)})_[A-Za-zÁÉÍÓÚÜÑáéíóúüñ]+_PJ(?:0[1-9]|[1-9]\d|\d{{3}})", []),
+    "Símbolo": ("No Aplica", []),
+    "Escala": ("10000|25000", []),
+    "Fuente Información": (_alternativas(f for f in FUENTES_PERMITIDAS if f not in FUENTES_RESTRINGIDAS_PREDIOS), []),
+    "Creado Por": (_NOMBRE_COMPLETO, ["No Aplica", *_NOMBRES_ESPECIALES]),
+    "Fecha Última Actualización": (rf"{_FECHA_LIMPIA}|1900-01-01|01/01/1900", []),
+    "Modificado Por": (rf"No Aplica|{_NOMBRE_COMPLETO}", _NOMBRES_ESPECIALES),
+    "Comentarios": (r"Sin Comentarios|[A-ZÁÉÍÓÚÜÑ][a-záéíóúüñ]+(?: [A-Za-z0-9ÁÉÍÓÚÜÑáéíóúüñ]+)*", VARIANTES_SIN_COMENTARIOS),
+    "Cód DANE Depto": (_alternativas(sorted(codigos_dane_deptos)), []),
+    "Cód DANE Mpio": (r"\d{3}", []),
+    "Año Vigencia Insumo Geográfico": (r"Sin Información|200\d", []),   # nunca posterior a una Fecha Captura limpia
+    "RULEID": ("1", []),
+    "Código SIG Predio Jurídico": (r"CLC0\d{4}|CO3[1-6]\d{5,6}|L0\d{4}|SC0\d{4}|\d{4,10}", []),
+    "Área Terreno Calculada Mts2": (r"\d*[1-9]\d*(?:\.\d+)?|\d+\.\d*[1-9]\d*", []),   # número con punto, mayor que cero
+    "Tipo de Propiedad": (rf"(?i:{_alternativas(TIPOS_PROPIEDAD)})", []),
+}
+
+def patron_campo(columna, fin="$"):
+    """Patrón de un campo limpio de la columna; fin marca dónde termina el campo."""
+    patron, excluidos = PATRONES_LIMPIOS[columna]
+    # Solo se excluyen los textos que el patrón podría aceptar (menos trabajo por línea)
+    excluidos = [t for t in [*VALORES_NULOS, *excluidos] if re.fullmatch(patron, t, re.IGNORECASE)]
+    if not excluidos:
+        return patron
+    return rf"(?!(?i:{_alternativas(excluidos)})(?:{fin}))(?:{patron})"
+
+def patron_linea(encabezado, sep, columnas=columnas_objetivo):
+    """Un solo patrón compilado para la línea completa: un grupo por campo del encabezado
+       (los campos sin patrón aceptan cualquier texto sin comillas ni separador).
+    """
+    libre = f"[^{re.escape(sep)}\"\r\n]*"
+    fin = f"{re.escape(sep)}|$"
+    campos = [patron_campo(c, fin) if c in PATRONES_LIMPIOS and c in columnas else libre for c in encabezado]
+    return re.compile(re.escape(sep).join(f"(?:{c})" for c in campos))
+
+def filas_limpias(ruta, columnas=columnas_objetivo, progreso=SIN_PROGRESO):
+    """Máscara (una entrada por registro) de las filas del CSV sin hallazgos de valor, leyendo
+       las líneas crudas. Los registros con comillas (o que ocupan varias líneas) cuentan como
+       no limpios. Devuelve None para capas GIS.
+    """
+    if es_capa(ruta):
+        return None
+    formato = detectar_formato(ruta)
+    with progreso.etapa("Pre-escaneo de líneas"):
+        with open(ruta, encoding=formato["encoding"], newline="") as f:
+            encabezado = next(csv.reader([f.readline()], delimiter=formato["sep"]), [])
+            coincide = patron_linea(encabezado, formato["sep"], columnas).fullmatch
+            limpias, en_comillas = [], False
+            for linea in f:
+                comillas = linea.count('"')
+                if en_comillas:   # continuación de un campo entre comillas
+                    en_comillas = comillas % 2 == 0
+                    continue
+                linea = linea.rstrip("\r\n")
+                if not linea:     # pandas omite las líneas en blanco
+                    continue
+                limpias.append(comillas == 0 and coincide(linea) is not None)
+                en_comillas = comillas % 2 == 1
+        progreso.avanzar(len(limpias))
+    return np.array(limpias, dtype=bool)
+
+def _coincide_columna(serie, patron):
+    """str.fullmatch evaluado una vez por valor distinto (nulos → False)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, valores = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, valores = pd.factorize(serie)
+    resultados = pd.Series(valores, dtype=object).str.fullmatch(patron, na=False).to_numpy(dtype=bool)
+    return np.append(resultados, False)[codigos]
+
+def filas_limpias_dataframe(df_raw):
+    """Misma máscara que filas_limpias pero sobre un DataFrame ya cargado (API, equivalencia)."""
+    limpias = np.ones(len(df_raw), dtype=bool)
+    for columna in PATRONES_LIMPIOS:
+        if columna in df_raw:
+            limpias &= _coincide_columna(df_raw[columna], re.compile(patron_campo(columna)))
+    return limpias
+
+def _por_valor(serie, prueba):
+    """Aplica prueba(valor) una vez por valor distinto → máscara numpy."""
+    codigos, valores = pd.factorize(serie.astype(object))
+    return np.append([bool(prueba(v)) for v in valores], False)[codigos]
+
+def _revisar_codigo_interno(indice, df_raw):
+    codigos = df_raw["Código Interno"].astype(object)
+    duplicado = _por_valor(codigos, lambda v: indice.codigo_interno[v] > 1)
+    sin_proyecto = [p not in c for p, c in zip(df_raw["Nombre Proyecto"].astype(object), codigos)]
+    return duplicado | np.array(sin_proyecto, dtype=bool)
+
+def _revisar_area(indice, df_raw):
+    valores = pd.to_numeric(df_raw["Área Terreno Calculada Mts2"].astype(object), errors="coerce")
+    revisar = indice.areas_atipicas(df_raw, valores).to_numpy(dtype=bool)
+    if COLUMNA_AREA_GEOMETRIA in df_raw:
+        revisar |= df_raw[COLUMNA_AREA_GEOMETRIA].notna().to_numpy()
+    return revisar
+
+# Reglas que dependen de los índices globales: filas limpias que igual pueden tener hallazgo
+CONSULTAS_LIMPIAS = {
+    "Nombre Proyecto": lambda indice, d: _por_valor(
+        d["Nombre Proyecto"], partial(indice.valor_con_variantes, "Nombre Proyecto")),
+    "Código Interno": _revisar_codigo_interno,
+    "Creado Por": lambda indice, d: _por_valor(
+        d["Creado Por"], lambda v: indice.variantes_nombre("Creado Por", v) > 1
+        or indice.valor_con_variantes("Creado Por", v)),
+    "Modificado Por": lambda indice, d: _por_valor(
+        d["Modificado Por"], lambda v: v != "No Aplica" and indice.variantes_nombre("Modificado Por", v) > 1),
+    "Código SIG Predio Jurídico": lambda indice, d: _por_valor(
+        d["Código SIG Predio Jurídico"], lambda v: indice.codigo_sig[v] > 1),
+    "Área Terreno Calculada Mts2": _revisar_area,
+}
+
+def filas_a_revisar(columna, df_raw, indice, limpias, df_limpias):
+    """Máscara de filas que debe recorrer el bloque de la columna (None = todas)."""
+    if limpias is None or columna not in PATRONES_LIMPIOS:
+        return None
+    revisar = ~limpias
+    if columna in CONSULTAS_LIMPIAS and len(df_limpias):
+        revisar[limpias] = CONSULTAS_LIMPIAS[columna](indice, df_limpias)
+    return revisar
+
+# ==========================
+# Selección de columnas y reglas
+# ==========================
+# Columnas que lee cada bloque además de la propia
+DEPENDENCIAS_COLUMNA = {
+    "Código Interno": ["Nombre Proyecto"],
+    "Año Vigencia Insumo Geográfico": ["Fecha Captura"],
+    "Área Terreno Calculada Mts2": ["Cód DANE Depto", "Cód DANE Mpio", "Nombre Vereda"],
+}
+for _columna in REGLAS_COLUMNA:
+    _lee = columnas_reglas(_columna)[1:]
+    if _lee:
+        DEPENDENCIAS_COLUMNA.setdefault(_columna, _lee)
+
+class Seleccion:
+    """Columnas y reglas nombradas a ejecutar. solo / excluir aceptan nombres de columna
+       o de regla: una columna en solo activa todas sus reglas nombradas; una regla en solo
+       activa su columna, pero de esa columna solo las reglas nombradas en solo. Lo que
+       queda fuera no se lee del CSV, no se indexa y no se valida.
+    """
+
+    def __init__(self, solo=None, excluir=None):
+        solo, excluir = list(solo or []), set(excluir or [])
+        desconocidos = [n for n in [*solo, *excluir] if n not in VALIDADORES_COLUMNA and n not in REGLAS_NOMBRADAS]
+        if desconocidos:
+            raise ValueError(
+                f"Columnas o reglas desconocidas: {', '.join(desconocidos)} "
+                f"(reglas disponibles: {', '.join(REGLAS_NOMBRADAS)})"
+            )
+
+        elegidas = {REGLAS_NOMBRADAS.get(n, n) for n in solo} if solo else set(VALIDADORES_COLUMNA)
+        self.columnas = [c for c in VALIDADORES_COLUMNA if c in elegidas and c not in excluir]
+        # Columnas con todas sus reglas: las pedidas por nombre de columna (o todas si no hay solo)
+        completas = {n for n in solo if n in VALIDADORES_COLUMNA} if solo else set(VALIDADORES_COLUMNA)
+        self.reglas = {
+            r for r, c in REGLAS_NOMBRADAS.items()
+            if c in self.columnas and r not in excluir and (c in completas or r in solo)
+        }
+
+        necesarias = {"ID", *self.columnas, *(d for c in self.columnas for d in DEPENDENCIAS_COLUMNA.get(c, []))}
+        self.columnas_carga = [c for c in columnas_objetivo if c in necesarias]
+
+    @property
+    def completa(self):
+        return len(self.columnas) == len(VALIDADORES_COLUMNA) and len(self.reglas) == len(REGLAS_NOMBRADAS)
+
+    def clave(self):
+        """Texto estable para la clave de caché ("" si se ejecuta todo)."""
+        if self.completa:
+            return ""
+        return ",".join(self.columnas) + "|" + ",".join(sorted(self.reglas))
+
+def limpiar_registro(raw):
+    """Versión normalizada de un registro (igual a preparar_datos para una sola fila)."""
+    fila = {}
+    for columna in columnas_objetivo:
+        valor = limpiar_valor(raw.get(columna))
+        fila[columna] = pd.NA if isinstance(valor, str) and valor == "" else valor
+    return fila
+
+def columnas_con_derivadas(df_raw, columnas=columnas_objetivo):
+    """Columnas a validar más las derivadas que trae el DataFrame (área del polígono en capas).
+       df_raw puede ser el DataFrame o directamente sus nombres de columna.
+    """
+    presentes = getattr(df_raw, "columns", df_raw)
+    return list(columnas) + [c for c in COLUMNAS_DERIVADAS if c in presentes and c not in columnas]
+
+def validar_registro(raw, indice, fila=None):
+    """Valida un solo registro (dict columna → texto original) contra los índices globales."""
+    if fila is None:
+        fila = limpiar_registro(raw)
+    id_val = fila["ID"]
+
+    registros = []
+    for validador in VALIDADORES_COLUMNA.values():
+        registros.extend(validador(id_val, raw, fila, indice))
+    return registros
+
+def validar(df_raw, df, progreso=SIN_PROGRESO, seleccion=None, limpias=None, indice=None):
+    """Aplica cada bloque de columna seleccionado a todas las filas y devuelve la lista de
+       observaciones (agrupadas por columna, en el orden de las filas dentro de cada una).
+       limpias = máscara del pre-escaneo: esas filas solo pasan por los bloques que las necesitan.
+       indice = índices globales ya construidos (muestreo); si no se da se construyen con df_raw.
+    """
+    seleccion = seleccion or Seleccion()
+    # Registros fila a fila solo con las columnas que leen los bloques sin versión por lote
+    por_fila = [c for c in seleccion.columnas if c not in VALIDADORES_LOTE]
+    necesarias = {"ID", *por_fila, *(d for c in por_fila for d in DEPENDENCIAS_COLUMNA.get(c, []))}
+    columnas_filas = [c for c in seleccion.columnas_carga if c in necesarias]
+    with progreso.etapa("Índices globales", len(df_raw)):
+        if indice is None:
+            indice = IndiceGlobal.desde_dataframe(df_raw, seleccion.reglas)
+        filas_raw = df_raw[columnas_con_derivadas(df_raw, columnas_filas)].to_dict("records") if por_fila else []
+        filas = df[columnas_filas].to_dict("records") if por_fila else []
+        ids = [fila["ID"] for fila in filas]
+        progreso.avanzar(len(df_raw))
+
+    df_limpias = df_raw[limpias] if limpias is not None else None
+    registros = []
+    for columna in seleccion.columnas:
+        revisar = filas_a_revisar(columna, df_raw, indice, limpias, df_limpias)
+        if columna in VALIDADORES_LOTE:
+            with progreso.etapa(f"Validación · {columna}", len(df_raw)):
+                if revisar is None:
+                    registros.extend(VALIDADORES_LOTE[columna](df_raw, df, indice))
+                else:
+                    registros.extend(VALIDADORES_LOTE[columna](df_raw[revisar], df[revisar], indice))
+                progreso.avanzar(len(df_raw))
+            continue
+
+        validador = VALIDADORES_COLUMNA[columna]
+        with progreso.etapa(f"Validación · {columna}", len(filas)):
+            for id_val, raw, fila in (zip(ids, filas_raw, filas) if revisar is None
+                                      else compress(zip(ids, filas_raw, filas), revisar)):
+                registros.extend(validador(id_val, raw, fila, indice))
+                progreso.avanzar()
+            if revisar is not None:
+                progreso.avanzar(len(filas) - int(revisar.sum()))
+    return registros
+
 # ==========================
 # Función para limpiar caracteres ilegales de Excel
 # ==========================
@@ -1941,33 +3229,1640 @@ def limpiar_excel(value):
         return re.sub(r'[\x00-\x1F\x7F]', '', value)
     return value
 
+# ==========================
+# Caché de resultados en disco
+# ==========================
+VERSION_REGLAS = "2025.10.04"  # 👈 subir cada vez que cambie una regla u observación
+CACHE_DIR = os.environ.get(
+    "EDITPLOT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "inconsistencias_editplot")
+)
+CACHE_MAX_MB = int(os.environ.get("EDITPLOT_CACHE_MAX_MB", "500"))
+
+def hash_archivo(ruta, bloque=1 << 20):
+    """SHA-256 del contenido del archivo, leído por bloques.
+       En un Shapefile los atributos viven en el .dbf (y la codificación en el .cpg): se incluyen.
+    """
+    h = hashlib.sha256()
+    partes = [ruta]
+    if str(ruta).lower().endswith(".shp"):
+        base = os.path.splitext(ruta)[0]
+        partes += [base + ext for ext in (".dbf", ".cpg") if os.path.exists(base + ext)]
+    for parte in partes:
+        with open(parte, "rb") as f:
+            for chunk in iter(lambda: f.read(bloque), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+def parametros_reglas():
+    """Umbrales de las reglas que se ajustan por variable de entorno (cambian el reporte)."""
+    return [TOLERANCIA_AREA, TOLERANCIA_AREA_MIN_M2, AREA_ATIPICA_K, AREA_ATIPICA_RAZON, AREA_ATIPICA_MIN_GRUPO]
+
+def clave_cache(ruta, seleccion=None, motor_carga="pandas", hash_csv=None):
+    """Clave = contenido del CSV + versión de reglas y sus umbrales + fecha de revisión
+       (las reglas de fechas comparan contra la fecha actual) + lector y capa elegida
+       + selección parcial, si la hay. hash_csv = hash_archivo(ruta) si ya se calculó.
+    """
+    umbrales = ",".join(repr(p) for p in parametros_reglas())
+    base = (f"{hash_csv or hash_archivo(ruta)}|{VERSION_REGLAS}|{umbrales}|{date.today().isoformat()}"
+            f"|{modo_carga(ruta, motor_carga)}")
+    if es_capa(ruta) and pyogrio is not None:
+        base += f"|{resolver_capa(ruta)}"
+    if seleccion is not None and not seleccion.completa:
+        base += f"|{seleccion.clave()}"
+    return hashlib.sha256(base.encode("utf-8")).hexdigest()
+
+def leer_cache(clave, cache_dir=CACHE_DIR):
+    """Devuelve el reporte cacheado o None si no existe / está dañado."""
+    ruta_cache = os.path.join(cache_dir, f"{clave}.pkl")
+    if not os.path.exists(ruta_cache):
+        return None
+    try:
+        reporte = pd.read_pickle(ruta_cache)
+        os.utime(ruta_cache)  # 👈 marcar como usado recientemente (LRU)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        os.remove(ruta_cache)
+        return None
+    return reporte
+
+def guardar_cache(clave, reporte, cache_dir=CACHE_DIR, max_mb=CACHE_MAX_MB):
+    os.makedirs(cache_dir, exist_ok=True)
+    ruta_cache = os.path.join(cache_dir, f"{clave}.pkl")
+    temporal = ruta_cache + ".tmp"
+    reporte.to_pickle(temporal)
+    os.replace(temporal, ruta_cache)
+    depurar_cache(cache_dir, max_mb)
+
+def depurar_cache(cache_dir=CACHE_DIR, max_mb=CACHE_MAX_MB):
+    """Elimina las entradas usadas hace más tiempo hasta quedar bajo el límite."""
+    entradas = []
+    for e in os.scandir(cache_dir):
+        if e.is_file() and e.name.endswith(".pkl"):
+            st = e.stat()
+            entradas.append((st.st_mtime, st.st_size, e.path))
+
+    total = sum(tam for _, tam, _ in entradas)
+    limite = max_mb * 1024 * 1024
+    for _, tam, path in sorted(entradas):
+        if total <= limite:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # otro proceso (modo servicio) ya la eliminó
+        total -= tam
+
+# ==========================
+# Ejecución completa
+# ==========================
+
+def validar_dataframe(df_raw, progreso=SIN_PROGRESO, seleccion=None, limpias=None, indice=None, df=None):
+    """Aplica las reglas (todas o la selección) a un DataFrame con las columnas objetivo como texto.
+       limpias = máscara de filas_limpias (si no se da, o no cuadra, se calcula sobre el DataFrame).
+       df = vista normalizada (preparar_datos) ya calculada por quien llama.
+    """
+    seleccion = seleccion or Seleccion()
+    df_raw = df_raw[columnas_con_derivadas(df_raw, seleccion.columnas_carga)]
+    if PREFILTRO_ACTIVO:
+        if limpias is None or len(limpias) != len(df_raw):
+            limpias = filas_limpias_dataframe(df_raw)
+        progreso.mensaje(f"🔎 Pre-escaneo: {int(limpias.sum()):,} de {len(df_raw):,} filas sin hallazgos de valor",
+                         filas_limpias=int(limpias.sum()))
+    else:
+        limpias = None
+    if df is None:
+        with progreso.etapa("Normalización", len(df_raw)):
+            df = preparar_datos(df_raw)
+            progreso.avanzar(len(df_raw))
+    registros = validar(df_raw, df, progreso, seleccion, limpias, indice)
+
+    # Convertir a DataFrame
+    return pd.DataFrame(registros)
+
+def validar_fila_a_fila(df_raw, progreso=SIN_PROGRESO):
+    """Motor de referencia: todas las reglas de un registro antes de pasar al siguiente,
+       como el ciclo original del script. Se usa para comprobar los motores optimizados.
+    """
+    df = preparar_datos(df_raw)
+    indice = IndiceGlobal.desde_dataframe(df_raw)
+    registros = []
+    with progreso.etapa("Validación fila a fila", len(df_raw)):
+        for raw, fila in zip(df_raw[columnas_con_derivadas(df_raw)].to_dict("records"),
+                             df[columnas_objetivo].to_dict("records")):
+            registros.extend(validar_registro(raw, indice, fila))
+            progreso.avanzar()
+    return pd.DataFrame(registros)
+
+# Motores de validación: todos deben producir las mismas observaciones que "filas"
+MOTOR_REFERENCIA = "filas"
+MOTORES_VALIDACION = {
+    "filas": validar_fila_a_fila,
+    "columnas": validar_dataframe,
+}
+
+# ==========================
+# Motor Polars (lectura perezosa y multihilo)
+# ==========================
+# Duplicados con conteos por grupo y cada bloque evaluado una vez por combinación distinta de
+# sus columnas (las mismas reglas del script); unique y join devuelven las observaciones a las filas.
+DUPLICADOS_POLARS = {
+    "codigo_interno_duplicado": ("Código Interno", "codigo_interno"),
+    "codigo_sig_duplicado": ("Código SIG Predio Jurídico", "codigo_sig"),
+}
+
+def escanear_polars(ruta, columnas=columnas_objetivo):
+    """LazyFrame con las columnas como texto. CSV UTF-8: pl.scan_csv directo (la lectura se hace
+       en paralelo al ejecutar); otras codificaciones y capas GIS pasan por cargar_csv.
+    """
+    if pl is None:
+        raise ImportError("El motor de validación 'polars' requiere instalar polars")
+    formato = None if es_capa(ruta) else detectar_formato(ruta)
+    if formato is None or formato["encoding"] not in ("utf-8", "utf-8-sig"):
+        return dataframe_polars(cargar_csv(ruta, columnas=columnas, categorias=False)).lazy()
+    return pl.scan_csv(
+        ruta, separator=formato["sep"], infer_schema=False, null_values=VALORES_NULOS, encoding="utf8"
+    ).select(columnas)
+
+def dataframe_polars(df_raw):
+    """DataFrame de pandas (object, string o category) → Polars con texto y nulos."""
+    columnas = {}
+    for c in df_raw.columns:
+        serie = df_raw[c]
+        if c in COLUMNAS_DERIVADAS:
+            columnas[c] = pl.Series(c, serie.to_numpy(dtype=float), dtype=pl.Float64)
+        else:
+            columnas[c] = pl.Series(c, serie.astype(object).where(serie.notna(), None).tolist(), dtype=pl.String)
+    return pl.DataFrame(columnas)
+
+def indice_polars(df, reglas):
+    """IndiceGlobal: conteos de duplicados con group_by en Polars; el resto sobre las columnas que usa."""
+    otras = set(reglas) - set(DUPLICADOS_POLARS)
+    columnas = {REGLAS_NOMBRADAS[r] for r in otras}
+    if "area_atipica" in otras:
+        columnas.update(DEPENDENCIAS_COLUMNA["Área Terreno Calculada Mts2"])
+    columnas = [c for c in df.columns if c in columnas]
+    indice = IndiceGlobal.desde_dataframe(df.select(columnas).to_pandas(), otras)
+    indice.reglas = set(reglas)
+    for regla, (columna, atributo) in DUPLICADOS_POLARS.items():
+        if regla in indice.reglas:
+            conteos = df.group_by(columna).len().drop_nulls(columna)
+            getattr(indice, atributo).update(dict(zip(conteos[columna].to_list(), conteos["len"].to_list())))
+    return indice
+
+def evaluar_distintos(validador, filas, indice, claves_reporte, inicio=0):
+    """Aplica el bloque a cada combinación distinta (dict columna → texto) y devuelve sus
+       observaciones sin ID, numeradas por combinación (__valor) y por orden dentro de ella.
+       claves_reporte acumula las columnas del reporte en el orden en que aparecen.
+    """
+    observaciones = []
+    for valor, raw in enumerate(filas, start=inicio):
+        for orden, obs in enumerate(validador(None, raw, limpiar_registro(raw), indice)):
+            claves_reporte.update(dict.fromkeys(obs))
+            observaciones.append({"__valor": valor, "__orden": orden, **{k: v for k, v in obs.items() if k != "ID"}})
+    return observaciones
+
+def _id_limpio(valor):
+    valor = limpiar_valor(valor)
+    return None if valor == "" else valor
+
+def validar_polars(datos, progreso=SIN_PROGRESO, seleccion=None):
+    """Motor "polars": datos = DataFrame de pandas o LazyFrame de escanear_polars."""
+    if pl is None:
+        raise ImportError("El motor de validación 'polars' requiere instalar polars")
+    seleccion = seleccion or Seleccion()
+    lf = datos if isinstance(datos, pl.LazyFrame) else dataframe_polars(datos).lazy()
+    with progreso.etapa("Carga (Polars)"):
+        df = lf.select(columnas_con_derivadas(lf.collect_schema(), seleccion.columnas_carga)).collect()
+        df = df.with_row_index("__fila")
+        progreso.avanzar(df.height)
+
+    with progreso.etapa("Índices globales", df.height):
+        indice = indice_polars(df, seleccion.reglas)
+        progreso.avanzar(df.height)
+
+    bloques, claves_reporte = [], {}
+    for columna in seleccion.columnas:
+        validador = VALIDADORES_COLUMNA[columna]
+        claves = [columna, *DEPENDENCIAS_COLUMNA.get(columna, [])]
+        if columna == "Área Terreno Calculada Mts2":
+            claves = columnas_con_derivadas(df.columns, claves)
+        with progreso.etapa(f"Validación · {columna}", df.height):
+            distintos = df.select(claves).unique(maintain_order=True).with_row_index("__valor")
+            observaciones = evaluar_distintos(validador, distintos.drop("__valor").iter_rows(named=True),
+                                              indice, claves_reporte)
+            if observaciones:
+                tabla = pl.DataFrame(observaciones, infer_schema_length=None)
+                bloques.append(
+                    df.select("__fila", "ID", *claves)
+                    .join(distintos, on=claves, how="inner", nulls_equal=True)
+                    .join(tabla, on="__valor", how="inner")
+                    .sort("__fila", "__orden")
+                    .drop("__fila", "__valor", "__orden", *claves)
+                )
+            progreso.avanzar(df.height)
+
+    if not bloques:
+        return pd.DataFrame()
+    reporte = pl.concat(bloques, how="diagonal_relaxed")
+    # ID normalizado como en preparar_datos (espacios recortados, vacío → NA)
+    ids = reporte["ID"].unique().drop_nulls().to_list()
+    reporte = reporte.with_columns(pl.col("ID").replace_strict(
+        {i: _id_limpio(i) for i in ids}, default=None, return_dtype=pl.String
+    ).alias("ID"))
+    return reporte.select(list(claves_reporte)).to_pandas()
+
+if pl is not None:
+    MOTORES_VALIDACION["polars"] = validar_polars
+
+# ==========================
+# Motor DuckDB (datos en disco)
+# ==========================
+# El CSV se lee en una base DuckDB temporal en disco con memory_limit; los duplicados y los
+# valores distintos salen de consultas SQL y las observaciones se leen por lotes. Lo que no
+# está acotado es el lado de Python: el IndiceGlobal (variantes, veredas, similitud, áreas) y
+# las plantillas por valor crecen con la cantidad de valores distintos, no con las filas.
+DUCKDB_MEMORIA = os.environ.get("EDITPLOT_DUCKDB_MEMORIA", "1GB")
+DUCKDB_LOTE = int(os.environ.get("EDITPLOT_DUCKDB_LOTE", "100000"))
+COLUMNAS_OBSERVACION = ["Columna Analizada", "Dato Analizado", "Observación General", "Observación Específica", "Tipología"]
+
+def _sql(columna):
+    return '"' + columna.replace('"', '""') + '"'
+
+def _texto_sql(valor):
+    return "'" + str(valor).replace("'", "''") + "'"
+
+def _lista_sql(valores):
+    return "[" + ", ".join(map(_texto_sql, valores)) + "]"
+
+def memoria_duckdb(valor=None):
+    """Límite de memoria de DuckDB (EDITPLOT_DUCKDB_MEMORIA) validado: número y unidad (KB … TiB)."""
+    valor = (valor or DUCKDB_MEMORIA).strip()
+    if not re.fullmatch(r"\d+(\.\d+)?\s*(B|[KMGT]i?B)", valor, re.IGNORECASE):
+        raise ValueError(f"EDITPLOT_DUCKDB_MEMORIA no es un tamaño válido (p. ej. 1GB, 512MiB): {valor!r}")
+    return valor
+
+def conectar_duckdb(datos, carpeta, columnas=columnas_objetivo):
+    """Conexión a una base temporal en carpeta con la tabla datos (rowid = orden del archivo).
+       datos = ruta de CSV UTF-8 (DuckDB lo lee directamente), otra ruta (pasa por cargar_csv)
+       o un DataFrame de pandas.
+    """
+    con = duckdb.connect(os.path.join(carpeta, "editplot.duckdb"))
+    # SET no admite parámetros: los valores van como literales escapados
+    con.execute(f"SET memory_limit = {_texto_sql(memoria_duckdb())}")
+    con.execute(f"SET temp_directory = {_texto_sql(carpeta)}")
+    con.execute("SET preserve_insertion_order = true")
+
+    if isinstance(datos, (str, os.PathLike)) and not es_capa(datos):
+        formato = detectar_formato(datos)
+        if formato["encoding"] in ("utf-8", "utf-8-sig"):
+            con.execute(f"""
+                CREATE TABLE datos AS SELECT {", ".join(map(_sql, columnas))}
+                FROM read_csv(?, delim = ?, header = true, all_varchar = true, quote = '"', escape = '"',
+                              nullstr = {_lista_sql(VALORES_NULOS)})
+            """, [str(datos), formato["sep"]])
+            return con
+    if isinstance(datos, (str, os.PathLike)):
+        datos = cargar_csv(datos, columnas=columnas, categorias=False)
+    fuente = datos[columnas_con_derivadas(datos, columnas)].copy()
+    for c in fuente.columns:
+        if c not in COLUMNAS_DERIVADAS:
+            fuente[c] = fuente[c].astype(object).where(fuente[c].notna(), None)
+    con.register("fuente", fuente)
+    con.execute("CREATE TABLE datos AS SELECT * FROM fuente")
+    con.unregister("fuente")
+    return con
+
+def indice_duckdb(con, reglas):
+    """IndiceGlobal por lotes en el orden del archivo; duplicados con GROUP BY … HAVING."""
+    indice = IndiceGlobal(set(reglas) - set(DUPLICADOS_POLARS))
+    columnas = {REGLAS_NOMBRADAS[r] for r in indice.reglas}
+    if "area_atipica" in indice.reglas:
+        columnas.update(DEPENDENCIAS_COLUMNA["Área Terreno Calculada Mts2"])
+    presentes = [c for c, *_ in con.execute("DESCRIBE datos").fetchall()]
+    columnas = [c for c in presentes if c in columnas]
+    if columnas:
+        lector = con.execute(f"SELECT {', '.join(map(_sql, columnas))} FROM datos ORDER BY rowid")
+        for lote in lector.fetch_record_batch(DUCKDB_LOTE):
+            indice.agregar_lote(lote.to_pandas())
+    indice.precalcular()
+
+    indice.reglas = set(reglas)
+    for regla, (columna, atributo) in DUPLICADOS_POLARS.items():
+        if regla in indice.reglas:
+            duplicados = con.execute(
+                f"SELECT {_sql(columna)}, count(*) FROM datos WHERE {_sql(columna)} IS NOT NULL "
+                f"GROUP BY 1 HAVING count(*) > 1"
+            ).fetchall()
+            getattr(indice, atributo).update(dict(duplicados))
+    return indice
+
+def observaciones_duckdb(datos, progreso=SIN_PROGRESO, seleccion=None, carpeta=None):
+    """Genera el reporte en lotes de DataFrames (a lo sumo DUCKDB_LOTE filas cada uno), en el
+       mismo orden que el motor "columnas". Las filas quedan en disco; la memoria de Python crece
+       con los valores distintos (índices globales y plantillas), no está acotada por memory_limit.
+    """
+    if duckdb is None:
+        raise ImportError("El motor de validación 'duckdb' requiere instalar duckdb")
+    seleccion = seleccion or Seleccion()
+    with tempfile.TemporaryDirectory(prefix="editplot_duckdb_", dir=carpeta) as temporal:
+        con = conectar_duckdb(datos, temporal, seleccion.columnas_carga)
+        try:
+            total = con.execute("SELECT count(*) FROM datos").fetchone()[0]
+            presentes = [c for c, *_ in con.execute("DESCRIBE datos").fetchall()]
+            with progreso.etapa("Índices globales", total):
+                indice = indice_duckdb(con, seleccion.reglas)
+                progreso.avanzar(total)
+
+            claves_reporte = {}
+            for columna in seleccion.columnas:
+                claves = [columna, *DEPENDENCIAS_COLUMNA.get(columna, [])]
+                if columna == "Área Terreno Calculada Mts2":
+                    claves = columnas_con_derivadas(presentes, claves)
+                lista = ", ".join(map(_sql, claves))
+                with progreso.etapa(f"Validación · {columna}", total):
+                    con.execute(f"CREATE OR REPLACE TABLE distintos AS SELECT DISTINCT {lista} FROM datos")
+                    con.execute(
+                        "CREATE OR REPLACE TABLE plantillas (__valor BIGINT, __orden INTEGER, "
+                        + ", ".join(f"{_sql(c)} VARCHAR" for c in COLUMNAS_OBSERVACION)
+                        + ', "Anio_Captura" DOUBLE, "Anio_Vigencia_Num" DOUBLE)'
+                    )
+                    lector = con.execute(f"SELECT rowid, {lista} FROM distintos").fetch_record_batch(DUCKDB_LOTE)
+                    for lote in lector:
+                        lote = lote.to_pandas()
+                        filas = lote[claves].astype(object).where(lote[claves].notna(), None).to_dict("records")
+                        observaciones = evaluar_distintos(
+                            VALIDADORES_COLUMNA[columna], filas, indice, claves_reporte
+                        )
+                        if observaciones:
+                            tabla = pd.DataFrame(observaciones)
+                            tabla["__valor"] = lote["rowid"].to_numpy()[tabla["__valor"]]
+                            con.register("nuevas", tabla)
+                            con.execute("INSERT INTO plantillas BY NAME SELECT * FROM nuevas")
+                            con.unregister("nuevas")
+
+                    union = " AND ".join(f"d.{_sql(c)} IS NOT DISTINCT FROM k.{_sql(c)}" for c in claves)
+                    lector = con.execute(f"""
+                        SELECT d."ID" AS "ID", p.* EXCLUDE (__valor, __orden)
+                        FROM datos d JOIN distintos k ON {union} JOIN plantillas p ON p.__valor = k.rowid
+                        ORDER BY d.rowid, p.__orden
+                    """).fetch_record_batch(DUCKDB_LOTE)
+                    for lote in lector:
+                        lote = lote.to_pandas()
+                        lote["ID"] = lote["ID"].map({i: _id_limpio(i) for i in lote["ID"].dropna().unique()})
+                        yield lote[[c for c in claves_reporte if c in lote.columns]]
+                    progreso.avanzar(total)
+        finally:
+            con.close()
+
+def guardar_reporte_csv(lotes, outfile):
+    """Escribe los lotes del reporte en un CSV (;) a medida que llegan. Devuelve el total de filas."""
+    total = 0
+    with open(outfile, "w", encoding="utf-8-sig", newline="") as f:
+        for lote in lotes:
+            lote.to_csv(f, sep=";", index=False, header=total == 0)
+            total += len(lote)
+    return total
+
+def validar_duckdb(datos, progreso=SIN_PROGRESO, seleccion=None):
+    """Motor "duckdb": reúne los lotes de observaciones_duckdb en el reporte."""
+    lotes = [lote for lote in observaciones_duckdb(datos, progreso, seleccion) if len(lote)]
+    if not lotes:
+        return pd.DataFrame()
+    return pd.concat(lotes, ignore_index=True)
+
+if duckdb is not None:
+    MOTORES_VALIDACION["duckdb"] = validar_duckdb
+
+def ejecutar_validacion(ruta, motor_carga="pandas", progreso=SIN_PROGRESO, seleccion=None, motor_validacion="columnas"):
+    """Carga el CSV (solo las columnas que necesita la selección), aplica las reglas y devuelve el reporte.
+       motor_validacion="polars" escanea el archivo con Polars y "duckdb" lo valida con las filas en disco.
+    """
+    seleccion = seleccion or Seleccion()
+    if motor_validacion == "polars":
+        return validar_polars(escanear_polars(ruta, seleccion.columnas_carga), progreso, seleccion)
+    if motor_validacion == "duckdb":
+        return validar_duckdb(ruta, progreso, seleccion)
+    limpias = filas_limpias(ruta, seleccion.columnas_carga, progreso) if PREFILTRO_ACTIVO else None
+    df_raw = cargar_csv(ruta, motor_carga, progreso, seleccion.columnas_carga)
+    return validar_dataframe(df_raw, progreso, seleccion, limpias)
+
+def obtener_reporte(ruta, usar_cache=True, cache_dir=CACHE_DIR, cache_max_mb=CACHE_MAX_MB, motor_carga="pandas",
+                    progreso=SIN_PROGRESO, seleccion=None, motor_validacion="columnas", hash_csv=None):
+    """Reutiliza el reporte cacheado si el archivo y las reglas no cambiaron
+       (todos los motores producen el mismo reporte, así que comparten la caché).
+       hash_csv evita volver a leer el archivo si quien llama ya lo calculó (p. ej. para el historial).
+    """
+    if not usar_cache:
+        return ejecutar_validacion(ruta, motor_carga, progreso, seleccion, motor_validacion)
+
+    clave = clave_cache(ruta, seleccion, motor_carga, hash_csv)
+    reporte = leer_cache(clave, cache_dir)
+    if reporte is not None:
+        progreso.mensaje("♻️ Resultado reutilizado desde caché", cache=True)
+        return reporte
+
+    reporte = ejecutar_validacion(ruta, motor_carga, progreso, seleccion, motor_validacion)
+    guardar_cache(clave, reporte, cache_dir, cache_max_mb)
+    return reporte
+
+# ==========================
+# Muestreo estadístico (estimación rápida)
+# ==========================
+# Para saber "qué tan sucio está" un export enorme sin la corrida completa: se valida una muestra
+# y se estiman las tasas de hallazgo con intervalos de confianza. El archivo se lee una sola vez
+# por lotes; de las filas que no quedan en la muestra solo se guardan conteos por hash de las
+# columnas clave de los duplicados. Las demás reglas entre filas (variantes, similitud, áreas
+# atípicas) se evalúan contra la propia muestra, así que son aproximadas.
+MUESTRA_TAMANO = 10000
+MUESTRA_LOTE = int(os.environ.get("EDITPLOT_MUESTRA_LOTE", "100000"))
+CONFIANZA_MUESTRA = 0.95
+COLUMNA_ESTRATO = "Cód DANE Depto"
+
+# Regla de duplicados → (columna contada en todo el archivo, atributo del IndiceGlobal)
+CONTEOS_MUESTRA = {
+    "codigo_interno_duplicado": ("Código Interno", "codigo_interno"),
+    "codigo_sig_duplicado": ("Código SIG Predio Jurídico", "codigo_sig"),
+}
+
+def _hash_textos(valores):
+    return pd.util.hash_array(np.asarray(valores, dtype=object))
+
+class ContadorHash:
+    """Cantidad de veces que aparece cada valor, guardando solo su hash de 64 bits
+       (16 bytes por valor distinto). Se consulta igual que el Counter del índice: contador[valor].
+    """
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.conteos = np.empty(0, dtype=np.int64)
+        self._conocidos = {}   # valor → conteo ya resuelto (precargar)
+
+    def agregar(self, serie):
+        nuevos, cantidades = np.unique(_hash_textos(serie.dropna().astype(str)), return_counts=True)
+        hashes, inverso = np.unique(np.concatenate([self.hashes, nuevos]), return_inverse=True)
+        pesos = np.concatenate([self.conteos, cantidades])
+        self.hashes, self.conteos = hashes, np.bincount(inverso, weights=pesos).astype(np.int64)
+
+    def precargar(self, valores):
+        """Resuelve de una vez los conteos de los valores que se van a consultar."""
+        valores = pd.unique(np.asarray([v for v in valores if isinstance(v, str)], dtype=object))
+        if not len(valores):
+            return
+        hashes = _hash_textos(valores)
+        i = np.minimum(np.searchsorted(self.hashes, hashes), max(len(self.hashes) - 1, 0))
+        encontrados = (self.hashes[i] == hashes) if len(self.hashes) else np.zeros(len(valores), dtype=bool)
+        conteos = np.where(encontrados, self.conteos[i] if len(self.hashes) else 0, 0)
+        self._conocidos.update(zip(valores, conteos.tolist()))
+
+    def __getitem__(self, valor):
+        if not isinstance(valor, str):
+            return 0
+        if valor in self._conocidos:
+            return self._conocidos[valor]
+        h = _hash_textos([valor])[0]
+        i = np.searchsorted(self.hashes, h)
+        return int(self.conteos[i]) if i < len(self.hashes) and self.hashes[i] == h else 0
+
+def lotes_archivo(ruta, columnas=columnas_objetivo):
+    """DataFrames de a MUESTRA_LOTE filas con las columnas como texto (las capas GIS en un solo lote)."""
+    if es_capa(ruta):
+        yield cargar_csv(ruta, columnas=columnas, categorias=False)
+        return
+    yield from pd.read_csv(ruta, usecols=columnas, dtype=str, chunksize=MUESTRA_LOTE, **detectar_formato(ruta))
+
+def muestrear(ruta, tamano=MUESTRA_TAMANO, estratificar=False, semilla=0, seleccion=None, progreso=SIN_PROGRESO):
+    """Lee el archivo una vez y devuelve (muestra, filas por estrato, contadores por hash).
+       Cada fila recibe una clave aleatoria y se conservan las `tamano` de menor clave
+       (muestra uniforme sin reemplazo, como un reservorio). Con estratificar=True se guardan
+       por cada Cód DANE Depto y al final se asigna a cada uno una parte proporcional (mínimo 1).
+    """
+    seleccion = seleccion or Seleccion()
+    columnas = [c for c in columnas_objetivo
+                if c in seleccion.columnas_carga or (estratificar and c == COLUMNA_ESTRATO)]
+    contadores = {regla: ContadorHash() for regla in CONTEOS_MUESTRA if regla in seleccion.reglas}
+    rng = np.random.default_rng(semilla)
+    estratos = Counter()
+    muestra = None
+    with progreso.etapa("Muestreo"):
+        for lote in lotes_archivo(ruta, columnas):
+            for regla, contador in contadores.items():
+                contador.agregar(lote[CONTEOS_MUESTRA[regla][0]])
+            lote = lote.reset_index(drop=True)
+            lote["__clave"] = rng.random(len(lote))
+            lote["__estrato"] = (lote[COLUMNA_ESTRATO].str.strip().fillna("(vacío)") if estratificar else "")
+            estratos.update(lote["__estrato"].value_counts().to_dict())
+            muestra = lote if muestra is None else pd.concat([muestra, lote], ignore_index=True)
+            muestra = muestra.sort_values("__clave", kind="stable").groupby("__estrato", sort=False).head(tamano)
+            progreso.avanzar(len(lote))
+
+    total = sum(estratos.values())
+    if muestra is None or not total:
+        raise ValueError("El archivo no tiene filas para muestrear")
+    if estratificar:
+        asignacion = {e: min(n, max(1, round(tamano * n / total))) for e, n in estratos.items()}
+        muestra = muestra[muestra.groupby("__estrato", sort=False).cumcount() < muestra["__estrato"].map(asignacion)]
+    return muestra.reset_index(drop=True), estratos, contadores
+
+def tasas_estimadas(reporte, estrato, estratos, claves, confianza=CONFIANZA_MUESTRA):
+    """Tasa de filas con al menos una observación por grupo de `claves`, con estimador
+       estratificado (un solo estrato = muestreo simple) e intervalo de Wilson sobre el
+       tamaño efectivo de muestra. reporte["ID"] = posición de la fila en la muestra.
+    """
+    nombres = list(estratos)
+    total = sum(estratos.values())
+    peso = np.array([estratos[e] / total for e in nombres])
+    poblacion = np.array([estratos[e] for e in nombres], dtype=float)
+    en_muestra = pd.Series(estrato).value_counts().reindex(nombres, fill_value=0).to_numpy(dtype=float)
+
+    filas = reporte[claves].copy()
+    filas["__estrato"] = estrato[reporte["ID"].astype(int).to_numpy()] if len(reporte) else []
+    filas["__fila"] = reporte["ID"].to_numpy()
+    aciertos = (filas.drop_duplicates([*claves, "__fila"])
+                .groupby([*claves, "__estrato"], dropna=False).size()
+                .unstack("__estrato").reindex(columns=nombres).fillna(0))
+    if aciertos.empty:
+        return pd.DataFrame(columns=[*claves, "Filas en muestra", "Tasa estimada (%)",
+                                     "IC inferior (%)", "IC superior (%)", "Filas estimadas"])
+
+    conteo = aciertos.to_numpy()
+    n_h = np.maximum(en_muestra, 1)
+    p_h = conteo / n_h
+    p = (p_h * peso).sum(axis=1)
+    varianza = (peso ** 2 * (1 - en_muestra / poblacion) * p_h * (1 - p_h) / np.maximum(en_muestra - 1, 1)).sum(axis=1)
+    # Tamaño efectivo (Kish): con varianza 0 (p = 0 o 1) se usa el tamaño real de la muestra
+    n_ef = np.where(varianza > 0, p * (1 - p) / np.where(varianza > 0, varianza, 1), en_muestra.sum())
+    n_ef = np.maximum(n_ef, 1)
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    centro = (p + z ** 2 / (2 * n_ef)) / (1 + z ** 2 / n_ef)
+    margen = z * np.sqrt(p * (1 - p) / n_ef + z ** 2 / (4 * n_ef ** 2)) / (1 + z ** 2 / n_ef)
+
+    tabla = aciertos.index.to_frame(index=False)
+    tabla["Filas en muestra"] = conteo.sum(axis=1).astype(int)
+    tabla["Tasa estimada (%)"] = (100 * p).round(2)
+    tabla["IC inferior (%)"] = (100 * np.clip(centro - margen, 0, 1)).round(2)
+    tabla["IC superior (%)"] = (100 * np.clip(centro + margen, 0, 1)).round(2)
+    tabla["Filas estimadas"] = np.round(p * total).astype(int)
+
+    orden = {c: i for i, c in enumerate(["(Cualquiera)", *columnas_objetivo])}
+    tabla["_orden"] = tabla["Columna Analizada"].map(orden)
+    tabla = tabla.sort_values(["_orden", "Tasa estimada (%)"], ascending=[True, False], kind="stable")
+    return tabla.drop(columns="_orden").reset_index(drop=True)
+
+def estimar_calidad(ruta, tamano=MUESTRA_TAMANO, estratificar=False, confianza=CONFIANZA_MUESTRA, semilla=0,
+                    seleccion=None, progreso=SIN_PROGRESO):
+    """Valida una muestra del archivo y devuelve {"Columnas", "Observaciones", "Estratos"}:
+       tasas estimadas por columna (más "(Cualquiera)" = filas con algún hallazgo) y por
+       observación específica, con su intervalo de confianza.
+    """
+    seleccion = seleccion or Seleccion()
+    muestra, estratos, contadores = muestrear(ruta, tamano, estratificar, semilla, seleccion, progreso)
+    estrato = muestra.pop("__estrato").to_numpy()
+    muestra = muestra.drop(columns="__clave")
+    muestra["ID"] = [str(i) for i in range(len(muestra))]   # posición en la muestra: cuenta filas, no IDs
+
+    indice = IndiceGlobal.desde_dataframe(muestra, seleccion.reglas)
+    for regla, contador in contadores.items():
+        columna, atributo = CONTEOS_MUESTRA[regla]
+        valores = muestra[columna].dropna()
+        contador.precargar([*valores, *valores.str.strip()])   # las reglas consultan el texto crudo o recortado
+        setattr(indice, atributo, contador)   # duplicados sobre todo el archivo
+    reporte = validar_dataframe(muestra, progreso, seleccion, indice=indice)
+    if reporte.empty:
+        reporte = pd.DataFrame(columns=CLAVES_REPORTE)
+
+    cualquiera = reporte.assign(**{"Columna Analizada": "(Cualquiera)"})
+    por_estrato = pd.DataFrame({
+        "Estrato": list(estratos),
+        "Filas archivo": list(estratos.values()),
+        "Filas muestra": pd.Series(estrato).value_counts().reindex(list(estratos), fill_value=0).to_numpy(),
+    })
+    return {
+        "Columnas": tasas_estimadas(pd.concat([cualquiera, reporte], ignore_index=True), estrato, estratos,
+                                    ["Columna Analizada"], confianza),
+        "Observaciones": tasas_estimadas(reporte, estrato, estratos, CLAVES_RESUMEN, confianza),
+        "Estratos": por_estrato if estratificar else por_estrato.assign(Estrato="(todas)"),
+    }
+
+def guardar_estimacion(tablas, outfile):
+    with pd.ExcelWriter(outfile, engine="openpyxl") as writer:
+        for hoja, tabla in tablas.items():
+            tabla.applymap(limpiar_excel).to_excel(writer, sheet_name=hoja, index=False)
+
+# ==========================
+# Corrección automática (modo --corregir)
+# ==========================
+# Columnas cuyo bloque reporta "Espacio al inicio / al final / Múltiples espacios / Saltos de línea"
+COLUMNAS_SIN_REGLA_ESPACIOS = {"ID", "Escala", "Año Vigencia Insumo Geográfico", "Nombre Vereda"}
+
+def _es_1900_12_12(valor):
+    fecha = parse_date_strict(valor)
+    return not pd.isna(fecha) and isinstance(fecha, datetime) and fecha.strftime("%Y-%m-%d") == "1900-12-12"
+
+# Correcciones mecánicas por columna: (observación que corrige, máscara, nuevo valor).
+# Reciben el texto ya recortado (o con strip, si la columna no tiene regla de espacios) y
+# replican la condición exacta del bloque de validación correspondiente.
+CORRECCIONES = {
+    "Símbolo": [(
+        "Estandarizar con formato tipo título",
+        lambda s: s.str.lower().eq("no aplica") & s.ne("No Aplica"),
+        lambda s: "No Aplica"
+    )],
+    "Escala": [(
+        "Solo debe diligenciarse el Número de la Escala",
+        lambda s: s.isin(["1:10000", "1:25000"]),
+        lambda s: s.str[2:]
+    )],
+    "Fecha Última Actualización": [(
+        "Estandarizar a 1900-01-01",
+        lambda s: s.map({v: _es_1900_12_12(v) for v in s.dropna().unique()}).fillna(False).astype(bool),
+        lambda s: "1900-01-01"
+    )],
+    "Comentarios": [(
+        "Estandarizar a Sin Comentarios",
+        lambda s: s.str.lower().isin(VARIANTES_SIN_COMENTARIOS),
+        lambda s: "Sin Comentarios"
+    )],
+    "Cód DANE Mpio": [(
+        "Extraer y reemplazar los caracteres desde la posición 3 al 5 del dato Cód DANE Mpio",
+        lambda s: s.str.fullmatch(r"\d{5}").fillna(False).astype(bool) & s.str[:2].isin(list(codigos_dane_deptos)),
+        lambda s: s.str[2:5]
+    )],
+    "Año Vigencia Insumo Geográfico": [(
+        "Estandarizar a Sin Información",
+        lambda s: s.str.upper().str.replace("Ó", "O").isin(["SIN INFORMACION", "-9999", "1900"]) & s.ne("Sin Información"),
+        lambda s: "Sin Información"
+    )],
+    "Nombre Vereda": [(
+        "Estandarizar a Sin Información",
+        lambda s: s.str.lower().str.contains("no aplica", regex=False, na=False)
+                  & ~s.str.lower().str.contains("|".join(map(re.escape, PALABRAS_FMI_VEREDA)), na=False),
+        lambda s: "Sin Información"
+    )],
+}
+
+def corregir_dataframe(df_exacto, seleccion=None, df=None):
+    """Aplica las correcciones mecánicas como transformaciones vectorizadas por columna.
+       df_exacto trae el texto tal cual del CSV (sin convertir a nulos); df es la vista
+       normalizada de la validación (preparar_datos), que se calcula si no se da. Devuelve
+       (DataFrame corregido, bitácora ID / columna / valor original / valor corregido / corrección).
+    """
+    seleccion = seleccion or Seleccion()
+    if df is None:
+        vista = df_exacto[seleccion.columnas_carga]
+        df = preparar_datos(vista.where(~vista.isin(VALORES_NULOS)))
+    corregido = df_exacto.copy()
+    cambios = []
+
+    for columna in seleccion.columnas:
+        original = df_exacto[columna]
+        limpio = df[columna]                                      # recortado, con los nulos de la validación
+        en_blanco = limpio.isna() | limpio.isin(["<ESPACIO>"])    # vacíos y <ESPACIO> no se tocan
+        pasos = []
+
+        if columna in COLUMNAS_SIN_REGLA_ESPACIOS:
+            texto = limpio.where(~en_blanco)
+        else:
+            texto = limpio.where(~en_blanco).str.split().str.join(" ")
+            pasos.append(("Espacios / saltos de línea", texto.ne(original) & ~en_blanco, texto))
+
+        for etiqueta, condicion, nuevo in CORRECCIONES.get(columna, []):
+            mascara = condicion(texto).fillna(False).astype(bool) & ~en_blanco
+            if mascara.any():
+                valores = nuevo(texto[mascara])
+                pasos.append((etiqueta, mascara, valores))
+                texto = texto.mask(mascara, valores)
+
+        cambio_total = pd.Series(False, index=original.index)
+        for etiqueta, mascara, _ in pasos:
+            if mascara.any():
+                cambio_total |= mascara
+                cambios.append(pd.DataFrame({
+                    "ID": df_exacto.loc[mascara, "ID"], "Columna": columna, "Corrección": etiqueta,
+                    "Valor Original": original[mascara]
+                }))
+        if cambio_total.any():
+            corregido.loc[cambio_total, columna] = texto[cambio_total]
+
+    bitacora = pd.concat(cambios) if cambios else pd.DataFrame(columns=["ID", "Columna", "Corrección", "Valor Original"])
+    # Valor final de la celda (tras todas las correcciones de la columna)
+    bitacora["Valor Corregido"] = [corregido.at[i, c] for i, c in zip(bitacora.index, bitacora["Columna"])]
+    return corregido, bitacora.sort_index(kind="stable").reset_index(drop=True)
+
+def validar_y_corregir(ruta, progreso=SIN_PROGRESO, seleccion=None):
+    """Una sola lectura del CSV (todas las columnas, texto exacto): valida sobre la vista con nulos
+       y corrige sobre el mismo DataFrame en memoria. Devuelve (reporte, corregido, bitácora).
+    """
+    seleccion = seleccion or Seleccion()
+    df_exacto = cargar_csv(ruta, "pandas", progreso, columnas=None, exacto=True)
+    faltantes = [c for c in columnas_objetivo if c not in df_exacto.columns]
+    if faltantes:
+        raise ValueError(f"El archivo no contiene las columnas requeridas: {', '.join(faltantes)}")
+
+    vista = df_exacto[seleccion.columnas_carga]
+    vista = vista.where(~vista.isin(VALORES_NULOS))
+    # La normalización se hace una vez: la usan las reglas y las correcciones
+    with progreso.etapa("Normalización", len(vista)):
+        df = preparar_datos(vista)
+        progreso.avanzar(len(vista))
+    reporte = validar_dataframe(vista, progreso, seleccion, df=df)
+    with progreso.etapa("Corrección", len(df_exacto)):
+        corregido, bitacora = corregir_dataframe(df_exacto, seleccion, df)
+        progreso.avanzar(len(df_exacto))
+    return reporte, corregido, bitacora
+
+def guardar_correccion(corregido, bitacora, carpeta_salida, nombre, timestamp, formato=None):
+    """Escribe el CSV corregido con la codificación y el separador del original (formato de
+       detectar_formato; ; y UTF-8 si no se da, p. ej. para capas) y la bitácora de cambios.
+       Devuelve ambas rutas.
+    """
+    formato = formato or {"encoding": "utf-8", "sep": ";"}
+    ruta_csv = os.path.join(carpeta_salida, f"{nombre}_corregido_{timestamp}.csv")
+    ruta_bitacora = os.path.join(carpeta_salida, f"Cambios_EditedPlot_{nombre}_{timestamp}.csv")
+    corregido.to_csv(ruta_csv, index=False, **formato)
+    bitacora.to_csv(ruta_bitacora, sep=";", index=False, encoding="utf-8")
+    return ruta_csv, ruta_bitacora
+
+# ==========================
+# Resumen y modo compacto
+# ==========================
+CLAVES_RESUMEN = ["Columna Analizada", "Observación Específica", "Tipología"]
+
+def construir_resumen(reporte, ejemplos=5):
+    """Pivote columna × observación × tipología → cantidad de registros e IDs de ejemplo."""
+    if reporte.empty:
+        return pd.DataFrame(columns=CLAVES_RESUMEN + ["Cantidad", "IDs Ejemplo"])
+
+    grupos = reporte.groupby(CLAVES_RESUMEN, sort=False, dropna=False)
+    resumen = grupos.size().rename("Cantidad").to_frame()
+    resumen["IDs Ejemplo"] = (
+        grupos.head(ejemplos)
+        .groupby(CLAVES_RESUMEN, sort=False, dropna=False)["ID"]
+        .agg(lambda ids: ", ".join(ids.astype(str)))
+    )
+    resumen = resumen.reset_index()
+
+    # Mismo orden de columnas que el reporte, y dentro de cada una las más frecuentes primero
+    orden = {c: i for i, c in enumerate(columnas_objetivo)}
+    resumen["_orden"] = resumen["Columna Analizada"].map(orden)
+    resumen = resumen.sort_values(["_orden", "Cantidad"], ascending=[True, False], kind="stable")
+    return resumen.drop(columns="_orden").reset_index(drop=True)
+
+def compactar_reporte(reporte, max_filas):
+    """Conserva como máximo max_filas registros por (columna, observación específica)."""
+    if reporte.empty:
+        return reporte
+    return reporte.groupby(["Columna Analizada", "Observación Específica"], sort=False).head(max_filas)
+
 # ==========================
 # Guardar en Excel con hojas separadas
 # ==========================
-import os
-OUTPUT_DIR = r"C:\2025\01_Validaores_Totales\EditPLot"  # <- puedes cambiar esta ruta
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-from datetime import datetime
-timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-outfile = os.path.join(OUTPUT_DIR, f"Inconsistencias_EditedPlot_{timestamp}.xlsx")
+def guardar_excel(reporte, outfile, compacto=None):
+    """Escribe la hoja Resumen y luego una hoja por columna.
+       compacto=N limita el detalle a N filas por tipo de observación.
+    """
+    if reporte.empty:
+        return
+    resumen = construir_resumen(reporte)
+    detalle = compactar_reporte(reporte, compacto) if compacto else reporte
+
+    with pd.ExcelWriter(outfile, engine="openpyxl") as writer:
+        resumen.applymap(limpiar_excel).to_excel(writer, sheet_name="Resumen", index=False)
+        for columna in columnas_objetivo:
+            if columna == "ID":
+                continue
+            df_columna = detalle[detalle["Columna Analizada"] == columna]
+            if not df_columna.empty:
+                nombre_hoja = columna[:31]
+                df_columna = df_columna.applymap(limpiar_excel)
+                df_columna.to_excel(writer, sheet_name=nombre_hoja, index=False)
 
-if not reporte.empty:
-   with pd.ExcelWriter(outfile, engine="openpyxl") as writer:
-    for columna in columnas_objetivo:
-        if columna == "ID":
+# ==========================
+# Historial de hallazgos (SQLite)
+# ==========================
+HISTORIAL_DB = os.environ.get("EDITPLOT_HISTORIAL_DB")  # None → no se guarda historial
+
+ESQUEMA_HISTORIAL = """
+CREATE TABLE IF NOT EXISTS corridas (
+    id              INTEGER PRIMARY KEY,
+    fecha           TEXT NOT NULL,
+    archivo         TEXT NOT NULL,
+    hash_archivo    TEXT NOT NULL,
+    version_reglas  TEXT NOT NULL,
+    total           INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observaciones (
+    codigo                  INTEGER PRIMARY KEY,
+    columna                 TEXT NOT NULL,
+    observacion_general     TEXT NOT NULL,
+    observacion_especifica  TEXT NOT NULL,
+    tipologia               TEXT NOT NULL,
+    UNIQUE (columna, observacion_general, observacion_especifica, tipologia)
+);
+CREATE TABLE IF NOT EXISTS hallazgos (
+    corrida     INTEGER NOT NULL REFERENCES corridas(id),
+    id_registro TEXT,
+    columna     TEXT NOT NULL,
+    codigo      INTEGER NOT NULL REFERENCES observaciones(codigo),
+    dato        TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_corridas_fecha ON corridas(fecha);
+CREATE INDEX IF NOT EXISTS ix_corridas_hash ON corridas(hash_archivo);
+CREATE INDEX IF NOT EXISTS ix_hallazgos_tendencia ON hallazgos(columna, corrida, codigo);
+CREATE INDEX IF NOT EXISTS ix_hallazgos_registro ON hallazgos(id_registro, corrida);
+"""
+
+def abrir_historial(ruta_db):
+    """Abre (o crea) la base de historial. WAL permite que varios trabajadores escriban sin bloquear lecturas."""
+    con = sqlite3.connect(ruta_db, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(ESQUEMA_HISTORIAL)
+    return con
+
+def guardar_historial(reporte, ruta_csv, ruta_db, hash_csv=None):
+    """Inserta la corrida y todas sus observaciones en una sola transacción. Devuelve el id de la corrida."""
+    r = reporte.reindex(columns=CLAVES_REPORTE).astype("string")
+    tipo = ["Columna Analizada", "Observación General", "Observación Específica", "Tipología"]
+    r[tipo] = r[tipo].fillna("")
+    r = r.astype(object).where(r.notna(), None)
+    tipos = list(r[tipo].drop_duplicates().itertuples(index=False, name=None))
+
+    con = abrir_historial(ruta_db)
+    try:
+        with con:
+            corrida = con.execute(
+                "INSERT INTO corridas (fecha, archivo, hash_archivo, version_reglas, total) VALUES (?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), os.path.abspath(ruta_csv),
+                 hash_csv or hash_archivo(ruta_csv), VERSION_REGLAS, len(r))
+            ).lastrowid
+            con.executemany(
+                "INSERT OR IGNORE INTO observaciones "
+                "(columna, observacion_general, observacion_especifica, tipologia) VALUES (?, ?, ?, ?)",
+                tipos
+            )
+            codigos = {
+                tuple(fila[1:]): fila[0] for fila in con.execute(
+                    "SELECT codigo, columna, observacion_general, observacion_especifica, tipologia FROM observaciones"
+                )
+            }
+            con.executemany(
+                "INSERT INTO hallazgos (corrida, id_registro, columna, codigo, dato) VALUES (?, ?, ?, ?, ?)",
+                zip(
+                    [corrida] * len(r), r["ID"], r["Columna Analizada"],
+                    map(codigos.__getitem__, r[tipo].itertuples(index=False, name=None)),
+                    r["Dato Analizado"]
+                )
+            )
+    finally:
+        con.close()
+    return corrida
+
+def tendencia_historial(ruta_db, columna=None, desde=None, hasta=None, periodo="mes"):
+    """Cantidad de hallazgos por periodo (día / mes / año), columna y tipología.
+       desde / hasta en formato ISO (AAAA-MM-DD).
+    """
+    formato = {"dia": "%Y-%m-%d", "mes": "%Y-%m", "anio": "%Y"}[periodo]
+    condiciones, parametros = [], [formato]
+    if columna:
+        condiciones.append("h.columna = ?")
+        parametros.append(columna)
+    if desde:
+        condiciones.append("c.fecha >= ?")
+        parametros.append(desde)
+    if hasta:
+        condiciones.append("c.fecha < ?")
+        parametros.append(hasta)
+    donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+    con = abrir_historial(ruta_db)
+    try:
+        return pd.read_sql_query(
+            f"""SELECT strftime(?, c.fecha) AS Periodo, h.columna AS "Columna Analizada",
+                       o.tipologia AS "Tipología", COUNT(*) AS Cantidad,
+                       COUNT(DISTINCT c.id) AS Corridas
+                FROM hallazgos h
+                JOIN corridas c ON c.id = h.corrida
+                JOIN observaciones o ON o.codigo = h.codigo
+                {donde}
+                GROUP BY Periodo, h.columna, o.tipologia
+                ORDER BY Periodo, h.columna, o.tipologia""",
+            con, params=parametros
+        )
+    finally:
+        con.close()
+
+def historial_registro(ruta_db, id_registro):
+    """Todas las observaciones que ha tenido un ID a lo largo de las corridas."""
+    con = abrir_historial(ruta_db)
+    try:
+        return pd.read_sql_query(
+            """SELECT c.fecha AS Fecha, c.archivo AS Archivo, h.columna AS "Columna Analizada",
+                      h.dato AS "Dato Analizado", o.observacion_especifica AS "Observación Específica",
+                      o.tipologia AS "Tipología"
+               FROM hallazgos h
+               JOIN corridas c ON c.id = h.corrida
+               JOIN observaciones o ON o.codigo = h.codigo
+               WHERE h.id_registro = ?
+               ORDER BY c.fecha, h.columna""",
+            con, params=[str(id_registro)]
+        )
+    finally:
+        con.close()
+
+# ==========================
+# Modo servicio: carpeta vigilada
+# ==========================
+
+def procesar_archivo(ruta, carpeta_salida, compacto=None, motor_carga="pandas",
+                     usar_cache=True, cache_dir=CACHE_DIR, cache_max_mb=CACHE_MAX_MB, colisiones=None,
+                     historial=HISTORIAL_DB, seleccion=None):
+    """Valida un archivo y escribe su reporte. Devuelve (ruta del reporte, total de inconsistencias).
+       colisiones (modo conjunto) agrega los valores que también aparecen en otros archivos.
+       historial = ruta de la base SQLite donde se acumulan las observaciones de cada corrida.
+    """
+    # Un solo hash del archivo para la caché y el historial
+    hash_csv = hash_archivo(ruta) if usar_cache and historial else None
+    reporte = obtener_reporte(ruta, usar_cache, cache_dir, cache_max_mb, motor_carga, seleccion=seleccion,
+                              hash_csv=hash_csv)
+    if colisiones:
+        df_claves = cargar_csv(ruta, motor_carga, columnas=COLUMNAS_CLAVES_CONJUNTO)
+        cruzadas = observaciones_cruzadas(df_claves, os.path.basename(ruta), colisiones)
+        if cruzadas:
+            reporte = pd.concat([reporte, pd.DataFrame(cruzadas)], ignore_index=True)
+    if historial:
+        guardar_historial(reporte, ruta, historial, hash_csv)
+
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    outfile = os.path.join(carpeta_salida, f"Inconsistencias_EditedPlot_{nombre}_{timestamp}.xlsx")
+    guardar_excel(reporte, outfile, compacto)
+    return outfile, len(reporte)
+
+async def vigilar_carpeta(entrada, salida, trabajadores=2, intervalo=5.0, progreso=SIN_PROGRESO, **opciones):
+    """Vigila la carpeta de entrada y valida cada CSV nuevo o modificado.
+       Los procesos del pool se reutilizan entre archivos, así que reglas compiladas,
+       DIVIPOLA, diccionario y cachés se cargan una sola vez por trabajador.
+    """
+    os.makedirs(salida, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    cola = asyncio.Queue()
+    procesados = {}   # ruta -> (tamaño, mtime) ya encolado
+    candidatos = {}   # ruta -> (tamaño, mtime) de la pasada anterior
+
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+
+        async def trabajador():
+            while True:
+                ruta = await cola.get()
+                try:
+                    inicio = time.perf_counter()
+                    outfile, total = await loop.run_in_executor(
+                        pool, partial(procesar_archivo, ruta, salida, **opciones)
+                    )
+                    segundos = time.perf_counter() - inicio
+                    progreso.mensaje(f"✅ {os.path.basename(ruta)}: {total} inconsistencias → {outfile} "
+                                     f"({segundos:.1f} s)",
+                                     archivo=ruta, reporte=outfile, total=total, segundos=round(segundos, 3))
+                except Exception as e:
+                    progreso.mensaje(f"❌ {os.path.basename(ruta)}: {e}", archivo=ruta, error=str(e))
+                finally:
+                    cola.task_done()
+
+        tareas = [asyncio.create_task(trabajador()) for _ in range(trabajadores)]
+        progreso.mensaje(f"👀 Vigilando {entrada} (salida: {salida}, trabajadores: {trabajadores})",
+                         entrada=entrada, salida=salida, trabajadores=trabajadores)
+        try:
+            while True:
+                for e in os.scandir(entrada):
+                    if not (e.is_file() and e.name.lower().endswith(EXTENSIONES_ENTRADA)):
+                        continue
+                    st = e.stat()
+                    firma = (st.st_size, st.st_mtime)
+                    if procesados.get(e.path) == firma:
+                        continue
+                    # Solo se encola cuando el archivo dejó de cambiar (copia terminada)
+                    if candidatos.get(e.path) == firma:
+                        del candidatos[e.path]
+                        procesados[e.path] = firma
+                        await cola.put(e.path)
+                    else:
+                        candidatos[e.path] = firma
+                await asyncio.sleep(intervalo)
+        finally:
+            for t in tareas:
+                t.cancel()
+
+# ==========================
+# Modo conjunto: varios archivos con unicidad global
+# ==========================
+# Columna del reporte → etiqueta del choque. En "Nombre Predio Jurídico" la clave es predio + vereda.
+COLISIONES_CONJUNTO = {
+    "Código Interno": "Código Interno duplicado en otro archivo del conjunto",
+    "Código SIG Predio Jurídico": "Código SIG Predio Jurídico duplicado en otro archivo del conjunto",
+    "Nombre Predio Jurídico": "Predio con el mismo nombre y vereda en otro archivo del conjunto",
+}
+COLUMNAS_CLAVES_CONJUNTO = ["ID", "Código Interno", "Código SIG Predio Jurídico", "Nombre Predio Jurídico", "Nombre Vereda"]
+
+def _clave_texto(serie):
+    return serie.map(lambda v: " ".join(unidecode(v).lower().split()) if isinstance(v, str) else None)
+
+def claves_conjunto(df_raw):
+    """Clave de cada fila por columna vigilada. Predio y vereda se comparan sin tildes,
+       mayúsculas ni espacios extra, para agrupar el mismo predio escrito distinto.
+    """
+    predio, vereda = _clave_texto(df_raw["Nombre Predio Jurídico"]), _clave_texto(df_raw["Nombre Vereda"])
+    return {
+        "Código Interno": df_raw["Código Interno"],
+        "Código SIG Predio Jurídico": df_raw["Código SIG Predio Jurídico"],
+        "Nombre Predio Jurídico": (predio + " | " + vereda).where(predio.notna() & vereda.notna()),
+    }
+
+def conteos_archivo(ruta, motor_carga="pandas"):
+    """Lectura liviana para el índice global: solo las columnas clave. Devuelve {columna: {clave: cantidad}}."""
+    df_claves = cargar_csv(ruta, motor_carga, columnas=COLUMNAS_CLAVES_CONJUNTO)
+    return {c: serie.value_counts().to_dict() for c, serie in claves_conjunto(df_claves).items()}
+
+class IndiceConjunto:
+    """Índice global del conjunto: para cada código y cada clave predio + vereda,
+       en qué archivos aparece y cuántas veces. Solo guarda conteos, no los datos.
+    """
+
+    def __init__(self):
+        self.archivos = {c: {} for c in COLISIONES_CONJUNTO}   # columna → clave → {archivo: cantidad}
+
+    def agregar(self, archivo, conteos):
+        for columna, claves in conteos.items():
+            destino = self.archivos[columna]
+            for clave, cantidad in claves.items():
+                destino.setdefault(clave, {})[archivo] = cantidad
+
+    def colisiones(self, archivo):
+        """Solo las claves de este archivo que también están en otro (lo único que necesita su trabajador)."""
+        return {
+            c: {k: a for k, a in claves.items() if archivo in a and len(a) > 1}
+            for c, claves in self.archivos.items()
+        }
+
+    def total_colisiones(self):
+        return sum(1 for claves in self.archivos.values() for a in claves.values() if len(a) > 1)
+
+def observaciones_cruzadas(df_raw, archivo, colisiones):
+    """Observaciones de las filas cuyo código o predio + vereda aparece en otros archivos."""
+    registros = []
+    for columna, serie in claves_conjunto(df_raw).items():
+        choques = colisiones.get(columna)
+        if not choques:
             continue
-        df_columna = reporte[reporte["Columna Analizada"] == columna]
-        if not df_columna.empty:
-            nombre_hoja = columna[:31]
-            df_columna = df_columna.applymap(limpiar_excel)    
-            df_columna.to_excel(writer, sheet_name=nombre_hoja, index=False)
+        mascara = serie.isin(list(choques))
+        for id_val, dato, clave in zip(df_raw["ID"][mascara], df_raw[columna][mascara], serie[mascara]):
+            otros = ", ".join(sorted(a for a in choques[clave] if a != archivo))
+            registros.append({
+                "ID": id_val,
+                "Columna Analizada": columna,
+                "Dato Analizado": dato,
+                "Observación General": "Inconsistencia Lógica del Dato",
+                "Observación Específica": f"{COLISIONES_CONJUNTO[columna]}: {otros}",
+                "Tipología": "Fondo"
+            })
+    return registros
 
-print(f"✅ Reporte generado en: {outfile}")
-print(f"📊 Total inconsistencias encontradas: {len(reporte)}")
+def validar_conjunto(rutas, carpeta_salida, trabajadores=2, motor_carga="pandas", progreso=SIN_PROGRESO, **opciones):
+    """Valida varios CSV como un solo portafolio, sin concatenarlos:
+       1) lectura paralela de las columnas clave → índice global de conteos;
+       2) cada archivo se valida en su proceso y su reporte marca los choques con otros archivos.
+       Devuelve {ruta: (ruta del reporte, total de inconsistencias)}.
+    """
+    os.makedirs(carpeta_salida, exist_ok=True)
+    indice = IndiceConjunto()
+    resultados = {}
+
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        with progreso.etapa("Índice global del conjunto", len(rutas), "archivos"):
+            futuros = {pool.submit(conteos_archivo, ruta, motor_carga): ruta for ruta in rutas}
+            for futuro in as_completed(futuros):
+                ruta = futuros[futuro]
+                try:
+                    indice.agregar(os.path.basename(ruta), futuro.result())
+                except Exception as e:
+                    progreso.mensaje(f"❌ {os.path.basename(ruta)}: {e}", archivo=ruta, error=str(e))
+                    rutas = [r for r in rutas if r != ruta]
+                progreso.avanzar()
+        progreso.mensaje(f"🔎 {indice.total_colisiones()} claves repetidas entre archivos",
+                         colisiones=indice.total_colisiones())
+
+        with progreso.etapa("Reportes por archivo", len(rutas), "archivos"):
+            futuros = {
+                pool.submit(procesar_archivo, ruta, carpeta_salida, motor_carga=motor_carga,
+                            colisiones=indice.colisiones(os.path.basename(ruta)), **opciones): ruta
+                for ruta in rutas
+            }
+            for futuro in as_completed(futuros):
+                ruta = futuros[futuro]
+                try:
+                    outfile, total = resultados[ruta] = futuro.result()
+                    progreso.mensaje(f"✅ {os.path.basename(ruta)}: {total} inconsistencias → {outfile}",
+                                     archivo=ruta, reporte=outfile, total=total)
+                except Exception as e:
+                    progreso.mensaje(f"❌ {os.path.basename(ruta)}: {e}", archivo=ruta, error=str(e))
+                progreso.avanzar()
+    return resultados
 
-# Abrir automáticamente el archivo en Windows
-try:
-    os.startfile(outfile)
-except:
-    pass
+# ==========================
+# API HTTP local
+# ==========================
+API_MAX_MB = 200
+RAZONES_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+def reporte_a_json(reporte):
+    """Resultado serializable: total, resumen y observaciones (NaN → null)."""
+    return {
+        "total": len(reporte),
+        "resumen": json.loads(construir_resumen(reporte).to_json(orient="records", force_ascii=False)),
+        "observaciones": json.loads(reporte.to_json(orient="records", force_ascii=False)),
+    }
+
+def validar_csv_bytes(contenido, motor_carga="pandas"):
+    """Valida un CSV recibido en memoria (se reutiliza la detección de formato del archivo)."""
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as tmp:
+        tmp.write(contenido)
+    try:
+        return reporte_a_json(ejecutar_validacion(tmp.name, motor_carga))
+    finally:
+        os.remove(tmp.name)
+
+def validar_registros(registros):
+    """Valida una lista de registros (dict columna → valor) enviados como JSON."""
+    if isinstance(registros, dict):
+        registros = registros.get("registros", [registros] if "ID" in registros else [])
+    if not isinstance(registros, list) or not registros:
+        raise ValueError("Se esperaba una lista de registros o {\"registros\": [...]}")
+    malos = [i for i, r in enumerate(registros) if not isinstance(r, dict)]
+    if malos:
+        raise ValueError(f"Cada registro debe ser un objeto {{columna: valor}} (posiciones: {', '.join(map(str, malos[:10]))})")
+
+    filas = [
+        {c: (None if r.get(c) is None else str(r.get(c))) for c in columnas_objetivo}
+        for r in registros
+    ]
+    df_raw = pd.DataFrame(filas, columns=columnas_objetivo)
+    return reporte_a_json(validar_dataframe(df_raw))
+
+async def _despachar(metodo, ruta, encabezados, cuerpo, loop, pool, motor_carga):
+    if ruta == "/salud":
+        return 200, {"estado": "ok", "version_reglas": VERSION_REGLAS}
+    if ruta not in ("/validar", "/validar/csv", "/validar/registros"):
+        return 404, {"error": f"Ruta no encontrada: {ruta}"}
+    if metodo != "POST":
+        return 405, {"error": "Use POST"}
+
+    tipo = encabezados.get("content-type", "")
+    if ruta == "/validar/registros" or (ruta == "/validar" and "json" in tipo):
+        datos = json.loads(cuerpo.decode("utf-8"))
+        return 200, await loop.run_in_executor(pool, validar_registros, datos)
+    return 200, await loop.run_in_executor(pool, validar_csv_bytes, cuerpo, motor_carga)
+
+async def _atender(reader, writer, loop, pool, motor_carga):
+    try:
+        linea = (await reader.readline()).decode("latin-1").split()
+        metodo, ruta = linea[0].upper(), linea[1].split("?")[0]
+        encabezados = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = h.decode("latin-1").partition(":")
+            encabezados[k.strip().lower()] = v.strip()
+
+        largo = int(encabezados.get("content-length", 0))
+        if largo > API_MAX_MB * 1024 * 1024:
+            estado, datos = 413, {"error": f"El archivo supera {API_MAX_MB} MB"}
+        else:
+            cuerpo = await reader.readexactly(largo) if largo else b""
+            estado, datos = await _despachar(metodo, ruta, encabezados, cuerpo, loop, pool, motor_carga)
+    except (ValueError, IndexError, asyncio.IncompleteReadError) as e:
+        estado, datos = 400, {"error": str(e) or "Solicitud inválida"}
+    except Exception as e:
+        estado, datos = 500, {"error": str(e)}
+
+    respuesta = json.dumps(datos, ensure_ascii=False, default=str).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {estado} {RAZONES_HTTP[estado]}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(respuesta)}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + respuesta
+    )
+    try:
+        await writer.drain()
+    finally:
+        writer.close()
+
+async def servir_api(host="127.0.0.1", puerto=8765, trabajadores=2, motor_carga="pandas"):
+    """Servidor HTTP local:
+       POST /validar/csv        cuerpo = CSV tal cual se exporta de EditPlot
+       POST /validar/registros  cuerpo = JSON [{columna: valor, ...}] o {"registros": [...]}
+       GET  /salud
+       La validación corre en un pool de procesos que mantiene el estado de reglas cargado.
+    """
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        servidor = await asyncio.start_server(
+            lambda r, w: _atender(r, w, loop, pool, motor_carga), host, puerto
+        )
+        print(f"🌐 API de validación escuchando en http://{host}:{puerto}")
+        async with servidor:
+            await servidor.serve_forever()
+
+# ==========================
+# Equivalencia entre motores (regresión contra el ciclo original)
+# ==========================
+CLAVES_REPORTE = ["ID", "Columna Analizada", "Dato Analizado", "Observación General", "Observación Específica", "Tipología"]
+
+def normalizar_reporte(reporte):
+    """Reporte como texto (nulos → None) con el orden de cada observación dentro de su (columna, ID),
+       que es el que fija la prioridad vacío → <ESPACIO> → formato → lógica.
+    """
+    r = reporte.reindex(columns=CLAVES_REPORTE).astype("string").astype(object)
+    r = r.where(r.notna(), None)
+    r["Orden"] = r.groupby(["Columna Analizada", "ID"], dropna=False, sort=False).cumcount()
+    return r
+
+def diferencias_reporte(referencia, candidato):
+    """Compara dos reportes fila a fila. Devuelve una fila por campo distinto
+       (Campo = "Fila" cuando la observación existe en un solo lado).
+    """
+    llaves = ["Columna Analizada", "ID", "Orden"]
+    campos = [c for c in CLAVES_REPORTE if c not in llaves]
+    cruce = normalizar_reporte(referencia).merge(
+        normalizar_reporte(candidato), on=llaves, how="outer", suffixes=(" ref", " motor"), indicator=True
+    )
+
+    diferencias = []
+    for fila in cruce.to_dict("records"):
+        if fila["_merge"] != "both":
+            lado = "ref" if fila["_merge"] == "left_only" else "motor"
+            resumen = " | ".join(str(fila[f"{c} {lado}"]) for c in campos)
+            diferencias.append({
+                **{k: fila[k] for k in llaves}, "Campo": "Fila",
+                "Referencia": resumen if lado == "ref" else None,
+                "Motor": resumen if lado == "motor" else None
+            })
+            continue
+        for c in campos:
+            if fila[f"{c} ref"] != fila[f"{c} motor"]:
+                diferencias.append({
+                    **{k: fila[k] for k in llaves}, "Campo": c,
+                    "Referencia": fila[f"{c} ref"], "Motor": fila[f"{c} motor"]
+                })
+    return pd.DataFrame(diferencias, columns=llaves + ["Campo", "Referencia", "Motor"])
+
+def comparar_motores(df_raw, motores=None, referencia=None):
+    """Ejecuta cada motor sobre el mismo DataFrame y lo compara con la referencia
+       (el ciclo fila a fila, o un reporte dorado ya guardado). Devuelve {motor: diferencias}.
+    """
+    if referencia is None:
+        referencia = MOTORES_VALIDACION[MOTOR_REFERENCIA](df_raw)
+    motores = motores or [m for m in MOTORES_VALIDACION if m != MOTOR_REFERENCIA]
+    return {m: diferencias_reporte(referencia, MOTORES_VALIDACION[m](df_raw)) for m in motores}
+
+# Valores semilla por columna: válidos, casi válidos y los casos raros conocidos
+VALORES_GENERADOS = {
+    "Nombre Proyecto": ["SIS_Castilla", "VEX_Rubiales", "VAS_Apiay", "SIS-Castilla", "Vex_Rub", "XXX_Foo", "VPI_Ñame"],
+    "Fecha Captura": ["2015-09-22", "22/09/2015", "2008-01-01", "1900-01-01", "1900-12-12", "2030-01-01",
+                      "2015-09-22 10:00", "15/13/2020", "2019/01/01", "3/4/2018", "2021-02-29", "10 AM"],
+    "Código Interno": ["SIS_Castilla_PJ01", "SIS_Castilla_PJ1234", "VEX_Rubiales_PJ00", "SIS_Cas1_PJ01", "VAS_Apiay_PX3",
+                       "OXY_Caño Limón_PJ01", "bad"],
+    "Símbolo": ["No Aplica", "no aplica", "NO APLICA", "X", "No  Aplica"],
+    "Nombre Predio Jurídico": ["La Esperanza", "Lote 13A", "Finca el Porvenir", "EL PORVENIR", "San José II", "La-Esperanza",
+                               "Villa María-Luisa", ", Lote 5.", "Casa ,  Lote", "- El Retiro;", "lote 04", "Hacienda XIV",
+                               "Finca Nro. 3", "O'Higgins", "Mi.Casa", "Santa Rosa de Osos"],
+    "Escala": ["10000", "25000", "1:10000", "1:25000", "1:5000", "5000", "abc", "10.000"],
+    "Fuente Información": ["IGAC", "DANE", "Poligono Google Earth", "Otra Fuente", "igac", "VEX - Exploracion", "ECP - Social"],
+    "Creado Por": ["Juan Perez", "José Pérez", "JOSE PEREZ", "Saneamiento P8 Fase I", "No Aplica", "C102627Q",
+                   "Usuario con registro C101848W", "Maria", "Ana María López", "Sin Información", "migracion lci"],
+    "Fecha Última Actualización": ["2016-01-01", "1900-01-01", "1900-12-12", "01/01/2010", "2020-01-01 12:30", "abc"],
+    "Modificado Por": ["Juan Perez", "Jose Perez", "No Aplica", "no aplica", "Ana Maria Lopez", "Pedro  Gómez"],
+    "Comentarios": ["Sin Comentarios", "sin comentarios", "No aplica", "N/A", "sin observación", "...", "12345", "x",
+                    'Predio "La Esperanza" revisado', "Predio revisado.", "PREDIO REVISADO", 'Ver "" nota', "ok",
+                    '"Finca Uno" y "Dos"', "Área  según campo", "nota final 2"],
+    "Cód DANE Depto": ["05", "50", "11", "5", "99", "00", "AB", "123", "85"],
+    "Cód DANE Mpio": ["001", "50001", "99001", "12", "ABC", "568", "05001", "1234567"],
+    "Año Vigencia Insumo Geográfico": ["2015", "1999", "Sin Información", "sin informacion", "-9999", "1900",
+                                       "12/05/2015", "2030", "abc"],
+    "Nombre Vereda": ["La Esperanza", "La esperanza", "LA ESPERANZA", "Vereda El Recreo", "El Recreo km 5", "Sin Información",
+                      "Corregimiento Uno", "123", "No Aplica", "Zona urbana", "Las Palmas.", "Las Palmas", "alto de la cruz",
+                      "Buenavista", "Buena Vista", "El Mortiño", "El Mortino"],
+    "RULEID": ["1", "2", "abc", "1.0"],
+    "Código SIG Predio Jurídico": ["CLC01234", "CLC1234", "CLC0ABCD", "CO3112345", "CO31-12345", "L01234", "L0123X",
+                                   "SC01234", "SC1234", "CX99", "12345", "ZZ", "L0_123"],
+    "Área Terreno Calculada Mts2": ["1234.5", "0", "-5", "12,5", "abc", "100"],
+    "Tipo de Propiedad": ["Privada", "PRIVADA", "Presuntamente Baldio", "Sin Informacion", "Publica"],
+}
+
+# Mutaciones aleatorias sobre un valor semilla
+MUTACIONES = [
+    lambda v, r: " " + v,
+    lambda v, r: v + " ",
+    lambda v, r: v.replace(" ", "  ", 1),
+    lambda v, r: v + "\n",
+    lambda v, r: v.upper(),
+    lambda v, r: v.lower(),
+    lambda v, r: v.title(),
+    lambda v, r: unidecode(v),
+    lambda v, r: v[:-1],
+    lambda v, r: (lambda i: v[:i] + r.choice("-_.,;:\"'/0123456789ÑñáÁ ") + v[i:])(r.randint(0, len(v))),
+    lambda v, r: "",
+    lambda v, r: "   ",
+    lambda v, r: "NA",
+]
+
+def generar_registros(filas, semilla=0, prob_mutacion=0.35):
+    """DataFrame sintético de texto a partir de los valores semilla y mutaciones aleatorias (reproducible por semilla)."""
+    r = random.Random(semilla)
+    registros = []
+    for i in range(filas):
+        registro = {"ID": str(r.randint(1, i + 1) if r.random() < 0.02 else i + 1)}
+        for columna, valores in VALORES_GENERADOS.items():
+            valor = r.choice(valores)
+            while r.random() < prob_mutacion:
+                valor = r.choice(MUTACIONES)(valor, r)
+            registro[columna] = valor
+        registros.append(registro)
+    # Misma conversión de vacíos y textos nulos que al leer el CSV
+    return pd.DataFrame(registros, columns=columnas_objetivo).replace({v: None for v in VALORES_NULOS})
+
+def reducir_contraejemplo(df_raw, motores, max_intentos=200):
+    """Quita bloques de filas mientras la diferencia se mantenga, para dejar un caso mínimo reproducible."""
+    tam = len(df_raw) // 2
+    intentos = 0
+    while tam >= 1 and intentos < max_intentos:
+        inicio, reducido = 0, False
+        while inicio < len(df_raw) and intentos < max_intentos:
+            candidato = df_raw.drop(df_raw.index[inicio:inicio + tam])
+            intentos += 1
+            if len(candidato) and any(len(d) for d in comparar_motores(candidato, motores).values()):
+                df_raw, reducido = candidato, True
+            else:
+                inicio += tam
+        if not reducido:
+            tam //= 2
+    return df_raw.reset_index(drop=True)
+
+def equivalencia_generada(casos=20, filas=300, semilla=0, motores=None, progreso=SIN_PROGRESO):
+    """Prueba por propiedades: todos los motores deben coincidir con la referencia en cada caso generado.
+       Devuelve None o (semilla, contraejemplo reducido, {motor: diferencias}).
+    """
+    with progreso.etapa("Equivalencia (datos generados)", casos, "casos"):
+        for caso in range(semilla, semilla + casos):
+            df_raw = generar_registros(filas, caso)
+            if any(len(d) for d in comparar_motores(df_raw, motores).values()):
+                minimo = reducir_contraejemplo(df_raw, motores)
+                return caso, minimo, comparar_motores(minimo, motores)
+            progreso.avanzar()
+    return None
+
+def reportar_diferencias(diferencias, progreso, limite=20):
+    """Imprime las diferencias por motor; devuelve True si todos coinciden."""
+    iguales = True
+    for motor, d in diferencias.items():
+        if d.empty:
+            progreso.mensaje(f"✅ Motor '{motor}' idéntico a la referencia", motor=motor, diferencias=0)
+            continue
+        iguales = False
+        progreso.mensaje(f"❌ Motor '{motor}': {len(d)} diferencias", motor=motor, diferencias=len(d))
+        progreso.tabla(d.head(limite), tabla="diferencias", motor=motor)
+    return iguales
+
+def ejecutar_equivalencia(ruta=None, motores=None, motor_carga="pandas", referencia=None,
+                          casos=20, filas=300, semilla=0, progreso=SIN_PROGRESO):
+    """Con archivo: compara cada motor contra la referencia (opcionalmente un reporte dorado .pkl:
+       se crea si no existe). Sin archivo: pruebas con datos generados. Devuelve True si todo coincide.
+    """
+    if ruta is None:
+        fallo = equivalencia_generada(casos, filas, semilla, motores, progreso)
+        if fallo is None:
+            progreso.mensaje(f"✅ {casos} casos generados de {filas} filas: todos los motores coinciden",
+                             casos=casos, filas=filas)
+            return True
+        caso, minimo, diferencias = fallo
+        progreso.mensaje(f"❌ Diferencia con la semilla {caso}; contraejemplo reducido a {len(minimo)} filas:",
+                         semilla=caso, filas=len(minimo))
+        progreso.tabla(minimo, tabla="contraejemplo", semilla=caso)
+        return reportar_diferencias(diferencias, progreso)
+
+    df_raw = cargar_csv(ruta, motor_carga, progreso)
+    dorado = None
+    if referencia and os.path.exists(referencia):
+        dorado = pd.read_pickle(referencia)
+        motores = motores or list(MOTORES_VALIDACION)
+    elif referencia:
+        MOTORES_VALIDACION[MOTOR_REFERENCIA](df_raw).to_pickle(referencia)
+        progreso.mensaje(f"💾 Reporte de referencia guardado en: {referencia}", referencia=referencia)
+    return reportar_diferencias(comparar_motores(df_raw, motores, dorado), progreso)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reporte de inconsistencias EditedPlot")
+    parser.add_argument("ruta", nargs="?",
+                        help="Archivo CSV, GeoPackage o Shapefile a validar (si se omite se abre el selector)")
+    parser.add_argument("--capa", help="Capa del GeoPackage (por defecto la primera con las columnas objetivo)")
+    parser.add_argument("--salida", default=OUTPUT_DIR, help="Carpeta donde se guarda el reporte")
+    parser.add_argument("--sin-cache", action="store_true", help="Forzar la validación completa sin usar la caché")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Carpeta de la caché de resultados")
+    parser.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_MB, help="Tamaño máximo de la caché (MB)")
+    parser.add_argument("--motor-carga", choices=MOTORES_CARGA, default="pandas", help="Lector del CSV")
+    parser.add_argument("--motor-validacion", choices=[m for m in MOTORES_VALIDACION if m != MOTOR_REFERENCIA],
+                        default="columnas", help="Motor de reglas (polars: lectura perezosa y multihilo)")
+    parser.add_argument("--compacto", type=int, metavar="N", help="Máximo de filas de detalle por tipo de observación")
+    parser.add_argument("--vigilar", metavar="CARPETA", help="Modo servicio: validar cada CSV que llegue a la carpeta")
+    parser.add_argument("--conjunto", metavar="CARPETA",
+                        help="Validar todos los CSV de la carpeta como un portafolio (unicidad entre archivos)")
+    parser.add_argument("--trabajadores", type=int, default=2, help="Procesos de validación en modo servicio / API / conjunto")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Segundos entre revisiones de la carpeta vigilada")
+    parser.add_argument("--api", action="store_true", help="Modo API HTTP local")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de escucha de la API")
+    parser.add_argument("--puerto", type=int, default=8765, help="Puerto de la API")
+    parser.add_argument("--reporte-csv", action="store_true",
+                        help="Escribir el detalle como CSV (;) por lotes en lugar del Excel (archivos muy grandes)")
+    parser.add_argument("--muestra", type=int, metavar="N",
+                        help="Estimar tasas de error con una muestra de N filas (sin validar el archivo completo)")
+    parser.add_argument("--estratificar", action="store_true",
+                        help="Con --muestra: muestra estratificada por Cód DANE Depto")
+    parser.add_argument("--confianza", type=float, default=CONFIANZA_MUESTRA,
+                        help="Nivel de confianza de los intervalos de --muestra")
+    parser.add_argument("--corregir", action="store_true",
+                        help="Escribir además un CSV corregido (;) con las correcciones mecánicas y su bitácora")
+    parser.add_argument("--solo", nargs="+", metavar="NOMBRE",
+                        help="Validar solo estas columnas o reglas nombradas (" + ", ".join(REGLAS_NOMBRADAS) + ")")
+    parser.add_argument("--excluir", nargs="+", metavar="NOMBRE", help="Columnas o reglas nombradas a omitir")
+    parser.add_argument("--progreso", choices=MODOS_PROGRESO, default="normal",
+                        help="Avance por etapa: texto, silencioso o una línea JSON por evento")
+    parser.add_argument("--historial", metavar="ARCHIVO.sqlite", default=HISTORIAL_DB,
+                        help="Guardar las observaciones de cada corrida en una base SQLite")
+    parser.add_argument("--tendencia", nargs="?", const="", metavar="COLUMNA",
+                        help="Consultar el historial: hallazgos por mes y columna (opcionalmente una sola columna)")
+    parser.add_argument("--historial-id", metavar="ID", help="Consultar el historial de observaciones de un ID")
+    parser.add_argument("--equivalencia", action="store_true",
+                        help="Comparar los motores de validación con el ciclo fila a fila (sin ruta: datos generados)")
+    parser.add_argument("--motores", nargs="+", choices=list(MOTORES_VALIDACION), help="Motores a comparar")
+    parser.add_argument("--referencia", metavar="ARCHIVO.pkl", help="Reporte dorado: se crea si no existe, si no se compara")
+    parser.add_argument("--casos", type=int, default=20, help="Casos generados en --equivalencia")
+    parser.add_argument("--filas", type=int, default=300, help="Filas por caso generado")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del primer caso generado")
+    parser.add_argument("--benchmark-carga", action="store_true", help="Solo comparar tiempo y memoria de carga de cada motor")
+    args = parser.parse_args()
+    if args.capa:
+        os.environ["EDITPLOT_CAPA"] = args.capa  # también la ven los procesos trabajadores
+    try:
+        seleccion = Seleccion(args.solo, args.excluir)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    if args.api:
+        try:
+            asyncio.run(servir_api(args.host, args.puerto, args.trabajadores, args.motor_carga))
+        except KeyboardInterrupt:
+            print("🛑 API detenida")
+        return
+
+    if args.vigilar:
+        progreso = Progreso(args.progreso)
+        try:
+            asyncio.run(vigilar_carpeta(
+                args.vigilar, args.salida, args.trabajadores, args.intervalo, progreso,
+                compacto=args.compacto, motor_carga=args.motor_carga, usar_cache=not args.sin_cache,
+                cache_dir=args.cache_dir, cache_max_mb=args.cache_max_mb, historial=args.historial,
+                seleccion=seleccion
+            ))
+        except KeyboardInterrupt:
+            progreso.mensaje("🛑 Servicio detenido", detenido=True)
+        return
+
+    if args.tendencia is not None or args.historial_id:
+        if not args.historial:
+            print("❌ Indique la base de historial con --historial o EDITPLOT_HISTORIAL_DB")
+            raise SystemExit(1)
+        if args.historial_id:
+            consulta = historial_registro(args.historial, args.historial_id)
+        else:
+            consulta = tendencia_historial(args.historial, args.tendencia or None)
+        print(consulta.to_string(index=False))
+        return
+
+    if args.conjunto:
+        rutas = sorted(e.path for e in os.scandir(args.conjunto)
+                       if e.is_file() and e.name.lower().endswith(EXTENSIONES_ENTRADA))
+        if not rutas:
+            print(f"❌ No hay archivos CSV, GeoPackage ni Shapefile en {args.conjunto}")
+            raise SystemExit(1)
+        validar_conjunto(
+            rutas, args.salida, args.trabajadores, args.motor_carga, Progreso(args.progreso),
+            compacto=args.compacto, usar_cache=not args.sin_cache,
+            cache_dir=args.cache_dir, cache_max_mb=args.cache_max_mb, historial=args.historial,
+            seleccion=seleccion
+        )
+        return
+
+    if args.equivalencia:
+        try:
+            iguales = ejecutar_equivalencia(
+                args.ruta, args.motores, args.motor_carga, args.referencia,
+                args.casos, args.filas, args.semilla, Progreso(args.progreso)
+            )
+        except ValueError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+        raise SystemExit(0 if iguales else 1)
+
+    # ==========================
+    # Selección archivo CSV
+    # ==========================
+    ruta = args.ruta
+    if not ruta:
+        Tk().withdraw()
+        ruta = askopenfilename(
+            filetypes=[("Archivos CSV", "*.csv"), ("Capas GIS", "*.gpkg *.shp")],
+            title="Seleccione el archivo CSV o la capa"
+        )
+
+    if not ruta:
+        print("❌ No se seleccionó ningún archivo. Saliendo...")
+        raise SystemExit
+
+    progreso = Progreso(args.progreso)
+    try:
+        if args.benchmark_carga:
+            progreso.tabla(benchmark_carga(ruta), tabla="benchmark_carga")
+            return
+
+        if args.muestra:
+            inicio = time.perf_counter()
+            tablas = estimar_calidad(ruta, args.muestra, args.estratificar, args.confianza, args.semilla,
+                                     seleccion, progreso)
+            os.makedirs(args.salida, exist_ok=True)
+            outfile = os.path.join(args.salida, f"Estimacion_EditedPlot_{datetime.now():%Y%m%d_%H%M%S}.xlsx")
+            guardar_estimacion(tablas, outfile)
+            estratos = tablas["Estratos"]
+            progreso.tabla(tablas["Columnas"], tabla="estimacion")
+            progreso.mensaje(
+                f"📈 Estimación con {estratos['Filas muestra'].sum():,} de {estratos['Filas archivo'].sum():,} filas "
+                f"(IC {args.confianza:.0%}) en {time.perf_counter() - inicio:.1f} s: {outfile}",
+                estimacion=outfile, muestra=int(estratos["Filas muestra"].sum()))
+            return
+
+        if args.reporte_csv:
+            # Sin Excel ni DataFrame completo: el reporte se escribe lote a lote
+            if args.motor_validacion == "duckdb":
+                lotes = observaciones_duckdb(ruta, progreso, seleccion, carpeta=args.salida)
+            else:
+                lotes = [obtener_reporte(ruta, not args.sin_cache, args.cache_dir, args.cache_max_mb,
+                                         args.motor_carga, progreso, seleccion, args.motor_validacion)]
+            os.makedirs(args.salida, exist_ok=True)
+            outfile = os.path.join(args.salida, f"Inconsistencias_EditedPlot_{datetime.now():%Y%m%d_%H%M%S}.csv")
+            total = guardar_reporte_csv(lotes, outfile)
+            progreso.mensaje(f"✅ Reporte generado en: {outfile}", reporte=outfile)
+            progreso.mensaje(f"📊 Total inconsistencias encontradas: {total}", total=total)
+            return
+
+        hash_csv = None
+        if args.corregir:
+            reporte, corregido, bitacora = validar_y_corregir(ruta, progreso, seleccion)
+        else:
+            # Un solo hash del archivo para la caché y el historial
+            hash_csv = hash_archivo(ruta) if not args.sin_cache and args.historial else None
+            reporte = obtener_reporte(ruta, not args.sin_cache, args.cache_dir, args.cache_max_mb, args.motor_carga,
+                                      progreso, seleccion, args.motor_validacion, hash_csv)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    os.makedirs(args.salida, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if args.corregir:
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        formato = None if es_capa(ruta) else detectar_formato(ruta)
+        ruta_csv, ruta_bitacora = guardar_correccion(corregido, bitacora, args.salida, nombre, timestamp, formato)
+        progreso.mensaje(f"🛠️ CSV corregido en: {ruta_csv} ({len(bitacora)} cambios → {ruta_bitacora})",
+                         corregido=ruta_csv, bitacora=ruta_bitacora, cambios=len(bitacora))
+    outfile = os.path.join(args.salida, f"Inconsistencias_EditedPlot_{timestamp}.xlsx")
+    with progreso.etapa("Escritura Excel", len(reporte)):
+        guardar_excel(reporte, outfile, args.compacto)
+        progreso.avanzar(len(reporte))
+    if args.historial:
+        with progreso.etapa("Historial SQLite", len(reporte)):
+            guardar_historial(reporte, ruta, args.historial, hash_csv)
+            progreso.avanzar(len(reporte))
+
+    progreso.mensaje(f"✅ Reporte generado en: {outfile}", reporte=outfile)
+    progreso.mensaje(f"📊 Total inconsistencias encontradas: {len(reporte)}", total=len(reporte))
+
+    # Abrir automáticamente el archivo en Windows
+    try:
+        os.startfile(outfile)
+    except:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+RUTA_SCRIPT = Path(__file__).resolve().parents[1] / "20251001_Inconsistencias_EditedPlot.py"
+
+
+@pytest.fixture(scope="session")
+def ep():
+    spec = importlib.util.spec_from_file_location("editedplot", RUTA_SCRIPT)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture
+def registros(ep):
+    """200 registros generados: los pares sin hallazgos de valor (pasan el pre-escaneo), los impares con mutaciones."""
+    df_raw = ep.generar_registros(200, semilla=1)
+    limpio = {c: valores[0] for c, valores in ep.VALORES_GENERADOS.items()}
+    limpio["Año Vigencia Insumo Geográfico"] = "Sin Información"
+    for i in range(0, len(df_raw), 2):
+        df_raw.loc[i, list(limpio)] = list(limpio.values())
+        df_raw.loc[i, "Código Interno"] = f"SIS_Castilla_PJ{100 + i}"
+        df_raw.loc[i, "Código SIG Predio Jurídico"] = f"CLC0{1000 + i}"
+    return df_raw
+
+
+@pytest.fixture
+def csv_registros(tmp_path, registros):
+    ruta = tmp_path / "export.csv"
+    registros.to_csv(ruta, sep=";", index=False)
+    return str(ruta)
@@ -0,0 +1,49 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def solicitar(ep, ruta, cuerpo):
+    """Levanta el manejador HTTP en un puerto libre (pool de hilos) y hace un POST JSON."""
+    async def ida_y_vuelta():
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            servidor = await asyncio.start_server(
+                lambda r, w: ep._atender(r, w, loop, pool, "pandas"), "127.0.0.1", 0
+            )
+            puerto = servidor.sockets[0].getsockname()[1]
+            async with servidor:
+                reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+                writer.write(
+                    f"POST {ruta} HTTP/1.1\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo
+                )
+                await writer.drain()
+                respuesta = await reader.read()
+                writer.close()
+        cabecera, _, datos = respuesta.partition(b"\r\n\r\n")
+        return int(cabecera.split()[1]), json.loads(datos)
+
+    return asyncio.run(ida_y_vuelta())
+
+
+def test_registros_que_no_son_objetos_dan_400(ep):
+    estado, datos = solicitar(ep, "/validar/registros", b"[1, 2]")
+
+    assert estado == 400
+    assert "posiciones: 0, 1" in datos["error"]
+
+
+def test_validar_registros_rechaza_elementos_mezclados(ep):
+    with pytest.raises(ValueError):
+        ep.validar_registros([{"ID": "1"}, "texto"])
+
+
+def test_registros_validos_dan_200(ep):
+    registro = {"ID": "1", "Nombre Proyecto": "SIS_Castilla"}
+    estado, datos = solicitar(ep, "/validar/registros", json.dumps([registro]).encode("utf-8"))
+
+    assert estado == 200
+    assert datos["total"] == len(datos["observaciones"])
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+
+def test_misma_entrada_misma_clave(ep, csv_registros):
+    assert ep.clave_cache(csv_registros) == ep.clave_cache(csv_registros)
+    assert ep.clave_cache(csv_registros, ep.Seleccion()) == ep.clave_cache(csv_registros)
+
+
+@pytest.mark.parametrize("parametro, valor", [
+    ("VERSION_REGLAS", "0000.00.00"),
+    ("TOLERANCIA_AREA", 0.05),
+    ("AREA_ATIPICA_K", 1.5),
+    ("AREA_ATIPICA_RAZON", 4.0),
+    ("AREA_ATIPICA_MIN_GRUPO", 3),
+])
+def test_reglas_y_umbrales_cambian_la_clave(ep, csv_registros, monkeypatch, parametro, valor):
+    antes = ep.clave_cache(csv_registros)
+    monkeypatch.setattr(ep, parametro, valor)
+
+    assert ep.clave_cache(csv_registros) != antes
+
+
+def test_contenido_seleccion_y_lector_cambian_la_clave(ep, csv_registros):
+    completa = ep.clave_cache(csv_registros)
+
+    assert ep.clave_cache(csv_registros, ep.Seleccion(solo=["Escala"])) != completa
+    assert ep.clave_cache(csv_registros, motor_carga="pyarrow") != completa
+    with open(csv_registros, "a", encoding="utf-8") as f:
+        f.write(";".join(["999"] + [""] * 18) + "\n")
+    assert ep.clave_cache(csv_registros) != completa
+
+
+def test_capa_cambia_la_clave(ep, tmp_path, registros, monkeypatch):
+    pyogrio = pytest.importorskip("pyogrio")
+    pa = pytest.importorskip("pyarrow")
+    ruta = str(tmp_path / "predios.gpkg")
+    pyogrio.write_arrow(pa.Table.from_pandas(registros.iloc[:50]), ruta, layer="norte", driver="GPKG")
+    pyogrio.write_arrow(pa.Table.from_pandas(registros.iloc[50:]), ruta, layer="sur", driver="GPKG", append=True)
+
+    monkeypatch.setenv("EDITPLOT_CAPA", "norte")
+    norte = ep.clave_cache(ruta)
+    monkeypatch.setenv("EDITPLOT_CAPA", "sur")
+
+    assert ep.clave_cache(ruta) != norte
+
+
+def test_umbral_nuevo_no_reutiliza_el_reporte(ep, csv_registros, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    primero = ep.obtener_reporte(csv_registros, cache_dir=cache_dir)
+    assert ep.obtener_reporte(csv_registros, cache_dir=cache_dir).equals(primero)
+    assert len(os.listdir(cache_dir)) == 1
+
+    monkeypatch.setattr(ep, "AREA_ATIPICA_RAZON", 2.0)
+    ep.obtener_reporte(csv_registros, cache_dir=cache_dir)
+
+    assert len(os.listdir(cache_dir)) == 2
@@ -0,0 +1,43 @@
+import pandas as pd
+
+
+def con_observacion(reporte, columna, observacion):
+    """Filas del reporte de la columna con esa observación exacta (sola o entre las unidas con "; ")."""
+    de_columna = reporte[reporte["Columna Analizada"] == columna]
+    return de_columna[de_columna["Observación Específica"].str.split("; ").map(lambda obs: observacion in obs)]
+
+
+def test_corregir_y_volver_a_validar(ep, tmp_path, registros):
+    ruta = str(tmp_path / "export.csv")
+    registros.to_csv(ruta, sep=",", index=False, encoding="cp1252")
+
+    reporte, corregido, bitacora = ep.validar_y_corregir(ruta)
+    formato = ep.detectar_formato(ruta)
+    ruta_csv, ruta_bitacora = ep.guardar_correccion(corregido, bitacora, str(tmp_path), "export", "prueba", formato)
+    assert not bitacora.empty
+    assert ep.detectar_formato(ruta_csv)["sep"] == ","
+    assert len(pd.read_csv(ruta_bitacora, sep=";", dtype=str)) == len(bitacora)
+
+    reporte_nuevo, _, bitacora_nueva = ep.validar_y_corregir(ruta_csv)
+
+    # Las correcciones son idempotentes y sus observaciones desaparecen
+    assert bitacora_nueva.empty
+    for columna, etiqueta in bitacora[["Columna", "Corrección"]].drop_duplicates().itertuples(index=False):
+        if columna not in ep.CORRECCIONES or etiqueta not in {e for e, *_ in ep.CORRECCIONES[columna]}:
+            continue
+        assert len(con_observacion(reporte, columna, etiqueta)), (columna, etiqueta)
+        assert con_observacion(reporte_nuevo, columna, etiqueta).empty, (columna, etiqueta)
+
+
+def test_solo_cambian_las_celdas_de_la_bitacora(ep, csv_registros):
+    original = ep.cargar_csv(csv_registros, columnas=None, exacto=True)
+
+    _, corregido, bitacora = ep.validar_y_corregir(csv_registros)
+
+    assert list(corregido.columns) == list(original.columns) and len(corregido) == len(original)
+    cambios = set()
+    for columna in original.columns:
+        antes, despues = original[columna].fillna(""), corregido[columna].fillna("")
+        distintas = antes.ne(despues)
+        cambios |= {(columna, a, b) for a, b in zip(antes[distintas], despues[distintas])}
+    assert cambios == set(zip(bitacora["Columna"], bitacora["Valor Original"], bitacora["Valor Corregido"]))
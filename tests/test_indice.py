@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def estado(indice):
+    """Contenido comparable de los índices (sin los conteos que quedaron en cero)."""
+    return (
+        +indice.codigo_interno, +indice.codigo_sig,
+        {c: +conteo for c, conteo in indice.nombres.items()},
+        {c: +grupos for c, grupos in indice.grupos_nombre.items()},
+        dict(indice.veredas),
+        {c: +conteo for c, conteo in indice.similitud.items()},
+        {clave: dict(sketch.conteos) for clave, sketch in indice.areas.items()},
+    )
+
+
+def test_agregar_y_quitar_igualan_al_indice_completo(ep, registros):
+    base, extra = registros.iloc[:150], registros.iloc[150:]
+    completo = ep.IndiceGlobal.desde_dataframe(registros)
+    indice = ep.IndiceGlobal.desde_dataframe(base)
+
+    for raw in extra.to_dict("records"):
+        indice.agregar(raw)
+    assert estado(indice) == estado(completo)
+
+    filas = ep.preparar_datos(registros)[ep.columnas_objetivo].to_dict("records")
+    for raw, fila in zip(registros.to_dict("records"), filas):
+        assert ep.validar_registro(raw, indice, fila) == ep.validar_registro(raw, completo, fila)
+
+    for raw in extra.to_dict("records"):
+        indice.quitar(raw)
+    assert estado(indice) == estado(ep.IndiceGlobal.desde_dataframe(base))
+
+
+def test_actualizar_registro(ep, registros):
+    indice = ep.IndiceGlobal.desde_dataframe(registros)
+    anterior = registros.iloc[0].to_dict()
+    nuevo = {**anterior, "Código Interno": registros.iloc[2]["Código Interno"]}
+
+    indice.actualizar(anterior, nuevo)
+
+    assert indice.codigo_interno[nuevo["Código Interno"]] == 2
+    assert anterior["Código Interno"] not in indice.codigo_interno
+
+
+def sketch_de(ep, valores):
+    sketch = ep.SketchArea()
+    cubetas, cantidades = np.unique(ep.SketchArea.cubetas(valores), return_counts=True)
+    for cubeta, cantidad in zip(cubetas, cantidades):
+        sketch.agregar(int(cubeta), int(cantidad))
+    return sketch
+
+
+def test_cuantiles_del_sketch_dentro_del_error_relativo(ep):
+    valores = np.random.default_rng(0).lognormal(mean=7, sigma=1.5, size=5000)
+    sketch = sketch_de(ep, valores)
+
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        exacto = np.quantile(valores, q, method="lower")
+        assert abs(sketch.cuantil(q) - exacto) <= ep.AREA_ATIPICA_ALFA * exacto * (1 + 1e-9)
+
+
+def test_sketch_fusiona_y_quita(ep):
+    valores = np.random.default_rng(1).lognormal(mean=5, sigma=1, size=1000)
+    mitad_a, mitad_b = sketch_de(ep, valores[:500]), sketch_de(ep, valores[500:])
+
+    fusion = sketch_de(ep, valores[:500])
+    fusion.fusionar(mitad_b)
+    assert fusion.conteos == sketch_de(ep, valores).conteos
+
+    for cubeta, cantidad in mitad_b.conteos.items():
+        fusion.agregar(cubeta, -cantidad)
+    assert fusion.conteos == mitad_a.conteos
+    assert fusion.total == 500
@@ -0,0 +1,20 @@
+import pytest
+
+MOTORES_OPCIONALES = {"polars": "polars", "duckdb": "duckdb"}
+
+
+@pytest.mark.parametrize("motor", ["columnas", "polars", "duckdb"])
+@pytest.mark.parametrize("semilla", [0, 1, 2])
+def test_motor_igual_a_la_referencia(ep, motor, semilla):
+    if motor in MOTORES_OPCIONALES:
+        pytest.importorskip(MOTORES_OPCIONALES[motor])
+    df_raw = ep.generar_registros(200, semilla)
+
+    diferencias = ep.comparar_motores(df_raw, [motor])[motor]
+
+    assert diferencias.empty, diferencias.head(10).to_string()
+
+
+def test_motores_con_filas_limpias(ep, registros):
+    for motor, diferencias in ep.comparar_motores(registros).items():
+        assert diferencias.empty, f"{motor}:\n{diferencias.head(10).to_string()}"
@@ -0,0 +1,25 @@
+def test_prefiltro_no_cambia_el_reporte(ep, registros, monkeypatch):
+    assert ep.filas_limpias_dataframe(registros).sum() == len(registros) // 2
+
+    monkeypatch.setattr(ep, "PREFILTRO_ACTIVO", False)
+    completo = ep.validar_dataframe(registros)
+    monkeypatch.setattr(ep, "PREFILTRO_ACTIVO", True)
+    con_prefiltro = ep.validar_dataframe(registros)
+
+    assert ep.diferencias_reporte(completo, con_prefiltro).empty
+
+
+def test_preescaneo_del_archivo(ep, csv_registros, monkeypatch):
+    limpias = ep.filas_limpias(csv_registros)
+    df_raw = ep.cargar_csv(csv_registros)
+
+    assert len(limpias) == len(df_raw)
+    assert limpias.sum() == len(df_raw) // 2
+    # Las líneas crudas son más estrictas (comillas), nunca más permisivas que el DataFrame
+    assert not (limpias & ~ep.filas_limpias_dataframe(df_raw)).any()
+
+    monkeypatch.setattr(ep, "PREFILTRO_ACTIVO", False)
+    completo = ep.validar_dataframe(df_raw)
+    monkeypatch.setattr(ep, "PREFILTRO_ACTIVO", True)
+
+    assert ep.diferencias_reporte(completo, ep.validar_dataframe(df_raw, limpias=limpias)).empty
@@ -0,0 +1,26 @@
+def test_regla_en_solo_no_activa_las_demas_de_su_columna(ep):
+    seleccion = ep.Seleccion(solo=["nombre_predio_similar"])
+
+    assert seleccion.columnas == ["Nombre Predio Jurídico"]
+    assert seleccion.reglas == {"nombre_predio_similar"}
+    assert "nombre_predio_tokens" not in seleccion.reglas
+
+
+def test_columna_en_solo_activa_todas_sus_reglas(ep):
+    seleccion = ep.Seleccion(solo=["Nombre Predio Jurídico"])
+
+    assert seleccion.reglas == {"nombre_predio_tokens", "nombre_predio_similar"}
+
+
+def test_columna_y_regla_de_otra_columna(ep):
+    seleccion = ep.Seleccion(solo=["Creado Por", "nombre_predio_similar"])
+
+    assert seleccion.reglas == {"creado_por_variantes", "creado_por_similar", "nombre_predio_similar"}
+
+
+def test_excluir_sigue_apagando_reglas(ep):
+    seleccion = ep.Seleccion(excluir=["nombre_predio_tokens"])
+
+    assert "nombre_predio_tokens" not in seleccion.reglas
+    assert "nombre_predio_similar" in seleccion.reglas
+    assert not seleccion.completa
@@ -0,0 +1,37 @@
+from rapidfuzz import fuzz
+
+
+def motor_proyecto(ep, opciones):
+    return ep.MotorSimilitud(opciones, fuzz.ratio, 90, ep.normalizar_similitud)
+
+
+def test_mayusculas_y_tildes_no_son_variante(ep):
+    motor = motor_proyecto(ep, ["SIS_Castilla", "SIS_CASTILLA", "sis_castilla", "Ana María López", "ANA MARIA LOPEZ"])
+
+    for opcion in motor.opciones:
+        assert not motor.tiene_variante(opcion)
+
+
+def test_variante_real_se_reporta(ep):
+    motor = motor_proyecto(ep, ["VEX_Rubiales", "VEX_RUBIALES", "VEX_Rubialez"])
+
+    assert motor.tiene_variante("VEX_Rubiales")
+    assert motor.tiene_variante("VEX_RUBIALES")
+    assert motor.tiene_variante("VEX_Rubialez")
+
+
+def test_bloque_por_digitos_separa_lotes(ep):
+    motor = ep.MotorSimilitud(["Lote 13", "Lote 14", "lote 13"], fuzz.ratio, 90, ep.normalizar_similitud, ep.digitos)
+
+    assert not motor.tiene_variante("Lote 13")
+    assert not motor.tiene_variante("Lote 14")
+
+
+def test_corpus_con_mayusculas_no_pide_estandarizar(ep):
+    df_raw = ep.generar_registros(30, semilla=1)
+    df_raw["Nombre Proyecto"] = ["SIS_Castilla", "SIS_CASTILLA", "sis_castilla"] * 10
+
+    for motor in ep.MOTORES_VALIDACION.values():
+        reporte = motor(df_raw)
+        proyecto = reporte[reporte["Columna Analizada"] == "Nombre Proyecto"]
+        assert not proyecto["Observación Específica"].str.contains("Estandarizar Nombre Proyecto").any()